@@ -20,12 +20,19 @@ class Message(BaseModel):
     created_at: datetime
 
 
+class ConversationReadMarkDTO(BaseModel):
+    # the last read message; empty means everything up to now
+    message_id: uuid.UUID | None = None
+
+
 class ConversationReadDTO(BaseModel):
     id: uuid.UUID
     type: conversation_type.ConversationType
     title: str | None
     created_at: datetime
     last_message: Optional[Message] | None = None
+    last_activity_at: datetime | None = None
+    unread_count: int | None = None
 
     class Config:
         from_attributes = True
@@ -29,3 +29,8 @@ class MessageReadDTO(BaseModel):
     class Config:
         from_attributes = True
 
+
+class MessageSearchResultDTO(MessageReadDTO):
+    # HTML-escaped excerpt with matches wrapped in <mark>
+    snippet: str | None = None
+
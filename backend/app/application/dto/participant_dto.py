@@ -1,3 +1,4 @@
+import uuid
 from typing import Optional
 from datetime import datetime
 
@@ -12,6 +13,8 @@ class ParticipantReadDTO(BaseModel):
     first_name: str
     last_name: str
     avatar: str | None
+    last_read_at: datetime | None = None
+    last_read_message_id: uuid.UUID | None = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
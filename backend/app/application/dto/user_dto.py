@@ -25,6 +25,14 @@ class UserLoginDTO(BaseModel):
     username: str
     password: str
 
+class UserSummaryDTO(BaseModel):
+    id: int
+    username: str
+    avatar: str | None
+
+    class Config:
+        from_attributes = True
+
 class UserReadDTO(BaseModel):
     id: int
     username: str
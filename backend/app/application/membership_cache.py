@@ -0,0 +1,107 @@
+import json
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.application.settings import settings
+from app.domain.enums.participant_type import ParticipantRole
+
+Key = tuple[uuid.UUID, int]
+# the key of a conversation-wide invalidation
+Scope = tuple[uuid.UUID, int | None]
+
+
+class MembershipCache:
+    """
+    Bounded LRU/TTL cache of ``(conversation_id, user_id) -> role``.
+
+    Only positive lookups are cached, so a user who was just added is never
+    rejected by a stale entry. Writers call ``invalidate`` after commit; when
+    a publisher is bound the invalidation is also sent to the other workers,
+    which apply it through ``apply``. The TTL bounds staleness if one is lost.
+
+    As in ResponseCache, a role is not stored if the membership was
+    invalidated after the ``generation`` taken before it was looked up, so a
+    lookup that raced a role change or removal cannot cache the old row.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 30) -> None:
+        self._entries: OrderedDict[Key, tuple[float, ParticipantRole]] = OrderedDict()
+        self._max_size = max_size
+        self._ttl = ttl
+        self._generation = 0
+        # membership (or whole conversation) -> generation of its last invalidation;
+        # _floor stands in for trimmed marks
+        self._invalidated: OrderedDict[Scope, int] = OrderedDict()
+        self._floor = 0
+        self._publish: Callable[[str], Awaitable[None]] | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def bind(self, publish: Callable[[str], Awaitable[None]]) -> None:
+        self._publish = publish
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, conversation_id: uuid.UUID, user_id: int) -> ParticipantRole | None:
+        key = (conversation_id, user_id)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, conversation_id: uuid.UUID, user_id: int, role: ParticipantRole, since: int) -> None:
+        """Store the role unless the membership was invalidated after generation ``since``."""
+        key = (conversation_id, user_id)
+        if self._stale(key, since):
+            return
+        self._entries[key] = (time.monotonic() + self._ttl, role)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    async def invalidate(self, conversation_id: uuid.UUID, user_id: int | None = None) -> None:
+        """Drops the membership (or every membership of the conversation) on all workers."""
+        self.discard(conversation_id, user_id)
+        if self._publish is not None:
+            await self._publish(json.dumps({"conversation_id": str(conversation_id), "user_id": user_id}))
+
+    def apply(self, message: str) -> None:
+        data = json.loads(message)
+        self.discard(uuid.UUID(data["conversation_id"]), data.get("user_id"))
+
+    def discard(self, conversation_id: uuid.UUID, user_id: int | None = None) -> None:
+        self._generation += 1
+        scope = (conversation_id, user_id)
+        self._invalidated[scope] = self._generation
+        self._invalidated.move_to_end(scope)
+        while len(self._invalidated) > self._max_size:
+            # oldest first, so the last one trimmed is the newest
+            _, self._floor = self._invalidated.popitem(last=False)
+        if user_id is not None:
+            self._entries.pop((conversation_id, user_id), None)
+            return
+        for key in [key for key in self._entries if key[0] == conversation_id]:
+            del self._entries[key]
+
+    def stats(self) -> dict[str, Any]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _stale(self, key: Key, since: int) -> bool:
+        marks = (self._floor, self._invalidated.get(key, 0), self._invalidated.get((key[0], None), 0))
+        return any(generation > since for generation in marks)
+
+
+membership_cache = MembershipCache(
+    max_size=settings.membership_cache_size,
+    ttl=settings.membership_cache_ttl_seconds,
+)
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.application.settings import settings
+
+# (generation, monotonic time) of a tag that was never invalidated
+_NEVER = (0, float("-inf"))
+
+
+def user_tag(user_id: int) -> str:
+    """Everything listed for this user (their conversation list)."""
+    return f"user:{user_id}"
+
+
+def conversation_tag(conversation_id: uuid.UUID) -> str:
+    """Every cached list that shows this conversation."""
+    return f"conversation:{conversation_id}"
+
+
+def participants_tag(conversation_id: uuid.UUID) -> str:
+    return f"participants:{conversation_id}"
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    tags: frozenset[str]
+    expires_at: float
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+class ResponseCache:
+    """
+    LRU cache of serialized list responses, bounded by total body size.
+
+    Entries carry tags and are dropped when ChatService reports a mutation
+    on one of them. As with MembershipCache, invalidations are published to
+    the other workers once a publisher is bound, and the TTL bounds staleness
+    if one is lost.
+
+    A response is not stored if one of its tags was invalidated after the
+    ``generation`` taken before it was computed, or within the last ``settle``
+    seconds: a lagging read replica may still return the old rows then.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 60, settle: float = 0) -> None:
+        self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self._by_tag: dict[str, set[Hashable]] = {}
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._settle = settle
+        self._bytes = 0
+        self._generation = 0
+        # tag -> (generation, time) of its last invalidation; _floor stands in for trimmed tags
+        self._invalidated: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self._floor = _NEVER
+        self._publish: Callable[[str], Awaitable[None]] | None = None
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def bind(self, publish: Callable[[str], Awaitable[None]]) -> None:
+        self._publish = publish
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: Hashable) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at < time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(
+        self,
+        key: Hashable,
+        body: bytes,
+        tags: Iterable[str],
+        since: int,
+        headers: dict[str, str] | None = None,
+    ) -> CachedResponse:
+        """Store the response unless one of its tags was invalidated after generation ``since``."""
+        entry = CachedResponse(
+            body=body,
+            etag='"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest(),
+            tags=frozenset(tags),
+            expires_at=time.monotonic() + self._ttl,
+            headers=headers or {},
+        )
+        if self._stale(entry.tags, since) or len(body) > self._max_bytes:
+            return entry
+        self._remove(key)
+        self._entries[key] = entry
+        self._bytes += len(body)
+        for tag in entry.tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+        while self._bytes > self._max_bytes:
+            self._remove(next(iter(self._entries)))
+        return entry
+
+    async def invalidate(self, *tags: str) -> None:
+        self.discard(tags)
+        if self._publish is not None and tags:
+            await self._publish(json.dumps(tags))
+
+    def apply(self, message: str) -> None:
+        self.discard(json.loads(message))
+
+    def discard(self, tags: Iterable[str]) -> None:
+        self._generation += 1
+        mark = (self._generation, time.monotonic())
+        for tag in tags:
+            self._invalidated[tag] = mark
+            self._invalidated.move_to_end(tag)
+            for key in list(self._by_tag.get(tag, ())):
+                self._remove(key)
+        while len(self._invalidated) > 100_000:
+            # oldest first, so the last one trimmed is the newest
+            _, self._floor = self._invalidated.popitem(last=False)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "not_modified": self.not_modified,
+        }
+
+    def _stale(self, tags: frozenset[str], since: int) -> bool:
+        settled = time.monotonic() - self._settle
+        marks = [self._floor, *(self._invalidated.get(tag, _NEVER) for tag in tags)]
+        return any(generation > since or at > settled for generation, at in marks)
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= len(entry.body)
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+
+response_cache = ResponseCache(
+    max_bytes=settings.response_cache_max_bytes,
+    ttl=settings.response_cache_ttl_seconds,
+    # misses may be served by the replica, which can lag behind an invalidation
+    settle=settings.read_your_writes_seconds if settings.db_replica_host else 0,
+)
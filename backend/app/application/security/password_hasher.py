@@ -1,13 +1,76 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
 from passlib.context import CryptContext
+
+from app.application.settings import settings
 from app.domain.security.interfaces import PasswordHasher
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+# hashes made with a different cost factor are flagged by needs_update and rehashed on login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+
+
+class PasswordHashingPool:
+    """
+    Dedicated threads for bcrypt, which takes 100+ ms of CPU per call.
+
+    At most ``workers`` hashes run at once; further callers wait on the
+    semaphore instead of piling onto the executor queue, so ``waiting``
+    is the queue depth. bcrypt releases the GIL while hashing, so the
+    event loop keeps serving requests and WebSockets meanwhile.
+    """
+
+    def __init__(self, workers: int = 2) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = asyncio.Semaphore(workers)
+        self._workers = workers
+        self.waiting = 0
+        self.max_waiting = 0
+        self.running = 0
+        self.completed = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self._workers,
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+        }
+
+
+hashing_pool = PasswordHashingPool(workers=settings.password_hash_workers)
 
 
 class BcryptPasswordHasher(PasswordHasher):
 
-    def hash(self, password: str) -> str:
-        return pwd_context.hash(password)
+    def __init__(self, pool: PasswordHashingPool = hashing_pool) -> None:
+        self.pool = pool
+
+    async def hash(self, password: str) -> str:
+        return await self.pool.run(pwd_context.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self.pool.run(pwd_context.verify, password, hashed)
 
-    def verify(self, password: str, hashed: str) -> bool:
-        return pwd_context.verify(password, hashed)
+    async def verify_and_update(self, password: str, hashed: str) -> tuple[bool, str | None]:
+        return await self.pool.run(pwd_context.verify_and_update, password, hashed)
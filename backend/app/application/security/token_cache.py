@@ -0,0 +1,60 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.application.settings import settings
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of access tokens that already passed signature verification.
+
+    Keyed by the token's SHA-256 digest, so raw tokens are not kept in memory.
+    An entry lives until the token's ``exp`` but at most ``max_age`` seconds,
+    which also bounds how long a token is trusted without re-checking it.
+    """
+
+    def __init__(self, max_size: int = 10_000, max_age: float = 300) -> None:
+        self._entries: OrderedDict[bytes, tuple[float, int]] = OrderedDict()
+        self._max_size = max_size
+        self._max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> int | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, token: str, user_id: int, expires_at: float | None) -> None:
+        if self._max_size <= 0:
+            return
+        deadline = time.time() + self._max_age
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        key = self._key(token)
+        self._entries[key] = (deadline, user_id)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, Any]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+verified_tokens = VerifiedTokenCache(
+    max_size=settings.auth_token_cache_size,
+    max_age=settings.auth_token_cache_ttl_seconds,
+)
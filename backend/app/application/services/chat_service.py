@@ -1,5 +1,6 @@
 import uuid
-from datetime import datetime
+from collections.abc import Sequence
+from datetime import datetime, timezone
 from typing import List
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,17 +8,30 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.application.dto.attachment_dto import AttachmentCreateDTO
 from app.application.dto.conversation_dto import ConversationCreateDTO
 from app.application.dto.message_dto import MessageCreateDTO, MessageUpdateDTO
+from app.application.membership_cache import MembershipCache
+from app.application.pagination import Page, decode_cursor, encode_cursor
+from app.application.response_cache import ResponseCache, conversation_tag, participants_tag, user_tag
 from app.domain.entities.attachment import Attachment
 from app.domain.entities.conversation import Conversation
-from app.domain.entities.message import Message
+from app.domain.entities.inbox import InboxEntry
+from app.domain.entities.message import Message, MessageSearchHit, new_message_id
 from app.domain.entities.participant import Participant
+from app.domain.entities.read_watermark import ReadWatermark
 from app.domain.repositories.attachment_repository import AttachmentRepository
 from app.domain.repositories.conversation_repository import ConversationRepository
-from app.domain.repositories.message_repository import MessageRepository
-from app.domain.repositories.participant_repository import ParticipantRepository
+from app.domain.repositories.inbox_repository import InboxRepository
+from app.domain.repositories.message_repository import MessageRepository, MessageWriter
+from app.domain.repositories.participant_repository import ParticipantRepository, ReadWatermarkWriter
 from app.domain.enums.participant_type import ParticipantRole
 
 
+def to_naive_utc(value: datetime | None) -> datetime | None:
+    """created_at is stored as naive UTC; aware datetimes from clients are converted to match."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
 class ChatService:
     def __init__(
         self,
@@ -26,14 +40,24 @@ class ChatService:
         participant_repo: ParticipantRepository,
         message_repo: MessageRepository,
         attachment_repo: AttachmentRepository,
+        inbox_repo: InboxRepository,
         max_attachment_size: int = 20 * 1024 * 1024,
+        message_writer: MessageWriter | None = None,
+        membership_cache: MembershipCache | None = None,
+        read_watermarks: ReadWatermarkWriter | None = None,
+        response_cache: ResponseCache | None = None,
     ):
         self.session = session
         self.conversation_repo = conversation_repo
         self.participant_repo = participant_repo
         self.message_repo = message_repo
         self.attachment_repo = attachment_repo
+        self.inbox_repo = inbox_repo
         self.max_attachment_size = max_attachment_size
+        self.message_writer = message_writer
+        self.membership_cache = membership_cache
+        self.read_watermarks = read_watermarks
+        self.response_cache = response_cache
 
     async def create_conversation(self, creator_id: int, dto: ConversationCreateDTO) -> Conversation:
         conversation = Conversation(
@@ -43,33 +67,82 @@ class ChatService:
             created_at=datetime.utcnow(),
         )
         conversation = await self.conversation_repo.create(conversation)
+        joined_at = datetime.utcnow()
         # creator is admin
-        await self.participant_repo.add(
+        participants = [
             Participant(
                 id=None,
                 conversation_id=conversation.id,
                 user_id=creator_id,
                 role=ParticipantRole.admin,
-                joined_at=datetime.utcnow(),
+                joined_at=joined_at,
             )
-        )
-        for participant_id in set(dto.participant_ids):
+        ]
+        for participant_id in dict.fromkeys(dto.participant_ids):
             if participant_id == creator_id:
                 continue
-            await self.participant_repo.add(
+            participants.append(
                 Participant(
                     id=None,
                     conversation_id=conversation.id,
                     user_id=participant_id,
                     role=ParticipantRole.member,
-                    joined_at=datetime.utcnow(),
+                    joined_at=joined_at,
                 )
             )
+        await self.participant_repo.add_many(participants)
+        await self.inbox_repo.sync_members(conversation.id)
         await self.session.commit()
+        await self._invalidate_responses(*(user_tag(participant.user_id) for participant in participants))
         return conversation
 
-    async def list_conversations(self, user_id: int):
-        return await self.conversation_repo.list_for_user(user_id)
+    async def list_conversations(
+        self,
+        user_id: int,
+        limit: int = 50,
+        before: str | None = None,
+    ) -> Page[InboxEntry]:
+        """Conversation list from the inbox table, most recently active first."""
+        cursor = decode_cursor(before) if before else None
+        rows = list(await self.inbox_repo.list_for_user(user_id, limit + 1, before=cursor))
+        items = rows[:limit]
+        page = Page(items=items)
+        if len(rows) > limit:
+            page.next_cursor = encode_cursor(items[-1].last_activity_at, items[-1].id)
+        return page
+
+    async def mark_conversation_read(
+        self,
+        user_id: int,
+        conversation_id: uuid.UUID,
+        message_id: uuid.UUID | None = None,
+    ) -> None:
+        """
+        Advance the user's read watermark to the last read message. Its
+        created_at is read from the row, never taken from the client, so only
+        messages that exist in the conversation can be marked read. Without a
+        position, everything up to now is read.
+        """
+        await self._ensure_is_participant(user_id, conversation_id)
+        read_at = None
+        if message_id is not None:
+            read_at = await self.message_repo.get_created_at(conversation_id, message_id)
+            if read_at is None:
+                raise ValueError("Message not found")
+        now = datetime.utcnow()
+        watermark = ReadWatermark(
+            conversation_id=conversation_id,
+            user_id=user_id,
+            read_at=min(read_at, now) if read_at is not None else now,
+            message_id=message_id,
+        )
+        if self.read_watermarks is not None:
+            self.read_watermarks.advance(watermark)
+            return
+        await self.participant_repo.advance_read_many([watermark])
+        await self.inbox_repo.recount_unread([watermark])
+        await self.session.commit()
+        await self._invalidate_responses(*self.read_watermark_tags([watermark]))
 
     async def get_conversation(self, user_id: int, conversation_id: uuid.UUID):
         await self._ensure_is_participant(user_id, conversation_id)
@@ -81,19 +154,27 @@ class ChatService:
     async def rename_conversation(self, user_id: int, conversation_id: uuid.UUID, title: str | None):
         await self._ensure_is_admin(user_id, conversation_id)
         conversation = await self.conversation_repo.update_title(conversation_id, title)
+        await self.inbox_repo.refresh(conversation_id)
         await self.session.commit()
+        await self._invalidate_responses(conversation_tag(conversation_id))
         return conversation
 
     async def delete_conversation(self, user_id: int, conversation_id: uuid.UUID):
         await self._ensure_is_admin(user_id, conversation_id)
         await self.conversation_repo.delete(conversation_id)
         await self.session.commit()
+        await self._invalidate_membership(conversation_id)
+        await self._invalidate_responses(conversation_tag(conversation_id), participants_tag(conversation_id))
 
-    async def add_participant(self, user_id: int, conversation_id: uuid.UUID, target_user_id: int):
+    async def add_participant(
+        self,
+        user_id: int,
+        conversation_id: uuid.UUID,
+        target_user_id: int,
+        role: ParticipantRole | None = None,
+    ):
         await self._ensure_is_admin(user_id, conversation_id)
-        existing = await self.participant_repo.get(conversation_id, target_user_id)
-        if existing:
-            return existing
+        # upsert: re-adding an existing member returns the current membership
         participant = await self.participant_repo.add(
             Participant(
                 id=None,
@@ -103,51 +184,137 @@ class ChatService:
                 joined_at=datetime.utcnow(),
             )
         )
+        if role is not None:
+            participant = await self.participant_repo.update_role(conversation_id, target_user_id, role)
+        await self.inbox_repo.sync_members(conversation_id)
         await self.session.commit()
+        await self._invalidate_membership(conversation_id, target_user_id)
+        await self._invalidate_members(conversation_id, target_user_id)
         return participant
 
     async def remove_participant(self, user_id: int, conversation_id: uuid.UUID, target_user_id: int):
         await self._ensure_is_admin(user_id, conversation_id)
         await self.participant_repo.remove(conversation_id, target_user_id)
+        await self.inbox_repo.sync_members(conversation_id)
         await self.session.commit()
+        await self._invalidate_membership(conversation_id, target_user_id)
+        await self._invalidate_members(conversation_id, target_user_id)
 
     async def send_message(self, user_id: int, dto: MessageCreateDTO) -> Message:
         await self._ensure_is_participant(user_id, dto.conversation_id)
+        if self.message_writer is not None:
+            # end the read transaction so the pooled connection is free while the batch is pending
+            await self.session.commit()
+        # created_at is taken with no await before the write is queued, so
+        # batched inserts keep the same order as their timestamps
+        created_at = datetime.utcnow()
         message = Message(
-            id=uuid.uuid4(),
+            id=new_message_id(created_at),
             conversation_id=dto.conversation_id,
             sender_id=user_id,
             text=dto.text,
             reply_to=dto.reply_to,
             is_edited=False,
-            created_at=datetime.utcnow(),
+            created_at=created_at,
         )
-        message = await self.message_repo.create(message)
-        await self.session.commit()
+        if self.message_writer is not None:
+            message = await self.message_writer.write(message)
+        else:
+            message = await self.message_repo.create(message)
+            await self.inbox_repo.record_messages([message])
+            await self.session.commit()
+        await self._invalidate_responses(conversation_tag(message.conversation_id))
         return message
 
-    async def list_messages(self, user_id: int, conversation_id: uuid.UUID, limit: int = 50, offset: int = 0):
+    async def list_messages(
+        self,
+        user_id: int,
+        conversation_id: uuid.UUID,
+        limit: int = 50,
+        offset: int = 0,
+        before: str | None = None,
+        after: str | None = None,
+    ) -> Page[Message]:
         await self._ensure_is_participant(user_id, conversation_id)
-        return await self.message_repo.list_for_conversation(conversation_id, limit, offset)
+        if before and after:
+            raise ValueError("Use either before or after cursor")
+        # one extra row tells whether there is another page in the paging direction
+        if before:
+            rows = list(await self.message_repo.list_page(conversation_id, limit + 1, before=decode_cursor(before)))
+            has_more = len(rows) > limit
+            items = rows[1:] if has_more else rows
+            page = Page(items=items)
+            if items:
+                page.next_cursor = self._cursor(items[-1])
+                page.prev_cursor = self._cursor(items[0]) if has_more else None
+            return page
+        if after:
+            rows = list(await self.message_repo.list_page(conversation_id, limit + 1, after=decode_cursor(after)))
+        else:
+            # legacy offset paging, kept for existing clients
+            rows = list(await self.message_repo.list_for_conversation(conversation_id, limit + 1, offset))
+        has_more = len(rows) > limit
+        items = rows[:limit]
+        page = Page(items=items)
+        if items:
+            page.next_cursor = self._cursor(items[-1]) if has_more else None
+            page.prev_cursor = self._cursor(items[0]) if after or offset else None
+        return page
 
-    async def update_message(self, user_id: int, message_id: uuid.UUID, dto: MessageUpdateDTO):
-        message = await self.message_repo.get(message_id)
-        if not message:
+    async def search_messages(
+        self,
+        user_id: int,
+        conversation_id: uuid.UUID,
+        query: str,
+        limit: int = 20,
+        sender_id: int | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        before: str | None = None,
+    ) -> Page[MessageSearchHit]:
+        await self._ensure_is_participant(user_id, conversation_id)
+        if not query.strip():
+            raise ValueError("Search query is empty")
+        cursor = decode_cursor(before) if before else None
+        rows = list(await self.message_repo.search(
+            conversation_id,
+            query,
+            limit + 1,
+            sender_id=sender_id,
+            since=to_naive_utc(since),
+            until=to_naive_utc(until),
+            before=cursor,
+        ))
+        items = rows[:limit]
+        page = Page(items=items)
+        if len(rows) > limit:
+            page.next_cursor = self._cursor(items[-1])
+        return page
+
+    async def update_message(self, user_id: int, message_id: uuid.UUID, dto: MessageUpdateDTO) -> Message:
+        updated = await self.message_repo.update_text(message_id, user_id, dto.text)
+        if not updated:
+            # only the failure path pays for telling "missing" from "not yours"
+            if await self.message_repo.get(message_id):
+                raise PermissionError("Cannot edit another user's message")
             raise ValueError("Message not found")
-        if message.sender_id != user_id:
-            raise PermissionError("Cannot edit another user's message")
-        updated = await self.message_repo.update_text(message_id, dto.text)
+        await self.inbox_repo.update_preview(updated)
         await self.session.commit()
+        await self._invalidate_responses(conversation_tag(updated.conversation_id))
         return updated
 
-    async def delete_message(self, user_id: int, message_id: uuid.UUID):
-        message = await self.message_repo.get(message_id)
-        if not message:
-            return
-        if message.sender_id != user_id:
-            raise PermissionError("Cannot delete another user's message")
-        await self.message_repo.delete(message_id)
+    async def delete_message(self, user_id: int, message_id: uuid.UUID) -> Message | None:
+        """The deleted message, or None if it was already gone."""
+        deleted = await self.message_repo.delete(message_id, user_id)
+        if not deleted:
+            if await self.message_repo.get(message_id):
+                raise PermissionError("Cannot delete another user's message")
+            return None
+        await self.inbox_repo.refresh(deleted.conversation_id)
+        await self.inbox_repo.recount_removed(deleted.conversation_id, deleted.created_at)
         await self.session.commit()
+        await self._invalidate_responses(conversation_tag(deleted.conversation_id))
+        return deleted
 
     async def attach_file(self, user_id: int, dto: AttachmentCreateDTO):
         message = await self.message_repo.get(dto.message_id)
@@ -168,21 +335,65 @@ class ChatService:
         await self.session.commit()
         return attachment
 
+    @staticmethod
+    def _cursor(message: Message) -> str:
+        return encode_cursor(message.created_at, message.id)
+
     async def _ensure_is_admin(self, user_id: int, conversation_id: uuid.UUID):
-        participant = await self.participant_repo.get(conversation_id, user_id)
-        if not participant:
+        role = await self._role(user_id, conversation_id)
+        if role is None:
             raise PermissionError("User is not participant of the conversation")
-        if participant.role != ParticipantRole.admin:
+        if role != ParticipantRole.admin:
             raise PermissionError("User is not admin of the conversation")
 
     async def _ensure_is_participant(self, user_id: int, conversation_id: uuid.UUID):
+        if await self._role(user_id, conversation_id) is None:
+            raise PermissionError("User is not participant of the conversation")
+
+    async def _role(self, user_id: int, conversation_id: uuid.UUID) -> ParticipantRole | None:
+        generation = 0
+        if self.membership_cache is not None:
+            role = self.membership_cache.get(conversation_id, user_id)
+            if role is not None:
+                return role
+            # taken before the lookup, so an invalidation that lands meanwhile keeps the row out
+            generation = self.membership_cache.generation
         participant = await self.participant_repo.get(conversation_id, user_id)
         if not participant:
-            raise PermissionError("User is not participant of the conversation")
+            return None
+        if self.membership_cache is not None:
+            self.membership_cache.put(conversation_id, user_id, participant.role, since=generation)
+        return participant.role
+
+    async def _invalidate_membership(self, conversation_id: uuid.UUID, user_id: int | None = None):
+        # after commit, so no worker can re-read the old row into the cache
+        if self.membership_cache is not None:
+            await self.membership_cache.invalidate(conversation_id, user_id)
+
+    async def _invalidate_members(self, conversation_id: uuid.UUID, user_id: int):
+        # the user's list gains or loses the conversation; the others' lists and the member list change
+        await self._invalidate_responses(
+            user_tag(user_id), conversation_tag(conversation_id), participants_tag(conversation_id)
+        )
+
+    async def _invalidate_responses(self, *tags: str):
+        # after commit, like the membership cache
+        if self.response_cache is not None:
+            await self.response_cache.invalidate(*tags)
+
+    @staticmethod
+    def read_watermark_tags(watermarks: Sequence[ReadWatermark]) -> list[str]:
+        """Cached responses a flushed watermark changes: the reader's unread counts and the member list."""
+        tags = {user_tag(watermark.user_id) for watermark in watermarks}
+        tags.update(participants_tag(watermark.conversation_id) for watermark in watermarks)
+        return list(tags)
 
     # Public helper for WebSocket / other layers
     async def ensure_participant(self, user_id: int, conversation_id: uuid.UUID) -> None:
         await self._ensure_is_participant(user_id, conversation_id)
 
+    async def list_conversation_ids(self, user_id: int) -> List[uuid.UUID]:
+        return list(await self.participant_repo.list_conversation_ids_for_user(user_id))
+
     async def participants_by_conversations(self, conversation_id: uuid.UUID) -> List[Participant]:
         return await self.participant_repo.list_by_conversation(conversation_id)
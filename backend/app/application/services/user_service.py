@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.security.interfaces import PasswordHasher
 from app.domain.entities.participant import Participant
-from app.domain.entities.user import User
+from app.domain.entities.user import User, UserSummary
 from app.domain.enums.participant_type import ParticipantRole
 from app.domain.repositories.user_repository import UserRepository
 from app.application.dto import user_dto
@@ -26,7 +26,7 @@ class UserService:
         self.max_attachment_size = max_attachment_size
 
     async def register(self, dto: user_dto.UserRegisterDTO) -> User:
-        password = self.password_hasher.hash(password=dto.password)
+        password = await self.password_hasher.hash(password=dto.password)
         user = User(
             id=None,
             username=dto.username,
@@ -36,5 +36,20 @@ class UserService:
         )
         await self.user_repo.create(user)
 
-    async def get_users_by_username_email(self, username: str) -> List[User]:
-        return await self.user_repo.get_users_by_username_email(username=username)
+    async def authenticate(self, username: str, password: str) -> User:
+        """The user with these credentials; upgrades the stored hash if its cost factor is outdated."""
+        user = await self.user_repo.get_user_by_username_email(username)
+        if not user:
+            raise ValueError("User not found")
+        verified, new_hash = await self.password_hasher.verify_and_update(password, user.password)
+        if not verified:
+            raise ValueError("Incorrect password")
+        if new_hash is not None:
+            await self.user_repo.update_password(user.id, new_hash)
+            await self.session.commit()
+        return user
+
+    async def search_users(self, term: str, limit: int = 20) -> List[UserSummary]:
+        if not term.strip():
+            return []
+        return list(await self.user_repo.search(term, limit))
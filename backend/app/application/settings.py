@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 from pathlib import Path
+from typing import Literal
 
 
 BASEDIR = Path(__file__).parent.parent
@@ -15,6 +16,55 @@ class Settings(BaseSettings):
     db_host: str = Field(alias="POSTGRES_HOST")
     db_port: int = Field(alias="POSTGRES_PORT")
     debug: bool = Field(alias="DEBUG")
+    # SQLAlchemy pool and asyncpg driver tuning; statement cache 0 turns off both the asyncpg and SQLAlchemy statement caches, as pgbouncer needs
+    db_pool_size: int = Field(default=10, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(default=30, alias="DB_POOL_TIMEOUT_SECONDS")
+    db_pool_pre_ping: bool = Field(default=True, alias="DB_POOL_PRE_PING")
+    db_pool_recycle_seconds: int = Field(default=1800, alias="DB_POOL_RECYCLE_SECONDS")
+    db_statement_cache_size: int = Field(default=100, alias="DB_STATEMENT_CACHE_SIZE")
+    db_statement_timeout_ms: int = Field(default=30_000, alias="DB_STATEMENT_TIMEOUT_MS")
+    # optional streaming replica for read-only endpoints, same credentials as the primary;
+    # a user's reads stay on the primary for the read-your-writes window after they write
+    db_replica_host: str | None = Field(default=None, alias="POSTGRES_REPLICA_HOST")
+    db_replica_port: int | None = Field(default=None, alias="POSTGRES_REPLICA_PORT")
+    read_your_writes_seconds: float = Field(default=5, alias="READ_YOUR_WRITES_SECONDS")
+    # "memory" for a single worker, "postgres" for LISTEN/NOTIFY fan-out between workers
+    ws_backplane: str = Field(default="memory", alias="WS_BACKPLANE")
+    # per-connection outbox; on overflow either drop the oldest frame or close the socket
+    ws_send_queue_size: int = Field(default=256, alias="WS_SEND_QUEUE_SIZE")
+    ws_overflow_policy: Literal["drop_oldest", "disconnect"] = Field(default="drop_oldest", alias="WS_OVERFLOW_POLICY")
+    # recent broadcast events kept per channel for lossless resume after a reconnect
+    ws_replay_buffer_size: int = Field(default=256, alias="WS_REPLAY_BUFFER_SIZE")
+    ws_replay_ttl_seconds: float = Field(default=60, alias="WS_REPLAY_TTL_SECONDS")
+    # typing indicators expire without new keystrokes and are re-announced at most once per throttle
+    ws_typing_ttl_seconds: float = Field(default=6, alias="WS_TYPING_TTL_SECONDS")
+    ws_typing_throttle_seconds: float = Field(default=3, alias="WS_TYPING_THROTTLE_SECONDS")
+    # app-level heartbeat: ping idle sockets, close them after the timeout without any frame
+    ws_ping_interval_seconds: float = Field(default=25, alias="WS_PING_INTERVAL_SECONDS")
+    ws_ping_timeout_seconds: float = Field(default=60, alias="WS_PING_TIMEOUT_SECONDS")
+    # opt-in group commit for message inserts
+    message_batching: bool = Field(default=False, alias="MESSAGE_BATCHING")
+    message_batch_size: int = Field(default=100, alias="MESSAGE_BATCH_SIZE")
+    message_batch_delay_ms: float = Field(default=5, alias="MESSAGE_BATCH_DELAY_MS")
+    # messages are partitioned by month; retention in days per conversation type, 0 keeps forever
+    message_partitions_ahead: int = Field(default=3, alias="MESSAGE_PARTITIONS_AHEAD")
+    message_retention_days_private: int = Field(default=0, alias="MESSAGE_RETENTION_DAYS_PRIVATE")
+    message_retention_days_group: int = Field(default=0, alias="MESSAGE_RETENTION_DAYS_GROUP")
+    # read watermarks are coalesced in memory and flushed (and receipts broadcast) at this interval
+    read_receipts_flush_ms: float = Field(default=1000, alias="READ_RECEIPTS_FLUSH_MS")
+    # membership/role cache used by permission checks; 0 disables it
+    membership_cache_size: int = Field(default=10_000, alias="MEMBERSHIP_CACHE_SIZE")
+    membership_cache_ttl_seconds: float = Field(default=30, alias="MEMBERSHIP_CACHE_TTL_SECONDS")
+    # verified access tokens, so each JWT is checked once until it expires (at most the TTL); 0 disables it
+    auth_token_cache_size: int = Field(default=10_000, alias="AUTH_TOKEN_CACHE_SIZE")
+    auth_token_cache_ttl_seconds: float = Field(default=300, alias="AUTH_TOKEN_CACHE_TTL_SECONDS")
+    # bcrypt cost factor (stored hashes with another cost are rehashed on login) and its thread pool size
+    bcrypt_rounds: int = Field(default=12, alias="BCRYPT_ROUNDS")
+    password_hash_workers: int = Field(default=2, alias="PASSWORD_HASH_WORKERS")
+    # serialized conversation/participant lists, invalidated on writes; 0 disables the cache
+    response_cache_max_bytes: int = Field(default=32 * 1024 * 1024, alias="RESPONSE_CACHE_MAX_BYTES")
+    response_cache_ttl_seconds: float = Field(default=60, alias="RESPONSE_CACHE_TTL_SECONDS")
 
     model_config = SettingsConfigDict(env_file=".env")
 
@@ -25,5 +75,12 @@ class Settings(BaseSettings):
         return (f"postgresql+asyncpg://{self.db_user}:{self.db_password}@{self.db_host}:"
                 f"{self.db_port}/{self.db_name}")
 
+    @property
+    def replica_database_url(self) -> str | None:
+        if not self.db_replica_host:
+            return None
+        return (f"postgresql+asyncpg://{self.db_user}:{self.db_password}@{self.db_replica_host}:"
+                f"{self.db_replica_port or self.db_port}/{self.db_name}")
+
 settings = Settings()
 
@@ -0,0 +1,19 @@
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+from app.domain.enums.conversation_type import ConversationType
+
+
+@dataclass(slots=True)
+class InboxEntry:
+    """One row of a user's conversation list; ``id`` is the conversation id."""
+
+    id: uuid.UUID
+    type: ConversationType
+    title: str | None
+    created_at: datetime
+    last_activity_at: datetime
+    unread_count: int = 0
+    last_message: Optional[dict[str, Any]] = None
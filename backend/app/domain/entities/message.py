@@ -1,8 +1,32 @@
+import secrets
 import uuid
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 
+_EPOCH = datetime(1970, 1, 1)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def new_message_id(created_at: datetime) -> uuid.UUID:
+    """
+    Time-ordered (version 7) UUID carrying ``created_at`` to the millisecond,
+    so a message id alone tells which monthly partition holds the row.
+    """
+    millis = (created_at - _EPOCH) // _MILLISECOND
+    value = millis << 80 | 0x7 << 76 | secrets.randbits(12) << 64 | 0b10 << 62 | secrets.randbits(62)
+    return uuid.UUID(int=value)
+
+
+def message_id_time(message_id: uuid.UUID) -> datetime | None:
+    """The millisecond ``new_message_id`` encoded; None for ids from before it (random UUIDs)."""
+    if message_id.version != 7:
+        return None
+    try:
+        return _EPOCH + (message_id.int >> 80) * _MILLISECOND
+    except OverflowError:
+        return None
+
 
 @dataclass(slots=True)
 class Message:
@@ -15,3 +39,10 @@ class Message:
     created_at: datetime
     avatar: Optional[str] = None
     username: Optional[str] = None
+
+
+@dataclass(slots=True)
+class MessageSearchHit(Message):
+    """A message matched by full-text search, with highlighted matches in ``snippet``."""
+
+    snippet: Optional[str] = None
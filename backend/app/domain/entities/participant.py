@@ -15,3 +15,5 @@ class Participant:
     joined_at: datetime
     username: Optional[str] = None
     avatar: Optional[str] = None
+    last_read_at: Optional[datetime] = None
+    last_read_message_id: Optional[uuid.UUID] = None
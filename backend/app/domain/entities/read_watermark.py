@@ -0,0 +1,13 @@
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(slots=True)
+class ReadWatermark:
+    """Everything in the conversation up to ``read_at`` has been read by the user."""
+
+    conversation_id: uuid.UUID
+    user_id: int
+    read_at: datetime
+    message_id: uuid.UUID | None = None
@@ -13,3 +13,12 @@ class User:
     password: Optional[str] = None
     avatar: Optional[str] = None
 
+
+@dataclass(slots=True)
+class UserSummary:
+    """Public projection of a user for search results."""
+
+    id: int
+    username: str
+    avatar: Optional[str] = None
+
@@ -1,6 +1,5 @@
 import uuid
 from abc import ABC, abstractmethod
-from typing import Sequence
 
 from app.domain.entities.conversation import Conversation
 
@@ -12,9 +11,6 @@ class ConversationRepository(ABC):
     @abstractmethod
     async def get(self, conversation_id: uuid.UUID) -> Conversation | None: ...
 
-    @abstractmethod
-    async def list_for_user(self, user_id: int) -> Sequence[Conversation]: ...
-
     @abstractmethod
     async def update_title(self, conversation_id: uuid.UUID, title: str | None) -> Conversation | None: ...
 
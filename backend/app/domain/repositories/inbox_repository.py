@@ -0,0 +1,36 @@
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Sequence
+
+from app.domain.entities.inbox import InboxEntry
+from app.domain.entities.message import Message
+from app.domain.entities.read_watermark import ReadWatermark
+
+
+class InboxRepository(ABC):
+    @abstractmethod
+    async def sync_members(self, conversation_id: uuid.UUID) -> None: ...
+
+    @abstractmethod
+    async def refresh(self, conversation_id: uuid.UUID) -> None: ...
+
+    @abstractmethod
+    async def record_messages(self, messages: Sequence[Message]) -> None: ...
+
+    @abstractmethod
+    async def update_preview(self, message: Message) -> None: ...
+
+    @abstractmethod
+    async def list_for_user(
+        self,
+        user_id: int,
+        limit: int,
+        before: tuple[datetime, uuid.UUID] | None = None,
+    ) -> Sequence[InboxEntry]: ...
+
+    @abstractmethod
+    async def recount_unread(self, watermarks: Sequence[ReadWatermark]) -> None: ...
+
+    @abstractmethod
+    async def recount_removed(self, conversation_id: uuid.UUID, created_at: datetime) -> None: ...
@@ -1,23 +1,59 @@
 import uuid
 from abc import ABC, abstractmethod
+from datetime import datetime
 from typing import Sequence
 
-from app.domain.entities.message import Message
+from app.domain.entities.message import Message, MessageSearchHit
 
 
 class MessageRepository(ABC):
     @abstractmethod
     async def create(self, message: Message) -> Message: ...
 
+    @abstractmethod
+    async def create_many(self, messages: Sequence[Message]) -> Sequence[Message]: ...
+
     @abstractmethod
     async def list_for_conversation(self, conversation_id: uuid.UUID, limit: int, offset: int) -> Sequence[Message]: ...
 
+    @abstractmethod
+    async def list_page(
+        self,
+        conversation_id: uuid.UUID,
+        limit: int,
+        before: tuple[datetime, uuid.UUID] | None = None,
+        after: tuple[datetime, uuid.UUID] | None = None,
+    ) -> Sequence[Message]: ...
+
+    @abstractmethod
+    async def search(
+        self,
+        conversation_id: uuid.UUID,
+        query: str,
+        limit: int,
+        sender_id: int | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        before: tuple[datetime, uuid.UUID] | None = None,
+    ) -> Sequence[MessageSearchHit]: ...
+
     @abstractmethod
     async def get(self, message_id: uuid.UUID) -> Message | None: ...
 
     @abstractmethod
-    async def update_text(self, message_id: uuid.UUID, text: str) -> Message | None: ...
+    async def get_created_at(self, conversation_id: uuid.UUID, message_id: uuid.UUID) -> datetime | None: ...
 
     @abstractmethod
-    async def delete(self, message_id: uuid.UUID) -> None: ...
+    async def update_text(self, message_id: uuid.UUID, sender_id: int, text: str) -> Message | None:
+        """Edit the message if ``sender_id`` wrote it; None if there is no such message of theirs."""
 
+    @abstractmethod
+    async def delete(self, message_id: uuid.UUID, sender_id: int) -> Message | None:
+        """Delete the message if ``sender_id`` wrote it and return it; None if there is no such message of theirs."""
+
+
+class MessageWriter(ABC):
+    """Persists a message outside of the caller's session and transaction."""
+
+    @abstractmethod
+    async def write(self, message: Message) -> Message: ...
@@ -3,6 +3,7 @@ from abc import ABC, abstractmethod
 from typing import Sequence
 
 from app.domain.entities.participant import Participant
+from app.domain.entities.read_watermark import ReadWatermark
 from app.domain.enums.participant_type import ParticipantRole
 
 
@@ -10,9 +11,15 @@ class ParticipantRepository(ABC):
     @abstractmethod
     async def add(self, participant: Participant) -> Participant: ...
 
+    @abstractmethod
+    async def add_many(self, participants: Sequence[Participant]) -> Sequence[Participant]: ...
+
     @abstractmethod
     async def list_by_conversation(self, conversation_id: uuid.UUID) -> Sequence[Participant]: ...
 
+    @abstractmethod
+    async def list_conversation_ids_for_user(self, user_id: int) -> Sequence[uuid.UUID]: ...
+
     @abstractmethod
     async def get(self, conversation_id: uuid.UUID, user_id: int) -> Participant | None: ...
 
@@ -22,3 +29,14 @@ class ParticipantRepository(ABC):
     @abstractmethod
     async def update_role(self, conversation_id: uuid.UUID, user_id: int, role: ParticipantRole) -> Participant | None: ...
 
+    @abstractmethod
+    async def advance_read_many(self, watermarks: Sequence[ReadWatermark]) -> None:
+        """Move read watermarks forward; a watermark never moves back."""
+
+
+class ReadWatermarkWriter(ABC):
+    """Records read watermarks outside of the caller's transaction, coalescing repeated updates."""
+
+    @abstractmethod
+    def advance(self, watermark: ReadWatermark) -> None: ...
+
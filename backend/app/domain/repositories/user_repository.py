@@ -2,7 +2,7 @@ import uuid
 from abc import ABC, abstractmethod
 from typing import Sequence
 
-from app.domain.entities.user import User
+from app.domain.entities.user import User, UserSummary
 
 
 class UserRepository(ABC):
@@ -13,7 +13,10 @@ class UserRepository(ABC):
     async def get_user_by_username_email(self, username: str) -> User: ...
 
     @abstractmethod
-    async def get_users_by_username_email(self, username: str) -> Sequence[User]: ...
+    async def search(self, term: str, limit: int) -> Sequence[UserSummary]: ...
 
     @abstractmethod
     async def get_user_by_id(self, id: int) -> User: ...
+
+    @abstractmethod
+    async def update_password(self, user_id: int, password: str) -> None: ...
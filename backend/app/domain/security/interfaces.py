@@ -4,9 +4,14 @@ from abc import ABC, abstractmethod
 class PasswordHasher(ABC):
 
     @abstractmethod
-    def hash(self, password: str) -> str:
+    async def hash(self, password: str) -> str:
         ...
 
     @abstractmethod
-    def verify(self, password: str, hashed: str) -> bool:
+    async def verify(self, password: str, hashed: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def verify_and_update(self, password: str, hashed: str) -> tuple[bool, str | None]:
+        """Like verify, plus a new hash when the stored one uses outdated parameters."""
         ...
@@ -0,0 +1,50 @@
+"""messages default partition
+
+Revision ID: 1d7e3b9f5a42
+Revises: 8c2f4a6d1e35
+Create Date: 2026-10-19 13:02:47.113905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d7e3b9f5a42'
+down_revision: Union[str, None] = '8c2f4a6d1e35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # catches inserts past the last monthly partition instead of failing them;
+    # maintenance moves such rows out when it creates their month
+    op.execute('CREATE TABLE IF NOT EXISTS messages_default PARTITION OF messages DEFAULT')
+    # moving rows between partitions deletes and re-inserts them, which must not drop their attachments
+    op.execute("""
+        CREATE OR REPLACE FUNCTION messages_delete_attachments() RETURNS trigger AS $$
+        BEGIN
+            IF current_setting('messages.moving_partition', true) = 'on' THEN
+                RETURN OLD;
+            END IF;
+            DELETE FROM attachments WHERE message_id = OLD.id;
+            RETURN OLD;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION messages_delete_attachments() RETURNS trigger AS $$
+        BEGIN
+            DELETE FROM attachments WHERE message_id = OLD.id;
+            RETURN OLD;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    # rows in the default partition are dropped with it; run maintenance first to move them out
+    op.execute('DROP TABLE messages_default')
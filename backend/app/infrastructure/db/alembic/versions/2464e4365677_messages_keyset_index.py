@@ -0,0 +1,41 @@
+"""messages keyset index
+
+Revision ID: 2464e4365677
+Revises: 964ba23c6f5c
+Create Date: 2026-10-18 21:10:12.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2464e4365677'
+down_revision: Union[str, None] = '964ba23c6f5c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # built concurrently so a large messages table stays writable
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_messages_conversation_id_created_at_id',
+            'messages',
+            ['conversation_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_messages_conversation_id_created_at_id',
+            table_name='messages',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,53 @@
+"""read watermarks
+
+Revision ID: 3a8c5e1d7f60
+Revises: e61f0a4b7d92
+Create Date: 2026-10-19 01:05:38.274119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a8c5e1d7f60'
+down_revision: Union[str, None] = 'e61f0a4b7d92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = 'ix_messages_conversation_id_created_at_sender_id'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('conversation_participants', sa.Column('last_read_at', sa.DateTime(), nullable=True))
+    op.add_column('conversation_participants', sa.Column('last_read_message_id', sa.UUID(), nullable=True))
+    # inbox unread counters start at zero, so existing history counts as read
+    op.execute("UPDATE conversation_participants SET last_read_at = now() AT TIME ZONE 'utc'")
+
+    # covering index for index-only unread counts; on a partitioned table it is
+    # created on the parent only, built concurrently per partition and attached
+    op.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX} ON ONLY messages (conversation_id, created_at) INCLUDE (sender_id)'
+    )
+    partitions = op.get_bind().execute(sa.text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = 'messages'::regclass"
+    )).scalars().all()
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_conversation_id_created_at_sender_id '
+                f'ON {partition} (conversation_id, created_at) INCLUDE (sender_id)'
+            )
+            op.execute(f'ALTER INDEX {INDEX} ATTACH PARTITION {partition}_conversation_id_created_at_sender_id')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f'DROP INDEX IF EXISTS {INDEX}')
+    op.drop_column('conversation_participants', 'last_read_message_id')
+    op.drop_column('conversation_participants', 'last_read_at')
@@ -0,0 +1,40 @@
+"""user search indexes
+
+Revision ID: 5f2a7d6c8e41
+Revises: c4e8a1f09b37
+Create Date: 2026-10-18 23:28:40.116502
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2a7d6c8e41'
+down_revision: Union[str, None] = 'c4e8a1f09b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # built concurrently so registrations are not blocked
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_username_trgm '
+            'ON users USING gin (lower(username) gin_trgm_ops)'
+        )
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_username_prefix '
+            'ON users (lower(username) text_pattern_ops)'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_users_username_prefix')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_users_username_trgm')
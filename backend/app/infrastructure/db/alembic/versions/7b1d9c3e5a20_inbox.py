@@ -0,0 +1,79 @@
+"""inbox
+
+Revision ID: 7b1d9c3e5a20
+Revises: 2464e4365677
+Create Date: 2026-10-18 22:34:51.207118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1d9c3e5a20'
+down_revision: Union[str, None] = '2464e4365677'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('inbox',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('conversation_id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('last_message_id', sa.UUID(), nullable=True),
+    sa.Column('last_message_sender_id', sa.Integer(), nullable=True),
+    sa.Column('last_message_text', sa.Text(), nullable=True),
+    sa.Column('last_message_at', sa.DateTime(), nullable=True),
+    sa.Column('last_activity_at', sa.DateTime(), nullable=False),
+    sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'conversation_id')
+    )
+    op.create_index(
+        'ix_inbox_user_id_last_activity_at_conversation_id',
+        'inbox',
+        ['user_id', 'last_activity_at', 'conversation_id'],
+        unique=False,
+    )
+    # backfill from existing conversations; unread counts start at zero
+    op.execute("""
+        INSERT INTO inbox (
+            user_id, conversation_id, title,
+            last_message_id, last_message_sender_id, last_message_text, last_message_at,
+            last_activity_at
+        )
+        SELECT
+            cp.user_id,
+            c.id,
+            CASE WHEN c.type = 'private' THEN partner.username ELSE c.title END,
+            lm.id, lm.sender_id, left(lm.text, 200), lm.created_at,
+            COALESCE(lm.created_at, c.created_at)
+        FROM conversation_participants cp
+        JOIN conversations c ON c.id = cp.conversation_id
+        LEFT JOIN LATERAL (
+            SELECT m.id, m.sender_id, m.text, m.created_at
+            FROM messages m
+            WHERE m.conversation_id = c.id
+            ORDER BY m.created_at DESC, m.id DESC
+            LIMIT 1
+        ) lm ON true
+        LEFT JOIN LATERAL (
+            SELECT u.username
+            FROM conversation_participants other
+            JOIN users u ON u.id = other.user_id
+            WHERE other.conversation_id = c.id AND other.user_id <> cp.user_id
+            LIMIT 1
+        ) partner ON true
+        ON CONFLICT DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_inbox_user_id_last_activity_at_conversation_id', table_name='inbox')
+    op.drop_table('inbox')
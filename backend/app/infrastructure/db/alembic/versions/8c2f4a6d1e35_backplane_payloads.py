@@ -0,0 +1,38 @@
+"""backplane payloads
+
+Revision ID: 8c2f4a6d1e35
+Revises: 3a8c5e1d7f60
+Create Date: 2026-10-19 12:40:11.508316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2f4a6d1e35'
+down_revision: Union[str, None] = '3a8c5e1d7f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # unlogged: rows live for a minute and are worthless after a crash
+    op.create_table(
+        'backplane_payloads',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        prefixes=['UNLOGGED'],
+    )
+    op.create_index('ix_backplane_payloads_created_at', 'backplane_payloads', ['created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_backplane_payloads_created_at', table_name='backplane_payloads')
+    op.drop_table('backplane_payloads')
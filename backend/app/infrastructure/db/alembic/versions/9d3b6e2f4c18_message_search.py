@@ -0,0 +1,52 @@
+"""message search
+
+Revision ID: 9d3b6e2f4c18
+Revises: 5f2a7d6c8e41
+Create Date: 2026-10-18 23:51:06.502841
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3b6e2f4c18'
+down_revision: Union[str, None] = '5f2a7d6c8e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # btree_gin lets conversation_id live in the same GIN index as the document
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+    # a stored generated column rewrites messages once; run it in a maintenance window
+    op.add_column('messages', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('simple', coalesce(text, ''))", persisted=True),
+        nullable=True,
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_messages_conversation_id_search_vector',
+            'messages',
+            ['conversation_id', 'search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_messages_conversation_id_search_vector',
+            table_name='messages',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('messages', 'search_vector')
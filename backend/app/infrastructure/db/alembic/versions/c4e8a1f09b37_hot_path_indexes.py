@@ -0,0 +1,65 @@
+"""hot path indexes
+
+Revision ID: c4e8a1f09b37
+Revises: 7b1d9c3e5a20
+Create Date: 2026-10-18 23:02:17.845330
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f09b37'
+down_revision: Union[str, None] = '7b1d9c3e5a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# messages.conversation_id is already served by ix_messages_conversation_id_created_at_id
+INDEXES = [
+    ('ix_conversation_participants_user_id', 'conversation_participants', ['user_id']),
+    ('ix_attachments_message_id', 'attachments', ['message_id']),
+    ('ix_inbox_conversation_id', 'inbox', ['conversation_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the unique constraint below would fail on memberships duplicated by the old check-then-insert
+    op.execute("""
+        DELETE FROM conversation_participants cp
+        USING conversation_participants dup
+        WHERE cp.conversation_id = dup.conversation_id
+          AND cp.user_id = dup.user_id
+          AND cp.id > dup.id
+    """)
+    # built concurrently so the tables stay writable
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_conversation_participants_conversation_id_user_id',
+            'conversation_participants',
+            ['conversation_id', 'user_id'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+    op.execute(
+        'ALTER TABLE conversation_participants '
+        'ADD CONSTRAINT uq_conversation_participants_conversation_id_user_id '
+        'UNIQUE USING INDEX uq_conversation_participants_conversation_id_user_id'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        'uq_conversation_participants_conversation_id_user_id',
+        'conversation_participants',
+        type_='unique',
+    )
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
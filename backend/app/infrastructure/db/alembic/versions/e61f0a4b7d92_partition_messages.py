@@ -0,0 +1,135 @@
+"""partition messages by month
+
+Revision ID: e61f0a4b7d92
+Revises: 9d3b6e2f4c18
+Create Date: 2026-10-19 00:24:13.690517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e61f0a4b7d92'
+down_revision: Union[str, None] = '9d3b6e2f4c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = 'id, conversation_id, sender_id, text, reply_to, is_edited, created_at'
+
+# partitions created up front; later months come from app.infrastructure.db.maintenance
+MONTHS_AHEAD = 3
+
+
+def _create_indexes() -> None:
+    op.create_index(
+        'ix_messages_conversation_id_created_at_id',
+        'messages',
+        ['conversation_id', 'created_at', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_messages_conversation_id_search_vector',
+        'messages',
+        ['conversation_id', 'search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # rewrites the whole table: run in a maintenance window
+    op.drop_constraint('attachments_message_id_fkey', 'attachments', type_='foreignkey')
+    op.drop_index('ix_messages_conversation_id_created_at_id', table_name='messages')
+    op.drop_index('ix_messages_conversation_id_search_vector', table_name='messages')
+    op.rename_table('messages', 'messages_legacy')
+    op.execute('ALTER TABLE messages_legacy RENAME CONSTRAINT messages_pkey TO messages_legacy_pkey')
+
+    op.execute("""
+        CREATE TABLE messages (
+            id UUID NOT NULL,
+            conversation_id UUID NOT NULL REFERENCES conversations (id) ON DELETE CASCADE,
+            sender_id INTEGER NOT NULL REFERENCES users (id) ON DELETE RESTRICT,
+            text TEXT,
+            reply_to UUID,
+            is_edited BOOLEAN NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', coalesce(text, ''))) STORED,
+            CONSTRAINT messages_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    # one partition per month from the oldest message up to MONTHS_AHEAD months from now
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month timestamp := date_trunc('month', coalesce(
+                (SELECT min(created_at) FROM messages_legacy), now() AT TIME ZONE 'utc'));
+            last_month timestamp := date_trunc('month', now() AT TIME ZONE 'utc') + interval '{MONTHS_AHEAD} months';
+        BEGIN
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF messages FOR VALUES FROM (%L) TO (%L)',
+                    'messages_p' || to_char(month, 'YYYYMM'), month, month + interval '1 month'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END $$
+    """)
+    op.execute(f'INSERT INTO messages ({COLUMNS}) SELECT {COLUMNS} FROM messages_legacy')
+    _create_indexes()
+    op.drop_table('messages_legacy')
+
+    # partitioned tables cannot be the target of a foreign key
+    op.execute("""
+        CREATE FUNCTION messages_delete_attachments() RETURNS trigger AS $$
+        BEGIN
+            DELETE FROM attachments WHERE message_id = OLD.id;
+            RETURN OLD;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER messages_delete_attachments
+        AFTER DELETE ON messages
+        FOR EACH ROW EXECUTE FUNCTION messages_delete_attachments()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER messages_delete_attachments ON messages')
+    op.execute('DROP FUNCTION messages_delete_attachments()')
+    op.rename_table('messages', 'messages_partitioned')
+    op.execute('ALTER TABLE messages_partitioned RENAME CONSTRAINT messages_pkey TO messages_partitioned_pkey')
+    op.drop_index('ix_messages_conversation_id_created_at_id', table_name='messages_partitioned')
+    op.drop_index('ix_messages_conversation_id_search_vector', table_name='messages_partitioned')
+    op.create_table('messages',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('conversation_id', sa.UUID(), nullable=False),
+    sa.Column('sender_id', sa.Integer(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=True),
+    sa.Column('reply_to', sa.UUID(), nullable=True),
+    sa.Column('is_edited', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('simple', coalesce(text, ''))", persisted=True),
+        nullable=True,
+    ),
+    sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ondelete='RESTRICT'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(f'INSERT INTO messages ({COLUMNS}) SELECT {COLUMNS} FROM messages_partitioned')
+    op.drop_table('messages_partitioned')
+    _create_indexes()
+    # soft references may point at rows that are gone by now
+    op.execute('UPDATE messages SET reply_to = NULL WHERE reply_to NOT IN (SELECT id FROM messages)')
+    op.execute('DELETE FROM attachments WHERE message_id NOT IN (SELECT id FROM messages)')
+    op.create_foreign_key(None, 'messages', 'messages', ['reply_to'], ['id'], ondelete='SET NULL')
+    op.create_foreign_key(None, 'attachments', 'messages', ['message_id'], ['id'], ondelete='CASCADE')
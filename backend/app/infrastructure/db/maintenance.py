@@ -0,0 +1,261 @@
+"""
+Partition maintenance for the messages table.
+
+Run periodically (e.g. daily from cron):
+
+    python -m app.infrastructure.db.maintenance [--months-ahead N] [--detach] [--dry-run]
+
+Creates monthly partitions ahead of time and applies the per-conversation-type
+retention from settings. Partitions that are past the retention of every
+conversation type are dropped whole (or only detached with ``--detach``);
+rows of types with a shorter retention are deleted in batches. Afterwards the
+inbox of every conversation that lost messages is refreshed, so previews and
+unread counts no longer include them.
+
+The API process also creates upcoming partitions at startup and once a day
+(``keep_partitions_ahead``), so inserts never depend on the cron job; rows
+that still land in messages_default are moved into their month's partition
+when it is created. Retention only runs from this command.
+"""
+import argparse
+import asyncio
+import logging
+import re
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.application.settings import settings
+from app.domain.enums.conversation_type import ConversationType
+from app.infrastructure.db.session import async_session_maker, engine
+from app.infrastructure.repositories_impl.inbox_repository_impl import InboxRepositoryImpl
+
+logger = logging.getLogger("uvicorn.error")
+
+PARTITION_NAME = re.compile(r"^messages_p(\d{4})(\d{2})$")
+DEFAULT_PARTITION = "messages_default"
+DELETE_BATCH_SIZE = 10_000
+COLUMNS = "id, conversation_id, sender_id, text, reply_to, is_edited, created_at"
+# serializes partition creation between workers starting at the same time
+PARTITION_LOCK_KEY = 0x6D736770  # "msgp"
+UPKEEP_INTERVAL_SECONDS = 24 * 60 * 60
+INBOX_REFRESH_BATCH_SIZE = 500
+
+# conversation id -> created_at of its newest expired message
+Removed = dict[uuid.UUID, datetime]
+
+
+def month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"messages_p{month:%Y%m}"
+
+
+def retention_cutoffs(now: datetime) -> dict[ConversationType, datetime]:
+    days = {
+        ConversationType.private: settings.message_retention_days_private,
+        ConversationType.group: settings.message_retention_days_group,
+    }
+    return {type_: now - timedelta(days=value) for type_, value in days.items() if value > 0}
+
+
+async def list_partitions(conn: AsyncConnection) -> dict[str, datetime]:
+    """Attached monthly partitions by name, with the first day of their month."""
+    result = await conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = 'messages'::regclass"
+    ))
+    partitions = {}
+    for (name,) in result.all():
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions[name] = datetime(int(match[1]), int(match[2]), 1)
+    return partitions
+
+
+async def create_partition(conn: AsyncConnection, month: datetime) -> None:
+    name = partition_name(month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    bounds = f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    in_default = (await conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end)"
+    ), {"start": month, "end": add_months(month, 1)})).scalar()
+    if not in_default:
+        await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF messages {bounds}"))
+        await conn.commit()
+        return
+    # the default partition may not keep rows of the new range: move them in one
+    # transaction, with the attachment cleanup trigger switched off for the move
+    logger.warning("Moving messages of %s out of %s", name, DEFAULT_PARTITION)
+    await conn.execute(text("SET LOCAL messages.moving_partition = 'on'"))
+    await conn.execute(text(f"ALTER TABLE messages DETACH PARTITION {DEFAULT_PARTITION}"))
+    await conn.execute(text(f"CREATE TABLE {name} PARTITION OF messages {bounds}"))
+    await conn.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end "
+        f"RETURNING {COLUMNS}) INSERT INTO messages ({COLUMNS}) SELECT {COLUMNS} FROM moved"
+    ), {"start": month, "end": add_months(month, 1)})
+    await conn.execute(text(f"ALTER TABLE messages ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    await conn.commit()
+
+
+async def ensure_partitions(conn: AsyncConnection, now: datetime, months_ahead: int, dry_run: bool) -> list[str]:
+    await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+    try:
+        existing = await list_partitions(conn)
+        created = []
+        month = month_start(now)
+        for _ in range(months_ahead + 1):
+            name = partition_name(month)
+            if name not in existing:
+                if not dry_run:
+                    await create_partition(conn, month)
+                created.append(name)
+            month = add_months(month, 1)
+        await conn.commit()
+    finally:
+        # the lock is held by the session, not the transaction: end a failed
+        # transaction first, or the unlock fails and the pooled connection keeps it
+        await conn.rollback()
+        await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": PARTITION_LOCK_KEY})
+        await conn.commit()
+    return created
+
+
+async def keep_partitions_ahead(months_ahead: int, interval: float = UPKEEP_INTERVAL_SECONDS) -> None:
+    """Background task of the API process: create upcoming partitions now and then daily."""
+    while True:
+        try:
+            async with engine.connect() as conn:
+                created = await ensure_partitions(conn, datetime.utcnow(), months_ahead, dry_run=False)
+            if created:
+                logger.info("Messages partitions created: %s", created)
+        except Exception:
+            logger.exception("Creating messages partitions failed")
+        await asyncio.sleep(interval)
+
+
+def note_removed(removed: Removed, conversation_id: uuid.UUID, created_at: datetime) -> None:
+    if conversation_id not in removed or removed[conversation_id] < created_at:
+        removed[conversation_id] = created_at
+
+
+async def expire_partitions(
+    conn: AsyncConnection,
+    now: datetime,
+    detach: bool,
+    dry_run: bool,
+    removed: Removed | None = None,
+) -> list[str]:
+    cutoffs = retention_cutoffs(now)
+    if len(cutoffs) < len(ConversationType):
+        # some conversation type keeps its messages forever
+        return []
+    cutoff = min(cutoffs.values())
+    expired = []
+    for name, month in sorted((await list_partitions(conn)).items(), key=lambda item: item[1]):
+        if add_months(month, 1) > cutoff:
+            continue
+        if not dry_run:
+            if removed is not None:
+                for conversation_id, created_at in await conn.execute(text(
+                    f"SELECT conversation_id, max(created_at) FROM {name} GROUP BY conversation_id"
+                )):
+                    note_removed(removed, conversation_id, created_at)
+            if not detach:
+                # DROP does not fire the row trigger that removes attachments
+                await conn.execute(text(
+                    f"DELETE FROM attachments USING {name} WHERE attachments.message_id = {name}.id"
+                ))
+            await conn.execute(text(f"ALTER TABLE messages DETACH PARTITION {name}"))
+            if not detach:
+                await conn.execute(text(f"DROP TABLE {name}"))
+            await conn.commit()
+        expired.append(name)
+    return expired
+
+
+async def delete_expired_rows(
+    conn: AsyncConnection,
+    now: datetime,
+    dry_run: bool,
+    removed: Removed | None = None,
+) -> dict[str, int]:
+    deleted = {}
+    for type_, cutoff in retention_cutoffs(now).items():
+        total = 0
+        while not dry_run:
+            # batches keep each transaction and its locks short
+            result = await conn.execute(text(
+                "DELETE FROM messages WHERE (id, created_at) IN ("
+                " SELECT m.id, m.created_at FROM messages m"
+                " JOIN conversations c ON c.id = m.conversation_id"
+                " WHERE c.type = :type AND m.created_at < :cutoff"
+                " LIMIT :batch)"
+                " RETURNING conversation_id, created_at"
+            ), {"type": type_.value, "cutoff": cutoff, "batch": DELETE_BATCH_SIZE})
+            rows = result.all()
+            await conn.commit()
+            if removed is not None:
+                for conversation_id, created_at in rows:
+                    note_removed(removed, conversation_id, created_at)
+            total += len(rows)
+            if len(rows) < DELETE_BATCH_SIZE:
+                break
+        deleted[type_.value] = total
+    return deleted
+
+
+async def refresh_inboxes(removed: Removed) -> None:
+    """Move inbox previews off expired messages and drop those from unread counts."""
+    items = list(removed.items())
+    for start in range(0, len(items), INBOX_REFRESH_BATCH_SIZE):
+        async with async_session_maker() as session:
+            inbox = InboxRepositoryImpl(session)
+            for conversation_id, created_at in items[start:start + INBOX_REFRESH_BATCH_SIZE]:
+                await inbox.refresh(conversation_id)
+                await inbox.recount_removed(conversation_id, created_at)
+            await session.commit()
+
+
+async def run(months_ahead: int, detach: bool, dry_run: bool) -> None:
+    now = datetime.utcnow()
+    removed: Removed = {}
+    async with engine.connect() as conn:
+        created = await ensure_partitions(conn, now, months_ahead, dry_run)
+        expired = await expire_partitions(conn, now, detach, dry_run, removed)
+        deleted = await delete_expired_rows(conn, now, dry_run, removed)
+    await refresh_inboxes(removed)
+    await engine.dispose()
+    logger.info(
+        "Messages partitions: created=%s %s=%s deleted_rows=%s refreshed_inboxes=%d%s",
+        created or "-",
+        "detached" if detach else "dropped",
+        expired or "-",
+        deleted or "-",
+        len(removed),
+        " (dry run)" if dry_run else "",
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Create and expire monthly partitions of the messages table.")
+    parser.add_argument("--months-ahead", type=int, default=settings.message_partitions_ahead)
+    parser.add_argument("--detach", action="store_true", help="detach expired partitions instead of dropping them")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without changing it")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(args.months_ahead, args.detach, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from collections.abc import Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.application.settings import settings
+from app.domain.entities.message import Message as MessageEntity
+from app.domain.repositories.message_repository import MessageWriter
+from app.infrastructure.db.session import async_session_maker
+from app.infrastructure.repositories_impl.inbox_repository_impl import InboxRepositoryImpl
+from app.infrastructure.repositories_impl.message_repository_impl import MessageRepositoryImpl
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class MessageBatchWriter(MessageWriter):
+    """
+    Group-commit writer for new messages.
+
+    Concurrent callers enqueue messages; a single flush task collects them for
+    up to ``max_delay`` seconds (or ``max_batch`` rows), inserts them with one
+    multi-row statement in one transaction and resolves each caller's future
+    with the persisted message. Rows are inserted in enqueue order, so order
+    within a conversation is preserved. ``stop`` lets the batch being collected
+    or inserted finish, so no caller is left waiting on its future; writes after
+    ``stop`` are rejected, since nothing would consume them.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        max_batch: int = 100,
+        max_delay: float = 0.005,
+    ) -> None:
+        self._session_maker = session_maker
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        # None is the stop marker: the flush task inserts what it holds and exits
+        self._queue: asyncio.Queue[tuple[MessageEntity, asyncio.Future] | None] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+        self._stopped = False
+
+    async def start(self) -> None:
+        self._stopped = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._stopped = True
+        if self._task is not None:
+            self._queue.put_nowait(None)
+            try:
+                await self._task
+            except Exception:
+                logger.exception("Message writer failed while stopping")
+            self._task = None
+        # flush whatever was enqueued behind the stop marker
+        pending = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                pending.append(item)
+        if pending:
+            await self._flush(pending)
+
+    async def write(self, message: MessageEntity) -> MessageEntity:
+        if self._stopped:
+            raise RuntimeError("Message writer is stopped")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((message, future))
+        return await future
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            try:
+                stopping = await self._collect(batch)
+                await self._flush(batch)
+            except asyncio.CancelledError:
+                self._fail(batch, RuntimeError("Message writer was cancelled"))
+                raise
+
+    async def _collect(self, batch: list[tuple[MessageEntity, asyncio.Future]]) -> bool:
+        """Add queued messages to ``batch`` until it is full or ``max_delay`` passes; True on the stop marker."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._max_delay
+        while len(batch) < self._max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                return True
+            batch.append(item)
+        return False
+
+    @staticmethod
+    def _fail(batch: list[tuple[MessageEntity, asyncio.Future]], exc: BaseException) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(exc)
+
+    async def _flush(self, batch: list[tuple[MessageEntity, asyncio.Future]]) -> None:
+        try:
+            persisted = await self._insert([message for message, _ in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                self._fail(batch, exc)
+                return
+            # one bad row must not fail the whole batch: retry rows one by one
+            logger.warning("Batched insert of %d messages failed, retrying individually", len(batch))
+            for item in batch:
+                await self._flush([item])
+            return
+        for (_, future), message in zip(batch, persisted):
+            if not future.done():
+                future.set_result(message)
+
+    async def _insert(self, messages: Sequence[MessageEntity]) -> Sequence[MessageEntity]:
+        async with self._session_maker() as session:
+            persisted = await MessageRepositoryImpl(session).create_many(messages)
+            # inbox counters move in the same transaction, once per batch
+            await InboxRepositoryImpl(session).record_messages(persisted)
+            await session.commit()
+        return persisted
+
+
+message_writer = MessageBatchWriter(
+    async_session_maker,
+    max_batch=settings.message_batch_size,
+    max_delay=settings.message_batch_delay_ms / 1000,
+)
@@ -3,7 +3,7 @@ import uuid
 from datetime import datetime
 
 import sqlalchemy as sa
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.infrastructure.db.base import Base
@@ -38,6 +38,9 @@ class ConversationParticipant(Base):
     role: Mapped[participant_type.ParticipantRole] = (
         mapped_column(sa.Enum(participant_type.ParticipantRole, name="participant_role"), nullable=False))
     joined_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    # read watermark: everything up to last_read_at has been read
+    last_read_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    last_read_message_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
 
     user: Mapped[Users] = relationship("Users", back_populates="participants")
     conversation: Mapped[Conversation] = relationship("Conversation", back_populates="participants")
@@ -45,42 +48,108 @@ class ConversationParticipant(Base):
 
     __table_args__ = (
         sa.CheckConstraint("role in ('admin', 'member')", name="participant_role_check"),
+        sa.UniqueConstraint("conversation_id", "user_id", name="uq_conversation_participants_conversation_id_user_id"),
+        sa.Index("ix_conversation_participants_user_id", "user_id"),
     )
 
 
 class Message(Base):
+    """
+    Range-partitioned by month on created_at, so created_at is part of the
+    primary key and nothing can hold a database foreign key to messages.id:
+    reply_to is a soft reference and attachments are removed by a trigger.
+    """
+
     __tablename__ = "messages"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     conversation_id: Mapped[uuid.UUID] = mapped_column(sa.ForeignKey("conversations.id", ondelete="CASCADE"))
     sender_id: Mapped[int] = mapped_column(sa.ForeignKey("users.id", ondelete="RESTRICT"))
     text: Mapped[str | None] = mapped_column(sa.Text, nullable=True)
-    reply_to: Mapped[uuid.UUID | None] = mapped_column(sa.ForeignKey("messages.id", ondelete="SET NULL"), nullable=True)
+    reply_to: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
     is_edited: Mapped[bool] = mapped_column(sa.Boolean, default=False)
-    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(primary_key=True, default=datetime.utcnow)
+    # full-text search document, maintained by Postgres; never loaded with the row
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR, sa.Computed("to_tsvector('simple', coalesce(text, ''))", persisted=True), deferred=True)
 
     sender: Mapped["Users"] = relationship("Users", back_populates="messages")
 
     conversation: Mapped[Conversation] = relationship("Conversation", back_populates="messages")
     attachments: Mapped[list["Attachment"]] = relationship(
-        "Attachment", back_populates="message", cascade="all, delete-orphan"
+        "Attachment",
+        back_populates="message",
+        cascade="all, delete-orphan",
+        primaryjoin="Message.id == foreign(Attachment.message_id)",
+    )
+    reply_to_message: Mapped["Message"] = relationship(
+        "Message", primaryjoin="foreign(Message.reply_to) == remote(Message.id)"
+    )
+
+    __table_args__ = (
+        sa.Index("ix_messages_conversation_id_created_at_id", "conversation_id", "created_at", "id"),
+        sa.Index("ix_messages_conversation_id_created_at_sender_id", "conversation_id", "created_at",
+                 postgresql_include=["sender_id"]),
+        sa.Index("ix_messages_conversation_id_search_vector", "conversation_id", "search_vector",
+                 postgresql_using="gin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
-    reply_to_message: Mapped["Message"] = relationship("Message", remote_side=[id])
 
 
 class Attachment(Base):
     __tablename__ = "attachments"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    message_id: Mapped[uuid.UUID] = mapped_column(sa.ForeignKey("messages.id", ondelete="CASCADE"))
+    message_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True))
     file_url: Mapped[str] = mapped_column(sa.Text, nullable=False)
     file_type: Mapped[attachment_type.AttachmentType] = mapped_column(sa.Enum(attachment_type.AttachmentType, name="attachment_type"), nullable=False)
     file_size: Mapped[int] = mapped_column(sa.Integer, nullable=False)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
 
-    message: Mapped[Message] = relationship("Message", back_populates="attachments")
+    message: Mapped[Message] = relationship(
+        "Message", back_populates="attachments", primaryjoin="Message.id == foreign(Attachment.message_id)"
+    )
 
     __table_args__ = (
         sa.CheckConstraint("file_size >= 0", name="attachment_size_check"),
+        sa.Index("ix_attachments_message_id", "message_id"),
     )
 
+
+class Inbox(Base):
+    """Per-user, per-conversation row backing the conversation list."""
+
+    __tablename__ = "inbox"
+
+    user_id: Mapped[int] = mapped_column(sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    conversation_id: Mapped[uuid.UUID] = mapped_column(
+        sa.ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True)
+    title: Mapped[str | None] = mapped_column(sa.String, nullable=True)
+    last_message_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    last_message_sender_id: Mapped[int | None] = mapped_column(sa.Integer, nullable=True)
+    last_message_text: Mapped[str | None] = mapped_column(sa.Text, nullable=True)
+    last_message_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    last_activity_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    unread_count: Mapped[int] = mapped_column(sa.Integer, default=0, server_default="0")
+
+    __table_args__ = (
+        sa.Index("ix_inbox_user_id_last_activity_at_conversation_id",
+                 "user_id", "last_activity_at", "conversation_id"),
+        sa.Index("ix_inbox_conversation_id", "conversation_id"),
+    )
+
+
+class BackplanePayload(Base):
+    """Websocket events too large for NOTIFY, fetched by id on the other workers; short-lived."""
+
+    __tablename__ = "backplane_payloads"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    payload: Mapped[str] = mapped_column(sa.Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+
+    __table_args__ = (
+        sa.Index("ix_backplane_payloads_created_at", "created_at"),
+        {"prefixes": ["UNLOGGED"]},
+    )
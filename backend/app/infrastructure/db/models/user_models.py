@@ -23,3 +23,11 @@ class Users(Base):
     messages: Mapped[list["Message"]] = relationship(
         "Message",
         back_populates="sender")
+
+    __table_args__ = (
+        # username search: trigram for substring matches, text_pattern_ops for prefix matches
+        sa.Index("ix_users_username_trgm", sa.func.lower(username).label("username_lower"),
+                 postgresql_using="gin", postgresql_ops={"username_lower": "gin_trgm_ops"}),
+        sa.Index("ix_users_username_prefix", sa.func.lower(username).label("username_lower"),
+                 postgresql_ops={"username_lower": "text_pattern_ops"}),
+    )
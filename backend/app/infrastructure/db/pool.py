@@ -0,0 +1,64 @@
+import time
+from typing import Any
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class CheckoutStats:
+    """Wait time spent getting a connection out of the pool."""
+
+    __slots__ = ("checkouts", "total_wait", "max_wait", "slow_checkouts", "slow_threshold")
+
+    def __init__(self, slow_threshold: float = 0.01) -> None:
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.slow_checkouts = 0
+        self.slow_threshold = slow_threshold
+
+    def observe(self, wait: float) -> None:
+        self.checkouts += 1
+        self.total_wait += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+        if wait >= self.slow_threshold:
+            self.slow_checkouts += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "avg_wait_ms": self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+            "slow_checkouts": self.slow_checkouts,
+        }
+
+
+checkout_stats = CheckoutStats()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited."""
+
+    # class-level so the numbers survive pool.recreate()
+    checkout_stats = checkout_stats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.checkout_stats.observe(time.perf_counter() - started)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self.checkout_stats.snapshot(),
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+        }
+
+
+class ReplicaAsyncPool(InstrumentedAsyncPool):
+    """Pool of the read replica engine, with its own checkout stats."""
+
+    checkout_stats = CheckoutStats()
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import uuid
+from collections.abc import Awaitable, Callable, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.application.settings import settings
+from app.domain.entities.read_watermark import ReadWatermark
+from app.domain.repositories.participant_repository import ReadWatermarkWriter
+from app.infrastructure.db.session import async_session_maker
+from app.infrastructure.metrics import registry
+from app.infrastructure.repositories_impl.inbox_repository_impl import InboxRepositoryImpl
+from app.infrastructure.repositories_impl.participant_repository_impl import ParticipantRepositoryImpl
+
+logger = logging.getLogger("uvicorn.error")
+
+FlushHandler = Callable[[Sequence[ReadWatermark]], Awaitable[None]]
+
+
+class ReadWatermarkBatcher(ReadWatermarkWriter):
+    """
+    Coalesces read watermarks in memory and flushes them periodically.
+
+    Clients report a read for every message they scroll past; only the furthest
+    watermark per (conversation, user) since the last flush is kept. Each flush
+    advances all of them and recounts the affected unread counters in one
+    transaction, then hands the flushed watermarks to ``on_flush`` (used to
+    broadcast read receipts), so receipts go out at most once per interval.
+    ``stop`` lets a flush in progress finish and then writes what is left.
+    """
+
+    def __init__(self, session_maker: async_sessionmaker[AsyncSession], interval: float = 1) -> None:
+        self._session_maker = session_maker
+        self._interval = interval
+        self._pending: dict[tuple[uuid.UUID, int], ReadWatermark] = {}
+        self._on_flush: FlushHandler | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+        self.reported = 0
+        self.flushed = 0
+
+    async def start(self, on_flush: FlushHandler | None = None) -> None:
+        self._on_flush = on_flush
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            # not cancel(): a flush cancelled midway would lose its batch
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self._flush()
+
+    def advance(self, watermark: ReadWatermark) -> None:
+        self.reported += 1
+        key = (watermark.conversation_id, watermark.user_id)
+        current = self._pending.get(key)
+        if current is None or current.read_at < watermark.read_at:
+            self._pending[key] = watermark
+
+    def stats(self) -> dict[str, int]:
+        return {"pending": len(self._pending), "reported": self.reported, "flushed": self.flushed}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self._interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self._flush()
+            except Exception:
+                logger.exception("Read watermark flush failed")
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+        batch = list(self._pending.values())
+        self._pending = {}
+        try:
+            async with self._session_maker() as session:
+                await ParticipantRepositoryImpl(session).advance_read_many(batch)
+                await InboxRepositoryImpl(session).recount_unread(batch)
+                await session.commit()
+        except BaseException:
+            # put the batch back unless a newer watermark arrived meanwhile
+            for watermark in batch:
+                self.advance(watermark)
+            self.reported -= len(batch)
+            raise
+        self.flushed += len(batch)
+        if self._on_flush is not None:
+            await self._on_flush(batch)
+
+
+read_watermarks = ReadWatermarkBatcher(async_session_maker, interval=settings.read_receipts_flush_ms / 1000)
+
+registry.register("read_watermarks", read_watermarks.stats)
@@ -1,15 +1,157 @@
-from collections.abc import AsyncIterator
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import Pool
 
 from app.application.settings import settings
+from app.infrastructure.db.pool import InstrumentedAsyncPool, ReplicaAsyncPool
+from app.infrastructure.metrics import registry
 
+logger = logging.getLogger("uvicorn.error")
 
-engine = create_async_engine(settings.database_url, echo=True, future=True)
+
+def _connect_args() -> dict[str, Any]:
+    """
+    asyncpg settings; DB_STATEMENT_CACHE_SIZE sizes both statement caches.
+
+    asyncpg caches prepared statements per connection and SQLAlchemy keeps its
+    own cache on top of it. Behind pgbouncer in transaction mode both must be
+    off (0), and statements get unique names so that two clients sharing a
+    server connection never collide on one.
+    """
+    args: dict[str, Any] = {
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+        "server_settings": {"statement_timeout": str(settings.db_statement_timeout_ms)},
+    }
+    if settings.db_statement_cache_size == 0:
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    return args
+
+
+def _create_engine(url: str, poolclass: type[Pool]) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.debug,
+        future=True,
+        poolclass=poolclass,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        connect_args=_connect_args(),
+    )
+
+
+engine = _create_engine(settings.database_url, InstrumentedAsyncPool)
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
+# without a replica configured reads use the primary
+read_engine = (
+    _create_engine(settings.replica_database_url, ReplicaAsyncPool)
+    if settings.replica_database_url
+    else engine
+)
+read_session_maker = (
+    async_sessionmaker(read_engine, expire_on_commit=False)
+    if read_engine is not engine
+    else async_session_maker
+)
+
+registry.register("db_pool", lambda: engine.pool.stats())
+if read_engine is not engine:
+    registry.register("db_read_pool", lambda: read_engine.pool.stats())
+
+
+class RecentWriters:
+    """
+    Users who wrote within the last ``window`` seconds.
+
+    Their reads go to the primary so they never see a replica that has not
+    caught up with their own change yet. Marks are kept per worker; once a
+    publisher is bound they are also sent to the other workers, which apply
+    them through ``apply``, so the user's next read is routed the same way
+    whichever worker serves it. A user is republished only when their mark is
+    half spent. Bounded: the oldest marks are evicted.
+    """
+
+    def __init__(self, window: float, max_size: int = 100_000) -> None:
+        # user_id -> (local deadline, deadline last announced to the other workers)
+        self._deadlines: OrderedDict[int, tuple[float, float]] = OrderedDict()
+        self._window = window
+        self._max_size = max_size
+        self._publish: Callable[[str], Awaitable[None]] | None = None
+
+    def bind(self, publish: Callable[[str], Awaitable[None]]) -> None:
+        self._publish = publish
+
+    async def mark(self, user_id: int) -> None:
+        now = time.monotonic()
+        deadline = now + self._window
+        announced = self._deadlines.get(user_id, (0.0, 0.0))[1]
+        publish = self._publish is not None and announced - now < self._window / 2
+        self._extend(user_id, deadline, deadline if publish else announced)
+        if publish:
+            await self._publish(json.dumps({"user_id": user_id}))
+
+    def apply(self, message: str) -> None:
+        deadline = time.monotonic() + self._window
+        # the sender already told every worker, so this one need not repeat it
+        self._extend(json.loads(message)["user_id"], deadline, deadline)
+
+    def _extend(self, user_id: int, deadline: float, announced: float) -> None:
+        current, current_announced = self._deadlines.get(user_id, (deadline, announced))
+        self._deadlines[user_id] = (max(deadline, current), max(announced, current_announced))
+        self._deadlines.move_to_end(user_id)
+        while len(self._deadlines) > self._max_size:
+            self._deadlines.popitem(last=False)
+
+    def active(self, user_id: int) -> bool:
+        entry = self._deadlines.get(user_id)
+        if entry is None:
+            return False
+        if entry[0] < time.monotonic():
+            del self._deadlines[user_id]
+            return False
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {"tracked_users": len(self._deadlines)}
+
+
+recent_writers = RecentWriters(settings.read_your_writes_seconds)
+
+
+def log_pool_config() -> None:
+    logger.info(
+        "DB pool: size=%d max_overflow=%d timeout=%ss pre_ping=%s recycle=%ss "
+        "statement_cache_size=%d statement_timeout=%dms echo=%s replica=%s",
+        settings.db_pool_size,
+        settings.db_max_overflow,
+        settings.db_pool_timeout_seconds,
+        settings.db_pool_pre_ping,
+        settings.db_pool_recycle_seconds,
+        settings.db_statement_cache_size,
+        settings.db_statement_timeout_ms,
+        settings.debug,
+        settings.db_replica_host or "none",
+    )
+
 
 async def get_session() -> AsyncIterator[AsyncSession]:
     async with async_session_maker() as session:
         yield session
 
+
+async def get_read_session(user_id: int | None = None) -> AsyncIterator[AsyncSession]:
+    """Session on the replica, or on the primary right after ``user_id`` wrote."""
+    maker = async_session_maker if user_id is not None and recent_writers.active(user_id) else read_session_maker
+    async with maker() as session:
+        yield session
@@ -0,0 +1,23 @@
+from collections.abc import Callable
+from typing import Any
+
+
+class MetricsRegistry:
+    """
+    In-process registry of runtime counters.
+
+    Components register a callable that returns a plain dict snapshot;
+    the metrics endpoint collects them all on request.
+    """
+
+    def __init__(self) -> None:
+        self._sources: dict[str, Callable[[], dict[str, Any]]] = {}
+
+    def register(self, name: str, source: Callable[[], dict[str, Any]]) -> None:
+        self._sources[name] = source
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {name: source() for name, source in self._sources.items()}
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,244 @@
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import bindparam, case, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.entities.inbox import InboxEntry
+from app.domain.entities.message import Message as MessageEntity
+from app.domain.entities.read_watermark import ReadWatermark
+from app.domain.enums.conversation_type import ConversationType
+from app.domain.repositories.inbox_repository import InboxRepository
+from app.infrastructure.db.models import models, user_models
+
+PREVIEW_LENGTH = 200
+
+
+class InboxRepositoryImpl(InboxRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def sync_members(self, conversation_id: uuid.UUID) -> None:
+        participants = models.ConversationParticipant
+        await self.session.execute(
+            insert(models.Inbox)
+            .from_select(
+                ["user_id", "conversation_id"],
+                select(participants.user_id, participants.conversation_id)
+                .where(participants.conversation_id == conversation_id)
+                .distinct(),
+            )
+            .on_conflict_do_nothing()
+        )
+        await self.session.execute(
+            delete(models.Inbox).where(
+                models.Inbox.conversation_id == conversation_id,
+                models.Inbox.user_id.not_in(
+                    select(participants.user_id).where(participants.conversation_id == conversation_id)
+                ),
+            )
+        )
+        await self.refresh(conversation_id)
+
+    async def refresh(self, conversation_id: uuid.UUID) -> None:
+        """Recompute display titles and the last message for every member of the conversation."""
+        participants = models.ConversationParticipant
+        partner = (
+            select(user_models.Users.username)
+            .select_from(participants)
+            .join(user_models.Users, user_models.Users.id == participants.user_id)
+            .where(
+                participants.conversation_id == models.Inbox.conversation_id,
+                participants.user_id != models.Inbox.user_id,
+            )
+            .limit(1)
+            .scalar_subquery()
+        )
+        last = (
+            select(models.Message)
+            .where(models.Message.conversation_id == conversation_id)
+            .order_by(models.Message.created_at.desc(), models.Message.id.desc())
+            .limit(1)
+            .subquery()
+        )
+        last_message = (await self.session.execute(select(last))).one_or_none()
+        values = {
+            "title": case(
+                (models.Conversation.type == ConversationType.private, partner),
+                else_=models.Conversation.title,
+            ),
+            "last_message_id": last_message.id if last_message else None,
+            "last_message_sender_id": last_message.sender_id if last_message else None,
+            "last_message_text": self._preview(last_message.text) if last_message else None,
+            "last_message_at": last_message.created_at if last_message else None,
+            "last_activity_at": last_message.created_at if last_message else models.Conversation.created_at,
+        }
+        await self.session.execute(
+            update(models.Inbox)
+            .where(
+                models.Inbox.conversation_id == conversation_id,
+                models.Conversation.id == models.Inbox.conversation_id,
+            )
+            .values(**values)
+        )
+        await self.session.flush()
+
+    async def record_messages(self, messages: Sequence[MessageEntity]) -> None:
+        by_conversation: dict[uuid.UUID, list[MessageEntity]] = defaultdict(list)
+        for message in messages:
+            by_conversation[message.conversation_id].append(message)
+        for conversation_id, batch in by_conversation.items():
+            last = max(batch, key=lambda m: (m.created_at, m.id))
+            sent_by = Counter(m.sender_id for m in batch)
+            # every member gets all new messages as unread except the ones they sent themselves
+            own = case(
+                *[(models.Inbox.user_id == sender_id, count) for sender_id, count in sent_by.items()],
+                else_=0,
+            )
+            await self.session.execute(
+                update(models.Inbox)
+                .where(models.Inbox.conversation_id == conversation_id)
+                .values(
+                    last_message_id=last.id,
+                    last_message_sender_id=last.sender_id,
+                    last_message_text=self._preview(last.text),
+                    last_message_at=last.created_at,
+                    last_activity_at=func.greatest(models.Inbox.last_activity_at, last.created_at),
+                    unread_count=models.Inbox.unread_count + len(batch) - own,
+                )
+            )
+        await self.session.flush()
+
+    async def update_preview(self, message: MessageEntity) -> None:
+        await self.session.execute(
+            update(models.Inbox)
+            .where(
+                models.Inbox.conversation_id == message.conversation_id,
+                models.Inbox.last_message_id == message.id,
+            )
+            .values(last_message_text=self._preview(message.text))
+        )
+        await self.session.flush()
+
+    async def list_for_user(
+        self,
+        user_id: int,
+        limit: int,
+        before: tuple[datetime, uuid.UUID] | None = None,
+    ) -> Sequence[InboxEntry]:
+        # keyset paging on (last_activity_at, conversation_id) over ix_inbox_user_id_last_activity_at_conversation_id
+        query = (
+            select(models.Inbox, models.Conversation.type, models.Conversation.created_at)
+            .join(models.Conversation, models.Conversation.id == models.Inbox.conversation_id)
+            .where(models.Inbox.user_id == user_id)
+            .order_by(models.Inbox.last_activity_at.desc(), models.Inbox.conversation_id.desc())
+            .limit(limit)
+        )
+        if before is not None:
+            query = query.where(
+                tuple_(models.Inbox.last_activity_at, models.Inbox.conversation_id) < tuple_(*before)
+            )
+        result = await self.session.execute(query)
+        return [self._to_entity(row, type_, created_at) for row, type_, created_at in result.all()]
+
+    async def recount_unread(self, watermarks: Sequence[ReadWatermark]) -> None:
+        """
+        Unread = messages from others after the watermark. Counted index-only on
+        ix_messages_conversation_id_created_at_sender_id, and only over the
+        messages after the watermark, which is usually a handful.
+        """
+        inbox = models.Inbox.__table__
+        stmt = (
+            update(inbox)
+            .where(
+                inbox.c.conversation_id == bindparam("b_conversation_id"),
+                inbox.c.user_id == bindparam("b_user_id"),
+            )
+            .values(unread_count=self._unread_count())
+        )
+        await self.session.execute(stmt, [
+            {
+                "b_conversation_id": watermark.conversation_id,
+                "b_user_id": watermark.user_id,
+            }
+            for watermark in watermarks
+        ])
+        await self.session.flush()
+
+    async def recount_removed(self, conversation_id: uuid.UUID, created_at: datetime) -> None:
+        """
+        Recount unread after messages up to ``created_at`` were deleted, for the
+        members whose watermark is before it: only they counted them as unread.
+        """
+        inbox = models.Inbox.__table__
+        await self.session.execute(
+            update(inbox)
+            .where(
+                inbox.c.conversation_id == conversation_id,
+                inbox.c.unread_count > 0,
+                func.coalesce(self._read_at(), datetime.min) < created_at,
+            )
+            .values(unread_count=self._unread_count())
+        )
+        await self.session.flush()
+
+    @staticmethod
+    def _read_at():
+        """
+        The member's stored watermark, already advanced in this transaction; it
+        may be ahead of a batched one if another worker flushed a later read.
+        """
+        inbox = models.Inbox.__table__
+        participants = models.ConversationParticipant.__table__
+        return (
+            select(participants.c.last_read_at)
+            .where(
+                participants.c.conversation_id == inbox.c.conversation_id,
+                participants.c.user_id == inbox.c.user_id,
+            )
+            .correlate(inbox)
+            .scalar_subquery()
+        )
+
+    @classmethod
+    def _unread_count(cls):
+        inbox = models.Inbox.__table__
+        messages = models.Message.__table__
+        # a member who never read anything has every message from others unread
+        return (
+            select(func.count())
+            .select_from(messages)
+            .where(
+                messages.c.conversation_id == inbox.c.conversation_id,
+                messages.c.created_at > func.coalesce(cls._read_at(), datetime.min),
+                messages.c.sender_id != inbox.c.user_id,
+            )
+            .scalar_subquery()
+        )
+
+    @staticmethod
+    def _preview(text: str | None) -> str | None:
+        return text[:PREVIEW_LENGTH] if text is not None else None
+
+    @staticmethod
+    def _to_entity(model: models.Inbox, type_: ConversationType, created_at: datetime) -> InboxEntry:
+        last_message = None
+        if model.last_message_id is not None:
+            last_message = {
+                "id": model.last_message_id,
+                "sender_id": model.last_message_sender_id,
+                "text": model.last_message_text,
+                "created_at": model.last_message_at,
+            }
+        return InboxEntry(
+            id=model.conversation_id,
+            type=type_,
+            title=model.title,
+            created_at=created_at,
+            last_activity_at=model.last_activity_at,
+            unread_count=model.unread_count,
+            last_message=last_message,
+        )
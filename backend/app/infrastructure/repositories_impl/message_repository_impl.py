@@ -1,15 +1,22 @@
 import uuid
+from datetime import datetime, timedelta
 from typing import Sequence
 
-from sqlalchemy import Select, delete, select, insert
+from sqlalchemy import Select, and_, cast, delete, func, select, insert, tuple_, update
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.domain.entities.message import Message as MessageEntity
+from app.domain.entities.message import Message as MessageEntity, MessageSearchHit, message_id_time
 from app.domain.repositories.message_repository import MessageRepository
 from app.infrastructure.db.models import models
 
 
+# must match the configuration of the messages.search_vector generated column
+SEARCH_CONFIG = "simple"
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5"
+
+
 class MessageRepositoryImpl(MessageRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -29,39 +36,185 @@ class MessageRepositoryImpl(MessageRepository):
         await self.session.flush()
         return self._to_entity(msg.scalars().one())
 
+    async def create_many(self, messages: Sequence[MessageEntity]) -> Sequence[MessageEntity]:
+        stmt = (insert(models.Message)
+                .returning(models.Message, sort_by_parameter_order=True)
+                .options(selectinload(models.Message.sender)))
+        result = await self.session.scalars(stmt, [
+            {
+                "id": message.id,
+                "conversation_id": message.conversation_id,
+                "sender_id": message.sender_id,
+                "text": message.text,
+                "reply_to": message.reply_to,
+                "is_edited": message.is_edited,
+                "created_at": message.created_at,
+            }
+            for message in messages
+        ])
+        await self.session.flush()
+        return [self._to_entity(m) for m in result.all()]
+
     async def list_for_conversation(self, conversation_id: uuid.UUID, limit: int, offset: int) -> Sequence[MessageEntity]:
         query: Select[tuple[models.Message]] = (
             select(models.Message)
-            .where(models.Message.conversation_id == conversation_id)
+            .where(
+                models.Message.conversation_id == conversation_id,
+                # no message predates its conversation; skips older partitions at run time
+                models.Message.created_at >= select(models.Conversation.created_at)
+                .where(models.Conversation.id == conversation_id)
+                .scalar_subquery(),
+            )
             .options(selectinload(models.Message.sender))
-            .order_by(models.Message.created_at)
+            .order_by(models.Message.created_at, models.Message.id)
             .limit(limit)
             .offset(offset)
         )
         result = await self.session.execute(query)
-        return result.scalars().all()
-        # return [self._to_entity(m) for m in models_list]
+        return [self._to_entity(m) for m in result.scalars().all()]
+
+    async def list_page(
+        self,
+        conversation_id: uuid.UUID,
+        limit: int,
+        before: tuple[datetime, uuid.UUID] | None = None,
+        after: tuple[datetime, uuid.UUID] | None = None,
+    ) -> Sequence[MessageEntity]:
+        # keyset paging on (created_at, id), served by ix_messages_conversation_id_created_at_id
+        key = tuple_(models.Message.created_at, models.Message.id)
+        query: Select[tuple[models.Message]] = (
+            select(models.Message)
+            .where(models.Message.conversation_id == conversation_id)
+            .options(selectinload(models.Message.sender))
+            .limit(limit)
+        )
+        # the plain created_at bound is redundant with the row comparison but
+        # lets the planner prune monthly partitions
+        if before is not None:
+            query = query.where(key < tuple_(*before), models.Message.created_at <= before[0]).order_by(
+                models.Message.created_at.desc(), models.Message.id.desc()
+            )
+        else:
+            if after is not None:
+                query = query.where(key > tuple_(*after), models.Message.created_at >= after[0])
+            query = query.order_by(models.Message.created_at, models.Message.id)
+        result = await self.session.execute(query)
+        models_list = result.scalars().all()
+        if before is not None:
+            models_list = list(reversed(models_list))
+        return [self._to_entity(m) for m in models_list]
+
+    async def search(
+        self,
+        conversation_id: uuid.UUID,
+        query: str,
+        limit: int,
+        sender_id: int | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        before: tuple[datetime, uuid.UUID] | None = None,
+    ) -> Sequence[MessageSearchHit]:
+        """Newest matches first; served by ix_messages_conversation_id_search_vector."""
+        config = cast(SEARCH_CONFIG, REGCONFIG)
+        tsquery = func.websearch_to_tsquery(config, query)
+        # created_at travels with the id so the join below can prune partitions
+        matches = (
+            select(models.Message.id, models.Message.created_at)
+            .where(
+                models.Message.conversation_id == conversation_id,
+                models.Message.search_vector.bool_op("@@")(tsquery),
+            )
+            .order_by(models.Message.created_at.desc(), models.Message.id.desc())
+            .limit(limit)
+        )
+        if sender_id is not None:
+            matches = matches.where(models.Message.sender_id == sender_id)
+        if since is not None:
+            matches = matches.where(models.Message.created_at >= since)
+        if until is not None:
+            matches = matches.where(models.Message.created_at < until)
+        if before is not None:
+            matches = matches.where(
+                tuple_(models.Message.created_at, models.Message.id) < tuple_(*before),
+                models.Message.created_at <= before[0],
+            )
+        page = matches.subquery()
+        # headlines are built only for the rows on this page; text is escaped
+        # first so the snippet is safe to render as HTML
+        escaped = func.replace(func.replace(func.replace(
+            func.coalesce(models.Message.text, ""), "&", "&amp;"), "<", "&lt;"), ">", "&gt;")
+        stmt = (
+            select(models.Message, func.ts_headline(config, escaped, tsquery, HEADLINE_OPTIONS))
+            .join(page, and_(page.c.id == models.Message.id, page.c.created_at == models.Message.created_at))
+            .options(selectinload(models.Message.sender))
+            .order_by(models.Message.created_at.desc(), models.Message.id.desc())
+        )
+        result = await self.session.execute(stmt)
+        return [self._to_search_hit(model, snippet) for model, snippet in result.all()]
 
     async def get(self, message_id: uuid.UUID) -> MessageEntity | None:
-        query = select(models.Message).where(models.Message.id == message_id)
+        query = (
+            select(models.Message)
+            .where(models.Message.id == message_id, *self._id_time_bounds(message_id))
+            .options(selectinload(models.Message.sender))
+        )
         result = await self.session.execute(query)
         model = result.scalar_one_or_none()
         return self._to_entity(model) if model else None
 
-    async def update_text(self, message_id: uuid.UUID, text: str) -> MessageEntity | None:
-        query = select(models.Message).where(models.Message.id == message_id)
-        result = await self.session.execute(query)
-        model = result.scalar_one_or_none()
-        if not model:
-            return None
-        model.text = text
-        model.is_edited = True
-        await self.session.flush()
-        return self._to_entity(model)
+    async def get_created_at(self, conversation_id: uuid.UUID, message_id: uuid.UUID) -> datetime | None:
+        query = select(models.Message.created_at).where(
+            models.Message.id == message_id,
+            models.Message.conversation_id == conversation_id,
+            *self._id_time_bounds(message_id),
+        )
+        return (await self.session.execute(query)).scalar_one_or_none()
 
-    async def delete(self, message_id: uuid.UUID) -> None:
-        await self.session.execute(delete(models.Message).where(models.Message.id == message_id))
-        await self.session.flush()
+    async def update_text(self, message_id: uuid.UUID, sender_id: int, text: str) -> MessageEntity | None:
+        # ownership check and write in one statement
+        stmt = (
+            update(models.Message)
+            .where(
+                models.Message.id == message_id,
+                models.Message.sender_id == sender_id,
+                *self._id_time_bounds(message_id),
+            )
+            .values(text=text, is_edited=True)
+            .returning(models.Message)
+            .options(selectinload(models.Message.sender))
+            .execution_options(synchronize_session=False)
+        )
+        model = (await self.session.scalars(stmt)).one_or_none()
+        return self._to_entity(model) if model else None
+
+    async def delete(self, message_id: uuid.UUID, sender_id: int) -> MessageEntity | None:
+        stmt = (
+            delete(models.Message)
+            .where(
+                models.Message.id == message_id,
+                models.Message.sender_id == sender_id,
+                *self._id_time_bounds(message_id),
+            )
+            .returning(models.Message)
+            .options(selectinload(models.Message.sender))
+            .execution_options(synchronize_session=False)
+        )
+        model = (await self.session.scalars(stmt)).one_or_none()
+        return self._to_entity(model) if model else None
+
+    @staticmethod
+    def _id_time_bounds(message_id: uuid.UUID) -> list:
+        """
+        The created_at millisecond a time-ordered id encodes, as a condition the
+        planner prunes partitions with; ids from before them search every partition.
+        """
+        created_at = message_id_time(message_id)
+        if created_at is None:
+            return []
+        return [
+            models.Message.created_at >= created_at,
+            models.Message.created_at < created_at + timedelta(milliseconds=1),
+        ]
 
     @staticmethod
     def _to_entity(model: models.Message) -> MessageEntity:
@@ -77,3 +230,17 @@ class MessageRepositoryImpl(MessageRepository):
             username=model.sender.username if model.sender else None,
         )
 
+    @staticmethod
+    def _to_search_hit(model: models.Message, snippet: str) -> MessageSearchHit:
+        return MessageSearchHit(
+            id=model.id,
+            conversation_id=model.conversation_id,
+            sender_id=model.sender_id,
+            text=model.text,
+            reply_to=model.reply_to,
+            is_edited=model.is_edited,
+            created_at=model.created_at,
+            avatar=model.sender.avatar if model.sender else None,
+            username=model.sender.username if model.sender else None,
+            snippet=snippet,
+        )
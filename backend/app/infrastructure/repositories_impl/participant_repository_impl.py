@@ -1,13 +1,15 @@
 import uuid
 from typing import Sequence
 
-from sqlalchemy import Select, delete, select, insert
+from sqlalchemy import Select, bindparam, delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.domain.entities.participant import Participant as ParticipantEntity
+from app.domain.entities.read_watermark import ReadWatermark
 from app.domain.repositories.participant_repository import ParticipantRepository
-from app.infrastructure.db.models import models
+from app.infrastructure.db.models import models, user_models
 from app.domain.enums.participant_type import ParticipantRole
 
 
@@ -16,16 +18,48 @@ class ParticipantRepositoryImpl(ParticipantRepository):
         self.session = session
 
     async def add(self, participant: ParticipantEntity) -> ParticipantEntity:
+        """Insert the membership, or return the existing one if the user is already in the conversation."""
         stmt = (insert(models.ConversationParticipant).values(
             conversation_id=participant.conversation_id,
             user_id=participant.user_id,
             role=participant.role,
             joined_at=participant.joined_at,
-        ).returning(models.ConversationParticipant)
+            # a new member's inbox starts with nothing unread; the watermark says the same
+            last_read_at=participant.joined_at,
+        ).on_conflict_do_nothing(constraint="uq_conversation_participants_conversation_id_user_id")
+                .returning(models.ConversationParticipant)
                 .options(selectinload(models.ConversationParticipant.user)))
         msg = await self.session.execute(stmt)
         await self.session.flush()
-        return self._to_entity(msg.scalars().one())
+        model = msg.scalars().one_or_none()
+        if model is None:
+            return await self.get(participant.conversation_id, participant.user_id)
+        return self._to_entity(model)
+
+    async def add_many(self, participants: Sequence[ParticipantEntity]) -> Sequence[ParticipantEntity]:
+        """Insert new memberships in one multi-row statement; every user must exist."""
+        user_ids = {participant.user_id for participant in participants}
+        existing = await self.session.scalars(
+            select(user_models.Users.id).where(user_models.Users.id.in_(user_ids))
+        )
+        missing = user_ids - set(existing.all())
+        if missing:
+            raise ValueError(f"Users not found: {', '.join(map(str, sorted(missing)))}")
+        stmt = (insert(models.ConversationParticipant)
+                .returning(models.ConversationParticipant, sort_by_parameter_order=True)
+                .options(selectinload(models.ConversationParticipant.user)))
+        result = await self.session.scalars(stmt, [
+            {
+                "conversation_id": participant.conversation_id,
+                "user_id": participant.user_id,
+                "role": participant.role,
+                "joined_at": participant.joined_at,
+                "last_read_at": participant.joined_at,
+            }
+            for participant in participants
+        ])
+        await self.session.flush()
+        return [self._to_entity(m) for m in result.all()]
 
     async def list_by_conversation(self, conversation_id: uuid.UUID) -> Sequence[ParticipantEntity]:
         query: Select[tuple[models.ConversationParticipant]] = select(models.ConversationParticipant).where(
@@ -35,6 +69,13 @@ class ParticipantRepositoryImpl(ParticipantRepository):
         models_list = result.scalars().all()
         return [self._to_entity(m) for m in models_list]
 
+    async def list_conversation_ids_for_user(self, user_id: int) -> Sequence[uuid.UUID]:
+        query = select(models.ConversationParticipant.conversation_id).where(
+            models.ConversationParticipant.user_id == user_id
+        )
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
     async def get(self, conversation_id: uuid.UUID, user_id: int) -> ParticipantEntity | None:
         query = select(models.ConversationParticipant).where(
             models.ConversationParticipant.conversation_id == conversation_id,
@@ -65,6 +106,28 @@ class ParticipantRepositoryImpl(ParticipantRepository):
         await self.session.flush()
         return self._to_entity(model)
 
+    async def advance_read_many(self, watermarks: Sequence[ReadWatermark]) -> None:
+        table = models.ConversationParticipant.__table__
+        stmt = (
+            update(table)
+            .where(
+                table.c.conversation_id == bindparam("b_conversation_id"),
+                table.c.user_id == bindparam("b_user_id"),
+                or_(table.c.last_read_at.is_(None), table.c.last_read_at < bindparam("b_read_at")),
+            )
+            .values(last_read_at=bindparam("b_read_at"), last_read_message_id=bindparam("b_message_id"))
+        )
+        await self.session.execute(stmt, [
+            {
+                "b_conversation_id": watermark.conversation_id,
+                "b_user_id": watermark.user_id,
+                "b_read_at": watermark.read_at,
+                "b_message_id": watermark.message_id,
+            }
+            for watermark in watermarks
+        ])
+        await self.session.flush()
+
     @staticmethod
     def _to_entity(model: models.ConversationParticipant) -> ParticipantEntity:
         return ParticipantEntity(
@@ -75,5 +138,7 @@ class ParticipantRepositoryImpl(ParticipantRepository):
             joined_at=model.joined_at,
             username=model.user.username if model.user else None,
             avatar=model.user.avatar if model.user else None,
+            last_read_at=model.last_read_at,
+            last_read_message_id=model.last_read_message_id,
         )
 
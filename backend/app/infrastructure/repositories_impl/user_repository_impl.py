@@ -4,11 +4,15 @@ from typing import Sequence
 import sqlalchemy as sa
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.domain.entities.user import User as UserEntity
+from app.domain.entities.user import User as UserEntity, UserSummary
 from app.domain.repositories.user_repository import UserRepository
 from app.infrastructure.db.models import user_models
 
 
+# pg_trgm extracts no complete trigram from shorter terms, so the GIN index cannot help
+MIN_SUBSTRING_LENGTH = 3
+
+
 class UserRepositoryImpl(UserRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -38,12 +42,49 @@ class UserRepositoryImpl(UserRepository):
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_users_by_username_email(self, username: str) -> UserEntity:
-        query = sa.select(user_models.Users).where(
-            sa.or_(user_models.Users.username.like(f"%{username}%"),
-                   user_models.Users.email.like(f"%{username}%")))
+    async def update_password(self, user_id: int, password: str) -> None:
+        await self.session.execute(
+            sa.update(user_models.Users).where(user_models.Users.id == user_id).values(password=password)
+        )
+
+    async def search(self, term: str, limit: int) -> Sequence[UserSummary]:
+        """
+        Username autocomplete as a union of index-backed branches, each limited:
+        prefix matches (ix_users_username_prefix), an exact email match (unique
+        email index) and, for terms of MIN_SUBSTRING_LENGTH or more, substring
+        matches (ix_users_username_trgm; trigrams cannot serve shorter terms).
+        Prefix and email matches rank first.
+        """
+        term = term.strip()
+        # backslash is LIKE's default escape; an explicit ESCAPE clause would hide the prefix from the planner
+        pattern = term.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        username = sa.func.lower(user_models.Users.username)
+        columns = (user_models.Users.id, user_models.Users.username, user_models.Users.avatar)
+
+        def branch(rank: int, condition) -> sa.Select:
+            return (
+                sa.select(*columns, sa.literal(rank).label("rank"))
+                .where(condition)
+                .order_by(sa.func.length(user_models.Users.username), user_models.Users.username)
+                .limit(limit)
+            )
+
+        branches = [
+            branch(0, username.like(f"{pattern}%")),
+            branch(0, user_models.Users.email == term),
+        ]
+        if len(term) >= MIN_SUBSTRING_LENGTH:
+            branches.append(branch(1, username.like(f"%{pattern}%")))
+        matches = sa.union_all(*branches).subquery()
+        query = sa.select(matches).order_by(
+            matches.c.rank, sa.func.length(matches.c.username), matches.c.username
+        )
         result = await self.session.execute(query)
-        return result.scalars().all()
+        users: dict[int, UserSummary] = {}
+        for row in result.all():
+            # a user found by several branches keeps its best rank
+            users.setdefault(row.id, UserSummary(id=row.id, username=row.username, avatar=row.avatar))
+        return list(users.values())[:limit]
 
     @staticmethod
     def _to_entity(model: user_models.Users) -> UserEntity:
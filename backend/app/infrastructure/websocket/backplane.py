@@ -0,0 +1,278 @@
+import asyncio
+import json
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger("uvicorn.error")
+
+# Postgres ограничивает payload у NOTIFY 8000 байтами (в кодировке сервера, UTF-8)
+NOTIFY_PAYLOAD_LIMIT = 7999
+# крупные события кладутся в backplane_payloads, а в NOTIFY уходит только ссылка
+PAYLOAD_TTL_SECONDS = 60
+# пауза между попытками восстановить LISTEN-соединение
+RECONNECT_MIN_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30
+
+
+@dataclass(slots=True)
+class Envelope:
+    """
+    Событие, которое передаётся между воркерами через backplane.
+
+    message — уже закодированный JSON-фрейм, он отправляется в сокеты как есть.
+    transient-события (typing, presence) не получают seq и не попадают в буфер.
+    """
+
+    message: str
+    user_id: int | None = None
+    exclude_user_id: int | None = None
+    transient: bool = False
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "message": self.message,
+                "user_id": self.user_id,
+                "exclude_user_id": self.exclude_user_id,
+                "transient": self.transient,
+            },
+            separators=(",", ":"),
+            # кириллица как есть: \uXXXX занимает 6 байт вместо 2
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Envelope":
+        return cls.from_dict(json.loads(raw))
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Envelope":
+        return cls(
+            message=data["message"],
+            user_id=data.get("user_id"),
+            exclude_user_id=data.get("exclude_user_id"),
+            transient=data.get("transient", False),
+        )
+
+
+Handler = Callable[[str, Envelope], Awaitable[None]]
+
+
+class Backplane(ABC):
+    """
+    Pub/sub шина между воркерами.
+
+    ConnectionManager публикует события в канал, а backplane доставляет их
+    обратно в handler каждого воркера, который подписан на этот канал.
+    Подписки считаются по ссылкам: воркер слушает канал, пока держит на нём
+    хотя бы один сокет.
+    """
+
+    def __init__(self) -> None:
+        self._handler: Handler | None = None
+        self._refs: dict[str, int] = {}
+        self._lock = asyncio.Lock()
+
+    async def start(self, handler: Handler) -> None:
+        self._handler = handler
+
+    async def stop(self) -> None:
+        self._refs.clear()
+
+    async def subscribe(self, channel: str) -> None:
+        async with self._lock:
+            count = self._refs.get(channel, 0)
+            if count == 0:
+                await self._listen(channel)
+            self._refs[channel] = count + 1
+
+    async def unsubscribe(self, channel: str) -> None:
+        async with self._lock:
+            count = self._refs.get(channel, 0)
+            if count <= 1:
+                self._refs.pop(channel, None)
+                if count == 1:
+                    await self._unlisten(channel)
+            else:
+                self._refs[channel] = count - 1
+
+    @abstractmethod
+    async def publish(self, channel: str, envelope: Envelope) -> None: ...
+
+    @abstractmethod
+    async def _listen(self, channel: str) -> None: ...
+
+    @abstractmethod
+    async def _unlisten(self, channel: str) -> None: ...
+
+
+class InMemoryBackplane(Backplane):
+    """Backplane для одного воркера: доставляет события сразу в handler."""
+
+    async def publish(self, channel: str, envelope: Envelope) -> None:
+        if self._handler is not None and channel in self._refs:
+            await self._handler(channel, envelope)
+
+    async def _listen(self, channel: str) -> None:
+        pass
+
+    async def _unlisten(self, channel: str) -> None:
+        pass
+
+
+class PostgresBackplane(Backplane):
+    """
+    Backplane поверх Postgres LISTEN/NOTIFY.
+
+    Для LISTEN держит одно выделенное соединение из engine, NOTIFY отправляет
+    через обычный пул. Уведомления обрабатываются одной задачей по очереди,
+    чтобы порядок событий в канале сохранялся.
+
+    События больше лимита NOTIFY записываются в backplane_payloads в той же
+    транзакции, а в канал уходит {"ref": id}; получатели дочитывают событие
+    по ссылке. Если LISTEN-соединение обрывается, оно переоткрывается с
+    экспоненциальной паузой и заново подписывается на все каналы; события,
+    отправленные за время обрыва, этим воркером не будут получены.
+    """
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        super().__init__()
+        self._engine = engine
+        self._connection: AsyncConnection | None = None
+        self._driver: Any = None
+        self._queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        self._dispatcher: asyncio.Task | None = None
+        self._reconnector: asyncio.Task | None = None
+        self._stopping = False
+
+    async def start(self, handler: Handler) -> None:
+        await super().start(handler)
+        self._stopping = False
+        await self._connect()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for task in (self._dispatcher, self._reconnector):
+            if task is not None:
+                task.cancel()
+        self._dispatcher = None
+        self._reconnector = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+            self._driver = None
+        await super().stop()
+
+    async def publish(self, channel: str, envelope: Envelope) -> None:
+        payload = envelope.to_json()
+        async with self._engine.connect() as conn:
+            if len(payload.encode()) > NOTIFY_PAYLOAD_LIMIT:
+                # в NOTIFY не влезает: уведомление уйдёт при commit, когда строка уже видна
+                ref = uuid.uuid4()
+                await conn.execute(
+                    text("DELETE FROM backplane_payloads WHERE created_at < now() - make_interval(secs => :ttl)"),
+                    {"ttl": PAYLOAD_TTL_SECONDS},
+                )
+                await conn.execute(
+                    text("INSERT INTO backplane_payloads (id, payload) VALUES (:id, :payload)"),
+                    {"id": ref, "payload": payload},
+                )
+                payload = json.dumps({"ref": str(ref)})
+            await conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+            await conn.commit()
+
+    async def _connect(self) -> None:
+        self._connection = await self._engine.connect()
+        raw = await self._connection.get_raw_connection()
+        # asyncpg.Connection под адаптером SQLAlchemy
+        self._driver = raw.driver_connection
+        self._driver.add_termination_listener(self._on_terminate)
+
+    def _on_terminate(self, connection: Any) -> None:
+        if self._stopping or self._reconnector is not None:
+            return
+        logger.warning("Backplane LISTEN connection lost, reconnecting")
+        self._driver = None
+        self._reconnector = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        if self._connection is not None:
+            try:
+                await self._connection.invalidate()
+            except Exception:
+                pass
+            self._connection = None
+        delay = RECONNECT_MIN_DELAY
+        while True:
+            try:
+                async with self._lock:
+                    await self._connect()
+                    for channel in self._refs:
+                        await self._driver.add_listener(channel, self._on_notify)
+                break
+            except Exception:
+                logger.exception("Backplane reconnect failed, retrying in %.1fs", delay)
+                self._driver = None
+                if self._connection is not None:
+                    try:
+                        await self._connection.invalidate()
+                    except Exception:
+                        pass
+                    self._connection = None
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+        self._reconnector = None
+        logger.info("Backplane LISTEN connection restored, %d channels", len(self._refs))
+
+    async def _listen(self, channel: str) -> None:
+        # без соединения канал подхватит _reconnect по self._refs
+        if self._driver is not None:
+            await self._driver.add_listener(channel, self._on_notify)
+
+    async def _unlisten(self, channel: str) -> None:
+        if self._driver is not None:
+            await self._driver.remove_listener(channel, self._on_notify)
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        self._queue.put_nowait((channel, payload))
+
+    async def _dispatch(self) -> None:
+        while True:
+            channel, payload = await self._queue.get()
+            if self._handler is None:
+                continue
+            try:
+                envelope = await self._resolve(payload)
+                if envelope is not None:
+                    await self._handler(channel, envelope)
+            except Exception:
+                logger.exception("Backplane delivery failed for %s", channel)
+
+    async def _resolve(self, payload: str) -> Envelope | None:
+        data = json.loads(payload)
+        if "ref" in data:
+            async with self._engine.connect() as conn:
+                stored = (await conn.execute(
+                    text("SELECT payload FROM backplane_payloads WHERE id = :id"), {"id": uuid.UUID(data["ref"])}
+                )).scalar_one_or_none()
+            if stored is None:
+                logger.warning("Backplane payload %s expired before delivery", data["ref"])
+                return None
+            data = json.loads(stored)
+        return Envelope.from_dict(data)
+
+
+def create_backplane(kind: str, engine: AsyncEngine) -> Backplane:
+    if kind == "memory":
+        return InMemoryBackplane()
+    if kind == "postgres":
+        return PostgresBackplane(engine)
+    raise ValueError(f"Unknown websocket backplane: {kind}")
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from enum import Enum
+
+from fastapi import WebSocket
+
+from app.infrastructure.websocket.rate_limiter import Buckets
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class OverflowPolicy(str, Enum):
+    drop_oldest = "drop_oldest"
+    disconnect = "disconnect"
+
+
+# 1013 Try Again Later: клиент не успевает читать
+SLOW_CONSUMER_CLOSE_CODE = 1013
+# 1001 Going Away: клиент перестал отвечать на ping
+IDLE_CLOSE_CODE = 1001
+
+
+class Connection:
+    """
+    Одно WebSocket-подключение с собственной ограниченной очередью отправки.
+
+    broadcast только кладёт уже закодированный фрейм в очередь, а отдельная
+    writer-задача отправляет его в сокет, поэтому медленный клиент не тормозит
+    остальных.
+    """
+
+    __slots__ = (
+        "websocket", "user_id", "channels", "buckets", "_queue", "_policy", "_writer", "_on_close", "closed",
+        "connected_at", "last_activity", "last_ping", "bytes_sent", "messages_sent",
+    )
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: int,
+        max_queue: int,
+        policy: OverflowPolicy,
+        on_close: Callable[["Connection"], Awaitable[None]],
+    ) -> None:
+        self.websocket = websocket
+        self.user_id = user_id
+        # каналы, на которые подписано это подключение
+        self.channels: set[str] = set()
+        # token bucket'ы этого подключения по типам событий
+        self.buckets: Buckets = {}
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max_queue)
+        self._policy = policy
+        self._writer: asyncio.Task | None = None
+        self._on_close = on_close
+        self.closed = False
+        # учёт для heartbeat и метрик
+        now = time.monotonic()
+        self.connected_at = now
+        self.last_activity = now
+        self.last_ping = now
+        self.bytes_sent = 0
+        self.messages_sent = 0
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def touch(self) -> None:
+        """Любой входящий фрейм, включая pong, считается признаком жизни."""
+        self.last_activity = time.monotonic()
+
+    def enqueue(self, frame: str) -> bool:
+        """Возвращает False, если подключение нужно закрыть как медленное."""
+        if self.closed:
+            return True
+        try:
+            self._queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            if self._policy == OverflowPolicy.disconnect:
+                return False
+            self._queue.get_nowait()
+            self._queue.put_nowait(frame)
+        return True
+
+    async def close(self, code: int | None = None) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        if code is not None:
+            try:
+                await self.websocket.close(code=code)
+            except Exception:
+                pass
+
+    async def _write_loop(self) -> None:
+        while True:
+            frame = await self._queue.get()
+            try:
+                await self.websocket.send_text(frame)
+                self.messages_sent += 1
+                self.bytes_sent += len(frame)
+            except Exception:
+                # best-effort: отваливаем невалидные подключения
+                logger.debug("WebSocket send failed for user %s", self.user_id)
+                await self._on_close(self)
+                return
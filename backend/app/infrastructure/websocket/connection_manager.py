@@ -1,48 +1,385 @@
+import asyncio
+import logging
+import time
 from collections import defaultdict
+from collections.abc import Callable, Iterable
 from typing import Any
 
 from fastapi import WebSocket
 
+from app.application.settings import settings
+from app.infrastructure.db.session import engine
+from app.infrastructure.websocket.backplane import Backplane, Envelope, InMemoryBackplane, create_backplane
+from app.infrastructure.metrics import registry
+from app.infrastructure.websocket.connection import (
+    IDLE_CLOSE_CODE,
+    SLOW_CONSUMER_CLOSE_CODE,
+    Connection,
+    OverflowPolicy,
+)
+from app.infrastructure.websocket.encoding import encode_frame
+from app.infrastructure.websocket.presence import TypingTracker
+from app.infrastructure.websocket.rate_limiter import RateLimiter
+from app.infrastructure.websocket.replay import ReplayBuffer
+
+logger = logging.getLogger("uvicorn.error")
+
+PING_FRAME = '{"type":"ping"}'
+# служебный канал для инвалидации кэша участников между воркерами
+MEMBERSHIP_CHANNEL = "internal:membership"
+# служебный канал для инвалидации кэша ответов (списков бесед и участников)
+RESPONSE_CACHE_CHANNEL = "internal:responses"
+# служебный канал: пользователи, которые только что писали и читают с primary
+RECENT_WRITERS_CHANNEL = "internal:recent_writers"
+# сколько presence-анонсов публикуется одновременно при начальной подписке
+PRESENCE_BATCH_SIZE = 16
+
 
 class ConnectionManager:
     """
     Infrastructure-level WebSocket connection manager.
 
-    Хранит подключения по "каналам" (например, conversation:{id}) и user_id.
+    Хранит подключения по "каналам" (например, conversation:{id}) и по user_id.
+    Одно подключение может быть подписано на несколько каналов сразу.
     Занимается только доставкой сообщений, без бизнес-логики.
+    broadcast/send_to_user идут через backplane, поэтому событие доходит
+    до сокетов на всех воркерах, а не только на текущем. Доставка только
+    кладёт сообщение в очередь подключения и не ждёт отправки.
+    Typing и presence — transient-события: они не пишутся в БД и не
+    попадают в буфер повтора.
     """
 
-    def __init__(self) -> None:
-        # channel -> user_id -> WebSocket
-        self._channels: dict[str, dict[int, WebSocket]] = defaultdict(dict)
+    def __init__(
+        self,
+        backplane: Backplane | None = None,
+        max_queue: int = 256,
+        overflow_policy: OverflowPolicy = OverflowPolicy.drop_oldest,
+        replay_size: int = 256,
+        replay_ttl: float = 60,
+        typing: TypingTracker | None = None,
+        rate_limiter: RateLimiter | None = None,
+        sweep_interval: float = 1,
+        ping_interval: float = 25,
+        ping_timeout: float = 60,
+    ) -> None:
+        # channel -> подключения, подписанные на канал
+        self._channels: dict[str, set[Connection]] = defaultdict(set)
+        # user_id -> все подключения пользователя
+        self._users: dict[int, set[Connection]] = defaultdict(set)
+        # channel -> буфер последних событий; живёт, пока воркер подписан на канал
+        self._buffers: dict[str, ReplayBuffer] = {}
+        self._tasks: set[asyncio.Task] = set()
+        # служебные каналы воркера: события уходят в callback, а не в сокеты
+        self._listeners: dict[str, Callable[[str], None]] = {}
+        self._backplane = backplane or InMemoryBackplane()
+        self._max_queue = max_queue
+        self._overflow_policy = overflow_policy
+        self._replay_size = replay_size
+        self._replay_ttl = replay_ttl
+        self._typing = typing or TypingTracker()
+        self._rate_limiter = rate_limiter or RateLimiter()
+        self._sweep_interval = sweep_interval
+        self._ping_interval = ping_interval
+        self._ping_timeout = ping_timeout
+        # счётчики уже закрытых подключений, чтобы метрики не проседали
+        self._closed_bytes_sent = 0
+        self._closed_messages_sent = 0
+        self._sweeper: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        await self._backplane.start(self._deliver)
+        self._sweeper = asyncio.create_task(self._sweep())
+
+    async def stop(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        for connections in list(self._users.values()):
+            for connection in list(connections):
+                await connection.close()
+        for buffer in self._buffers.values():
+            if buffer.release_handle is not None:
+                buffer.release_handle.cancel()
+        self._channels.clear()
+        self._listeners.clear()
+        self._users.clear()
+        self._buffers.clear()
+        await self._backplane.stop()
 
-    async def connect(self, websocket: WebSocket, user_id: int, channel: str) -> None:
+    async def connect(self, websocket: WebSocket, user_id: int, channels: Iterable[str] = ()) -> Connection:
         await websocket.accept()
-        self._channels[channel][user_id] = websocket
+        connection = Connection(websocket, user_id, self._max_queue, self._overflow_policy, self._drop)
+        connection.start()
+        self._users[user_id].add(connection)
+        channels = list(dict.fromkeys(channels))
+        if channels:
+            await self._subscribe_initial(connection, channels)
+        return connection
 
-    def disconnect(self, user_id: int, channel: str) -> None:
-        users = self._channels.get(channel)
-        if not users:
+    async def listen(self, channel: str, callback: Callable[[str], None]) -> None:
+        """Подписывает сам воркер на служебный канал backplane."""
+        if channel not in self._listeners:
+            await self._backplane.subscribe(channel)
+        self._listeners[channel] = callback
+
+    async def disconnect(self, connection: Connection) -> None:
+        await self._drop(connection)
+
+    async def subscribe(
+        self,
+        connection: Connection,
+        channel: str,
+        epoch: str | None = None,
+        last_seq: int | None = None,
+    ) -> None:
+        """
+        Подписывает подключение на канал и отправляет ему sync с текущим seq.
+
+        Если клиент передал epoch и last_seq последнего полученного события,
+        пропущенные события досылаются из буфера, а если буфер разрыв уже
+        не покрывает, вместо sync уходит resync: историю нужно взять из БД.
+        """
+        if connection.closed:
             return
-        users.pop(user_id, None)
-        if not users:
-            self._channels.pop(channel, None)
+        buffer = await self._acquire(channel)
+        if connection.closed:
+            return
+        if self._join(connection, channel):
+            await self._announce(channel, "presence:online", connection.user_id)
+        await self._sync(connection, channel, buffer, epoch, last_seq)
+
+    async def _subscribe_initial(self, connection: Connection, channels: list[str]) -> None:
+        """
+        Начальная подписка сразу на все чаты пользователя.
+
+        Вместо sync на каждый канал уходит один фрейм sync:batch, поэтому
+        пользователь с сотнями чатов не переполняет очередь сокета при
+        подключении. presence:online публикуется пачками по PRESENCE_BATCH_SIZE
+        уже после sync:batch; эти анонсы идут другим участникам, не в этот сокет.
+        """
+        states = []
+        arrived = []
+        for channel in channels:
+            buffer = await self._acquire(channel)
+            if connection.closed:
+                return
+            if self._join(connection, channel):
+                arrived.append(channel)
+            states.append(self._sync_state(channel, buffer))
+        await self.send(connection, {"type": "sync:batch", "payload": {"channels": states}})
+        for start in range(0, len(arrived), PRESENCE_BATCH_SIZE):
+            await asyncio.gather(*(
+                self._announce(channel, "presence:online", connection.user_id)
+                for channel in arrived[start:start + PRESENCE_BATCH_SIZE]
+            ))
+
+    def _join(self, connection: Connection, channel: str) -> bool:
+        """Регистрирует подключение в канале; True, если пользователь только что появился в нём."""
+        if channel in connection.channels:
+            return False
+        first = not self._is_present(connection.user_id, channel)
+        connection.channels.add(channel)
+        self._channels[channel].add(connection)
+        return first
+
+    async def unsubscribe(self, connection: Connection, channel: str) -> None:
+        if channel not in connection.channels:
+            return
+        connection.channels.discard(channel)
+        members = self._channels.get(channel)
+        if members is not None:
+            members.discard(connection)
+            if not members:
+                self._channels.pop(channel, None)
+                self._schedule_release(channel)
+        if not self._is_present(connection.user_id, channel):
+            if self._typing.stop(channel, connection.user_id):
+                await self._announce(channel, "typing:stop", connection.user_id)
+            await self._announce(channel, "presence:offline", connection.user_id)
+
+    def user_connections(self, user_id: int) -> set[Connection]:
+        return self._users.get(user_id, set())
+
+    async def send(self, connection: Connection, message: Any) -> None:
+        """Отправка только в это подключение, мимо backplane."""
+        if not connection.enqueue(encode_frame(message)):
+            await self._drop(connection, code=SLOW_CONSUMER_CLOSE_CODE)
 
     async def send_to_user(self, channel: str, user_id: int, message: Any) -> None:
-        ws = self._channels.get(channel, {}).get(user_id)
-        if ws is not None:
-            await ws.send_json(message)
-
-    async def broadcast(self, channel: str, message: Any, exclude_user_id: int | None = None) -> None:
-        users = self._channels.get(channel, {})
-        for uid, ws in list(users.items()):
-            if exclude_user_id is not None and uid == exclude_user_id:
-                continue
+        await self._backplane.publish(channel, Envelope(message=encode_frame(message), user_id=user_id))
+
+    async def broadcast(
+        self,
+        channel: str,
+        message: Any,
+        exclude_user_id: int | None = None,
+        transient: bool = False,
+    ) -> None:
+        # кодируем один раз, всем получателям уходит одна и та же строка
+        frame = encode_frame(message)
+        await self._backplane.publish(
+            channel, Envelope(message=frame, exclude_user_id=exclude_user_id, transient=transient)
+        )
+
+    def throttle(self, connection: Connection, event_type: str) -> float:
+        """0, если событие укладывается в бюджет, иначе через сколько секунд повторить."""
+        return self._rate_limiter.check(connection.user_id, connection.buckets, event_type)
+
+    async def typing(self, connection: Connection, channel: str, active: bool) -> None:
+        """typing:start/stop без записи в БД, с троттлингом частых нажатий."""
+        if channel not in connection.channels:
+            return
+        if active:
+            if self._typing.start(channel, connection.user_id):
+                await self._announce(channel, "typing:start", connection.user_id)
+        elif self._typing.stop(channel, connection.user_id):
+            await self._announce(channel, "typing:stop", connection.user_id)
+
+    async def _deliver(self, channel: str, envelope: Envelope) -> None:
+        listener = self._listeners.get(channel)
+        if listener is not None:
+            listener(envelope.message)
+            return
+        frame = envelope.message
+        if envelope.user_id is not None:
+            targets = [c for c in self._users.get(envelope.user_id, ()) if channel in c.channels]
+        else:
+            buffer = self._buffers.get(channel)
+            if buffer is not None and not envelope.transient:
+                frame = buffer.append(frame)
+            members = self._channels.get(channel, ())
+            targets = [c for c in members if c.user_id != envelope.exclude_user_id]
+        for connection in targets:
+            if not connection.enqueue(frame):
+                await self._drop(connection, code=SLOW_CONSUMER_CLOSE_CODE)
+
+    async def _drop(self, connection: Connection, code: int | None = None) -> None:
+        if connection.closed:
+            return
+        await connection.close(code)
+        self._closed_bytes_sent += connection.bytes_sent
+        self._closed_messages_sent += connection.messages_sent
+        for channel in list(connection.channels):
+            await self.unsubscribe(connection, channel)
+        connections = self._users.get(connection.user_id)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                self._users.pop(connection.user_id, None)
+                self._rate_limiter.forget(connection.user_id)
+
+    async def _sync(
+        self,
+        connection: Connection,
+        channel: str,
+        buffer: ReplayBuffer,
+        epoch: str | None,
+        last_seq: int | None,
+    ) -> None:
+        frames = buffer.since(epoch, last_seq) if last_seq is not None else []
+        for frame in frames or ():
+            if not connection.enqueue(frame):
+                await self._drop(connection, code=SLOW_CONSUMER_CLOSE_CODE)
+                return
+        event_type = "sync" if frames is not None else "resync"
+        await self.send(connection, {"type": event_type, "payload": self._sync_state(channel, buffer)})
+
+    def _sync_state(self, channel: str, buffer: ReplayBuffer) -> dict[str, Any]:
+        return {
+            "channel": channel,
+            "epoch": buffer.epoch,
+            "seq": buffer.seq,
+            # присутствие выводится из регистраций сокетов этого воркера
+            "online": sorted({c.user_id for c in self._channels.get(channel, ())}),
+        }
+
+    def _is_present(self, user_id: int, channel: str) -> bool:
+        return any(channel in c.channels for c in self._users.get(user_id, ()))
+
+    async def _announce(self, channel: str, event_type: str, user_id: int) -> None:
+        await self.broadcast(
+            channel,
+            {"type": event_type, "payload": {"channel": channel, "user_id": user_id}},
+            exclude_user_id=user_id,
+            transient=True,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        connections = [c for connections in self._users.values() for c in connections]
+        return {
+            "connections": len(connections),
+            "users": len(self._users),
+            "channels": len(self._channels),
+            "buffered_channels": len(self._buffers),
+            "messages_sent": self._closed_messages_sent + sum(c.messages_sent for c in connections),
+            "bytes_sent": self._closed_bytes_sent + sum(c.bytes_sent for c in connections),
+        }
+
+    async def _sweep(self) -> None:
+        """Единственная фоновая задача: истёкший typing, ping и закрытие молчащих сокетов."""
+        while True:
+            await asyncio.sleep(self._sweep_interval)
             try:
-                await ws.send_json(message)
-            except Exception as e:
-                # best-effort: отваливаем невалидные подключения
-                self.disconnect(uid, channel)
+                for channel, user_id in self._typing.expired():
+                    await self._announce(channel, "typing:stop", user_id)
+                await self._heartbeat()
+            except Exception:
+                logger.exception("WebSocket sweep failed")
+
+    async def _heartbeat(self) -> None:
+        now = time.monotonic()
+        for connections in list(self._users.values()):
+            for connection in list(connections):
+                idle = now - connection.last_activity
+                if idle >= self._ping_timeout:
+                    await self._drop(connection, code=IDLE_CLOSE_CODE)
+                elif idle >= self._ping_interval and now - connection.last_ping >= self._ping_interval:
+                    connection.last_ping = now
+                    await self.send(connection, PING_FRAME)
+
+    async def _acquire(self, channel: str) -> ReplayBuffer:
+        buffer = self._buffers.get(channel)
+        if buffer is None:
+            buffer = ReplayBuffer(self._replay_size)
+            self._buffers[channel] = buffer
+            await self._backplane.subscribe(channel)
+        elif buffer.release_handle is not None:
+            buffer.release_handle.cancel()
+            buffer.release_handle = None
+        return buffer
+
+    def _schedule_release(self, channel: str) -> None:
+        # канал без сокетов ещё replay_ttl секунд слушаем, чтобы буфер
+        # продолжал наполняться и переподключившийся клиент мог догнать события
+        buffer = self._buffers.get(channel)
+        if buffer is None or buffer.release_handle is not None:
+            return
+        buffer.release_handle = asyncio.get_running_loop().call_later(
+            self._replay_ttl, lambda: self._spawn(self._release(channel))
+        )
+
+    async def _release(self, channel: str) -> None:
+        buffer = self._buffers.get(channel)
+        if buffer is None or self._channels.get(channel):
+            return
+        del self._buffers[channel]
+        await self._backplane.unsubscribe(channel)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
 
+manager = ConnectionManager(
+    create_backplane(settings.ws_backplane, engine),
+    max_queue=settings.ws_send_queue_size,
+    overflow_policy=OverflowPolicy(settings.ws_overflow_policy),
+    replay_size=settings.ws_replay_buffer_size,
+    replay_ttl=settings.ws_replay_ttl_seconds,
+    typing=TypingTracker(ttl=settings.ws_typing_ttl_seconds, throttle=settings.ws_typing_throttle_seconds),
+    ping_interval=settings.ws_ping_interval_seconds,
+    ping_timeout=settings.ws_ping_timeout_seconds,
+)
 
-manager = ConnectionManager()
\ No newline at end of file
+registry.register("websocket", manager.stats)
@@ -0,0 +1,19 @@
+from typing import Any
+
+from pydantic_core import to_json
+
+
+def encode_frame(message: Any) -> str:
+    """
+    Кодирует сообщение в текстовый WebSocket-фрейм.
+
+    Используется сериализатор pydantic-core: он понимает DTO, UUID и datetime
+    без промежуточного model_dump. Уже закодированные фреймы возвращаются как есть.
+    """
+    if isinstance(message, str):
+        return message
+    return to_json(message).decode()
+
+
+def encode_event(event_type: str, payload: Any) -> str:
+    return encode_frame({"type": event_type, "payload": payload})
@@ -0,0 +1,49 @@
+import time
+
+
+class _Typing:
+    __slots__ = ("expires_at", "announced_at")
+
+    def __init__(self, expires_at: float, announced_at: float) -> None:
+        self.expires_at = expires_at
+        self.announced_at = announced_at
+
+
+class TypingTracker:
+    """
+    Кто сейчас печатает, по (channel, user_id). Живёт только в памяти.
+
+    Клиенты шлют typing:start на каждое нажатие; наружу уходит только первое
+    и затем не чаще раза в throttle секунд, а без новых нажатий запись
+    истекает через ttl секунд.
+    """
+
+    def __init__(self, ttl: float = 6, throttle: float = 3) -> None:
+        self._ttl = ttl
+        self._throttle = throttle
+        self._state: dict[tuple[str, int], _Typing] = {}
+
+    def start(self, channel: str, user_id: int) -> bool:
+        """Продлевает запись; True, если typing:start нужно разослать."""
+        now = time.monotonic()
+        key = (channel, user_id)
+        state = self._state.get(key)
+        if state is None:
+            self._state[key] = _Typing(now + self._ttl, now)
+            return True
+        state.expires_at = now + self._ttl
+        if now - state.announced_at >= self._throttle:
+            state.announced_at = now
+            return True
+        return False
+
+    def stop(self, channel: str, user_id: int) -> bool:
+        """True, если пользователь печатал и typing:stop нужно разослать."""
+        return self._state.pop((channel, user_id), None) is not None
+
+    def expired(self) -> list[tuple[str, int]]:
+        now = time.monotonic()
+        keys = [key for key, state in self._state.items() if state.expires_at <= now]
+        for key in keys:
+            del self._state[key]
+        return keys
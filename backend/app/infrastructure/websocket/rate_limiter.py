@@ -0,0 +1,83 @@
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class Budget:
+    rate: float  # токенов в секунду
+    burst: float  # ёмкость корзины
+
+
+# Бюджеты по типам событий; "*" — для всех остальных
+USER_BUDGETS: dict[str, Budget] = {
+    "message:new": Budget(rate=5, burst=20),
+    "typing:start": Budget(rate=2, burst=10),
+    "typing:stop": Budget(rate=2, burst=10),
+    "subscribe": Budget(rate=10, burst=100),
+    "*": Budget(rate=20, burst=50),
+}
+CONNECTION_BUDGETS: dict[str, Budget] = {
+    "message:new": Budget(rate=3, burst=10),
+    "typing:start": Budget(rate=1, burst=5),
+    "typing:stop": Budget(rate=1, burst=5),
+    "subscribe": Budget(rate=10, burst=100),
+    "*": Budget(rate=10, burst=30),
+}
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float) -> None:
+        self.tokens = tokens
+        self.updated = updated
+
+    def take(self, budget: Budget, now: float) -> float:
+        """Списывает токен; 0, если можно, иначе сколько секунд ждать."""
+        self.tokens = min(budget.burst, self.tokens + (now - self.updated) * budget.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / budget.rate
+
+
+Buckets = dict[str, TokenBucket]
+
+
+class RateLimiter:
+    """
+    Token bucket на пользователя и на подключение, отдельно по типам событий.
+
+    Корзины пользователя живут, пока у него есть хотя бы одно подключение;
+    корзины подключения хранятся в самом подключении и уходят вместе с ним.
+    """
+
+    def __init__(
+        self,
+        user_budgets: dict[str, Budget] | None = None,
+        connection_budgets: dict[str, Budget] | None = None,
+    ) -> None:
+        self._user_budgets = user_budgets or USER_BUDGETS
+        self._connection_budgets = connection_budgets or CONNECTION_BUDGETS
+        self._users: dict[int, Buckets] = {}
+
+    def check(self, user_id: int, connection_buckets: Buckets, event_type: str) -> float:
+        now = time.monotonic()
+        user_buckets = self._users.setdefault(user_id, {})
+        wait = self._take(connection_buckets, self._connection_budgets, event_type, now)
+        if wait:
+            return wait
+        return self._take(user_buckets, self._user_budgets, event_type, now)
+
+    def forget(self, user_id: int) -> None:
+        self._users.pop(user_id, None)
+
+    @staticmethod
+    def _take(buckets: Buckets, budgets: dict[str, Budget], event_type: str, now: float) -> float:
+        key = event_type if event_type in budgets else "*"
+        budget = budgets[key]
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TokenBucket(budget.burst, now)
+        return bucket.take(budget, now)
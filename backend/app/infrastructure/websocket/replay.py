@@ -0,0 +1,43 @@
+import asyncio
+import uuid
+from collections import deque
+
+
+class ReplayBuffer:
+    """
+    Кольцевой буфер последних событий канала с порядковыми номерами.
+
+    seq растёт монотонно в пределах epoch. epoch меняется, когда буфер
+    создаётся заново (другой воркер, рестарт или канал долго был пуст),
+    и тогда номера из разных epoch сравнивать нельзя.
+    """
+
+    __slots__ = ("epoch", "seq", "_frames", "release_handle")
+
+    def __init__(self, size: int) -> None:
+        self.epoch = uuid.uuid4().hex
+        self.seq = 0
+        self._frames: deque[tuple[int, str]] = deque(maxlen=size)
+        # отложенная отписка канала, когда в нём не осталось сокетов
+        self.release_handle: asyncio.TimerHandle | None = None
+
+    def append(self, frame: str) -> str:
+        """Присваивает событию следующий seq и возвращает фрейм с ним."""
+        self.seq += 1
+        # фрейм уже закодирован как JSON-объект: дописываем seq, не кодируя заново
+        stamped = '{"seq":%d,%s' % (self.seq, frame[1:])
+        self._frames.append((self.seq, stamped))
+        return stamped
+
+    def since(self, epoch: str | None, last_seq: int | None) -> list[str] | None:
+        """
+        События после last_seq или None, если буфер не покрывает разрыв
+        и клиенту нужно перечитать историю из БД.
+        """
+        if epoch != self.epoch or last_seq is None or last_seq > self.seq:
+            return None
+        if last_seq == self.seq:
+            return []
+        if not self._frames or self._frames[0][0] > last_seq + 1:
+            return None
+        return [frame for seq, frame in self._frames if seq > last_seq]
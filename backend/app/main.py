@@ -1,10 +1,60 @@
+import asyncio
+from collections.abc import Sequence
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from app.application.membership_cache import membership_cache
+from app.application.response_cache import response_cache
+from app.application.services.chat_service import ChatService
 from app.application.settings import settings
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.infrastructure.db.maintenance import keep_partitions_ahead
+from app.infrastructure.db.message_writer import message_writer
+from app.infrastructure.db.read_watermarks import read_watermarks
+from app.infrastructure.db.session import log_pool_config, recent_writers
+from app.domain.entities.read_watermark import ReadWatermark
+from app.infrastructure.websocket.connection_manager import (
+    MEMBERSHIP_CHANNEL,
+    RECENT_WRITERS_CHANNEL,
+    RESPONSE_CACHE_CHANNEL,
+    manager as connection_manager,
+)
 from app.presentation.api.router import api_router
+from app.presentation.websocket.handlers import broadcast_read_receipts
 from app.presentation.websocket.router import ws_router
-app = FastAPI(root_path="/api/chat", title="Unet Chat Service")
+
+
+async def on_read_watermarks_flushed(watermarks: Sequence[ReadWatermark]) -> None:
+    await response_cache.invalidate(*ChatService.read_watermark_tags(watermarks))
+    await broadcast_read_receipts(watermarks)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_pool_config()
+    partition_upkeep = asyncio.create_task(keep_partitions_ahead(settings.message_partitions_ahead))
+    await connection_manager.start()
+    # membership invalidations reach the other workers through the websocket backplane
+    await connection_manager.listen(MEMBERSHIP_CHANNEL, membership_cache.apply)
+    membership_cache.bind(lambda message: connection_manager.broadcast(MEMBERSHIP_CHANNEL, message, transient=True))
+    await connection_manager.listen(RESPONSE_CACHE_CHANNEL, response_cache.apply)
+    response_cache.bind(lambda message: connection_manager.broadcast(RESPONSE_CACHE_CHANNEL, message, transient=True))
+    # so a user's next read stays on the primary whichever worker serves it
+    await connection_manager.listen(RECENT_WRITERS_CHANNEL, recent_writers.apply)
+    recent_writers.bind(lambda message: connection_manager.broadcast(RECENT_WRITERS_CHANNEL, message, transient=True))
+    if settings.message_batching:
+        await message_writer.start()
+    await read_watermarks.start(on_flush=on_read_watermarks_flushed)
+    yield
+    await read_watermarks.stop()
+    if settings.message_batching:
+        await message_writer.stop()
+    await connection_manager.stop()
+    partition_upkeep.cancel()
+
+
+app = FastAPI(root_path="/api/chat", title="Unet Chat Service", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.origins,
@@ -13,6 +63,7 @@ app.add_middleware(
     allow_headers=['content-disposition', 'accept-encoding',
                   'content-type', 'accept', 'origin', 'authorization', 'dnt', 'x-csrftoken', 'x-requested-with',
                   'Access-Control-Allow-Headers', 'Access-Control-Allow-Credentials', 'Access-Control-Allow-Origin'],
+    expose_headers=['X-Next-Cursor', 'X-Prev-Cursor', 'ETag'],
 )
 app.include_router(api_router)
 app.include_router(ws_router, prefix="/ws")
@@ -1,14 +1,22 @@
 import uuid
+from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, Request
+from pydantic import TypeAdapter
 
-from app.application.dto.conversation_dto import ConversationCreateDTO, ConversationReadDTO
+from app.application.dto.conversation_dto import ConversationCreateDTO, ConversationReadDTO, ConversationReadMarkDTO
+from app.application.dto.message_dto import MessageSearchResultDTO
+from app.application.response_cache import conversation_tag, response_cache, user_tag
 from app.application.services.chat_service import ChatService
 from app.presentation.dependencies.auth import get_current_user_id, security
-from app.presentation.dependencies.services import get_chat_service
+from app.presentation.api.caching import cached_json_response
+from app.presentation.api.messages import NEXT_CURSOR_HEADER
+from app.presentation.dependencies.services import get_chat_service, get_read_chat_service
 
 router = APIRouter(prefix="/conversations", tags=["conversations"])
 
+conversation_list = TypeAdapter(list[ConversationReadDTO])
+
 
 @router.post("/", response_model=ConversationReadDTO, status_code=status.HTTP_201_CREATED)
 async def create_conversation(
@@ -25,16 +33,87 @@ async def create_conversation(
 
 @router.get("/", response_model=list[ConversationReadDTO])
 async def list_conversations(
-        service: ChatService = Depends(get_chat_service),
+        request: Request,
+        limit: int = Query(default=50, ge=1, le=200),
+        before: str | None = Query(default=None),
+        service: ChatService = Depends(get_read_chat_service),
         current_user_id: str = Depends(get_current_user_id),
 ):
-    return await service.list_conversations(current_user_id)
+    """
+    Most recently active first; pass X-Next-Cursor back as ``before`` for the next page.
+
+    Served from the response cache while nothing in the list changes; send the
+    ETag back in If-None-Match to get 304 instead of the body.
+    """
+    key = ("conversations", current_user_id, limit, before)
+    entry = response_cache.get(key)
+    if entry is None:
+        since = response_cache.generation
+        try:
+            page = await service.list_conversations(current_user_id, limit, before)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        # a message in any of the user's conversations can move it onto this page
+        conversation_ids = await service.list_conversation_ids(current_user_id)
+        entry = response_cache.put(
+            key,
+            conversation_list.dump_json(conversation_list.validate_python(page.items, from_attributes=True)),
+            tags=[user_tag(current_user_id), *map(conversation_tag, conversation_ids)],
+            since=since,
+            headers={NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else None,
+        )
+    return cached_json_response(request, entry)
+
+
+@router.get("/{conversation_id}/messages/search", response_model=list[MessageSearchResultDTO])
+async def search_messages(
+    conversation_id: uuid.UUID,
+    response: Response,
+    q: str = Query(min_length=1, max_length=256),
+    sender_id: int | None = Query(default=None),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=100),
+    before: str | None = Query(default=None),
+    current_user_id: int = Depends(get_current_user_id),
+    service: ChatService = Depends(get_read_chat_service),
+):
+    """Full-text search, newest matches first; pass X-Next-Cursor back as ``before``."""
+    try:
+        page = await service.search_messages(
+            current_user_id, conversation_id, q, limit, sender_id, since, until, before
+        )
+    except PermissionError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
+
+
+@router.post("/{conversation_id}/read", status_code=status.HTTP_204_NO_CONTENT)
+async def mark_conversation_read(
+    conversation_id: uuid.UUID,
+    dto: ConversationReadMarkDTO | None = None,
+    current_user_id: int = Depends(get_current_user_id),
+    service: ChatService = Depends(get_chat_service),
+):
+    """Advance the read watermark; applied and broadcast as message:read within a flush interval."""
+    dto = dto or ConversationReadMarkDTO()
+    try:
+        await service.mark_conversation_read(current_user_id, conversation_id, dto.message_id)
+    except PermissionError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
 
 @router.get("/{conversation_id}", response_model=ConversationReadDTO)
 async def get_conversation(
     conversation_id: uuid.UUID,
     current_user_id: int = Depends(get_current_user_id),
-    service: ChatService = Depends(get_chat_service),
+    service: ChatService = Depends(get_read_chat_service),
 ):
     try:
         return await service.get_conversation(current_user_id, conversation_id)
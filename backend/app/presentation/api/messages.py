@@ -1,14 +1,18 @@
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 
 from app.application.dto.message_dto import MessageCreateDTO, MessageReadDTO, MessageUpdateDTO
 from app.application.services.chat_service import ChatService
 from app.presentation.dependencies.auth import get_current_user_id
-from app.presentation.dependencies.services import get_chat_service
+from app.presentation.dependencies.services import get_chat_service, get_read_chat_service
+from app.presentation.websocket.handlers import broadcast_message_deleted, broadcast_message_edited
 
 router = APIRouter(prefix="/messages", tags=["messages"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+
 
 @router.post("/", response_model=MessageReadDTO, status_code=status.HTTP_201_CREATED)
 async def send_message(
@@ -27,12 +31,30 @@ async def send_message(
 @router.get("/{conversation_id}", response_model=list[MessageReadDTO])
 async def list_messages(
     conversation_id: uuid.UUID,
-    limit: int = Query(default=50, le=200),
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    before: str | None = Query(default=None),
+    after: str | None = Query(default=None),
     current_user_id: int = Depends(get_current_user_id),
-    service: ChatService = Depends(get_chat_service),
+    service: ChatService = Depends(get_read_chat_service),
 ):
-    return await service.list_messages(current_user_id, conversation_id, limit, offset)
+    """
+    Messages in ascending order. Page with the opaque cursors returned in
+    X-Next-Cursor (pass as ``after``) and X-Prev-Cursor (pass as ``before``);
+    ``offset`` is kept for older clients.
+    """
+    try:
+        page = await service.list_messages(current_user_id, conversation_id, limit, offset, before, after)
+    except PermissionError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if page.prev_cursor:
+        response.headers[PREV_CURSOR_HEADER] = page.prev_cursor
+    return page.items
 
 
 @router.put("/{message_id}", response_model=MessageReadDTO)
@@ -43,11 +65,13 @@ async def update_message(
     service: ChatService = Depends(get_chat_service),
 ):
     try:
-        return await service.update_message(current_user_id, message_id, dto)
+        message = await service.update_message(current_user_id, message_id, dto)
     except PermissionError as exc:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    await broadcast_message_edited(message)
+    return message
 
 
 @router.delete("/{message_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -57,7 +81,9 @@ async def delete_message(
     service: ChatService = Depends(get_chat_service),
 ):
     try:
-        await service.delete_message(current_user_id, message_id)
+        message = await service.delete_message(current_user_id, message_id)
     except PermissionError as exc:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+    if message is not None:
+        await broadcast_message_deleted(message)
 
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Depends
+
+from app.infrastructure.metrics import registry
+from app.presentation.dependencies.auth import get_current_user_id
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/", dependencies=[Depends(get_current_user_id)])
+async def get_metrics():
+    return registry.snapshot()
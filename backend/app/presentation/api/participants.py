@@ -1,17 +1,21 @@
 import uuid
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import BaseModel, TypeAdapter
 
+from app.application.response_cache import participants_tag, response_cache
 from app.application.services.chat_service import ChatService
 from app.domain.enums.participant_type import ParticipantRole
 from app.presentation.dependencies.auth import get_current_user_id
-from app.presentation.dependencies.services import get_chat_service
+from app.presentation.dependencies.services import get_chat_service, get_read_chat_service
 from app.application.dto.participant_dto import ParticipantReadDTO
+from app.presentation.api.caching import cached_json_response
 
 router = APIRouter(prefix="/conversations/{conversation_id}/participants", tags=["participants"])
 
+participant_list = TypeAdapter(List[ParticipantReadDTO])
+
 
 class ParticipantAddRequest(BaseModel):
     user_id: int
@@ -26,11 +30,7 @@ async def add_participant(
     service: ChatService = Depends(get_chat_service),
 ):
     try:
-        participant = await service.add_participant(current_user_id, conversation_id, payload.user_id)
-        if payload.role:
-            participant = await service.participant_repo.update_role(conversation_id, payload.user_id, payload.role)
-            await service.session.commit()
-        return participant
+        return await service.add_participant(current_user_id, conversation_id, payload.user_id, payload.role)
     except PermissionError as exc:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
 
@@ -50,7 +50,25 @@ async def remove_participant(
 @router.get("", response_model=List[ParticipantReadDTO])
 async def get_participants(
         conversation_id: uuid.UUID,
-        service: ChatService = Depends(get_chat_service),
+        request: Request,
+        service: ChatService = Depends(get_read_chat_service),
         current_user_id: int = Depends(get_current_user_id)
         ):
-    return await service.participants_by_conversations(conversation_id)
\ No newline at end of file
+    """Cached per conversation, with ETag / If-None-Match like the conversation list."""
+    # the cached list is shared by all members, so membership is checked on every request
+    try:
+        await service.ensure_participant(current_user_id, conversation_id)
+    except PermissionError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+    key = ("participants", conversation_id)
+    entry = response_cache.get(key)
+    if entry is None:
+        since = response_cache.generation
+        participants = await service.participants_by_conversations(conversation_id)
+        entry = response_cache.put(
+            key,
+            participant_list.dump_json(participant_list.validate_python(participants, from_attributes=True)),
+            tags=[participants_tag(conversation_id)],
+            since=since,
+        )
+    return cached_json_response(request, entry)
\ No newline at end of file
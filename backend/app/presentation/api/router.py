@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.presentation.api import attachments, conversations, messages, participants, users
+from app.presentation.api import attachments, conversations, messages, metrics, participants, users
 
 api_router = APIRouter()
 api_router.include_router(conversations.router)
@@ -8,4 +8,5 @@ api_router.include_router(participants.router)
 api_router.include_router(messages.router)
 api_router.include_router(attachments.router)
 api_router.include_router(users.router)
+api_router.include_router(metrics.router)
 
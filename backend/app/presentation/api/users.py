@@ -1,6 +1,6 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.util import await_only
 from starlette.responses import HTMLResponse
 
@@ -8,7 +8,7 @@ from app.application.dto import user_dto
 from app.application.security import password_hasher
 from app.application.services.user_service import UserService
 from app.presentation.dependencies.auth import get_current_user_id, security, config
-from app.presentation.dependencies.services import get_chat_service, get_user_service
+from app.presentation.dependencies.services import get_chat_service, get_read_user_service, get_user_service
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -28,23 +28,22 @@ async def login_user(
         response: Response,
         service: UserService = Depends(get_user_service),
 ):
-    user = await service.user_repo.get_user_by_username_email(dto.username)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    verify = service.password_hasher.verify(dto.password, user.password)
-    if not verify:
-        raise HTTPException(status_code=404, detail="Incorrect password")
+    try:
+        user = await service.authenticate(dto.username, dto.password)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
     token = security.create_access_token(uid=str(user.id))
     response.set_cookie(config.JWT_ACCESS_COOKIE_NAME, token)
     return {"token": token}
 
 @router.get("/",
-            dependencies=[Depends(security.access_token_required)],
-            response_model=List[user_dto.UserReadDTO])
+            dependencies=[Depends(get_current_user_id)],
+            response_model=List[user_dto.UserSummaryDTO])
 async def get_users(
         username: str,
-        service: UserService = Depends(get_user_service)):
-    users = await service.get_users_by_username_email(username)
+        limit: int = Query(default=20, ge=1, le=50),
+        service: UserService = Depends(get_read_user_service)):
+    users = await service.search_users(username, limit)
     return users
 
 @router.get("/me/",
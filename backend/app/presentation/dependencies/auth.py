@@ -1,12 +1,13 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
 
-from fastapi import Header, HTTPException, WebSocket, Depends, Request
-from sqlalchemy.util import await_only
+from fastapi import HTTPException, WebSocket, Request
 
+from app.application.security.token_cache import verified_tokens
 from app.application.settings import settings
-from jose import JWTError, jwt
 import logging
-from authx import AuthX, AuthXConfig
+from authx import AuthX, AuthXConfig, RequestToken
+from authx.exceptions import AuthXException
+from app.infrastructure.metrics import registry
 
 config = AuthXConfig()
 config.JWT_SECRET_KEY = settings.jwt_secret
@@ -19,33 +20,36 @@ security = AuthX(config)
 
 logger = logging.getLogger("uvicorn.error")
 
-ALGORITHM = "HS256"
+registry.register("verified_tokens", verified_tokens.stats)
 
-def get_user_id_from_jwt(token: str) -> int:
+
+def get_user_id_from_jwt(token: str, location: str = "headers") -> int:
+    """
+    Verify an access token and return its user id.
+
+    Each token is verified once; repeats are answered from the verified-token
+    cache until the token expires. CSRF is not checked here, it is disabled in
+    the config above.
+    """
+    user_id = verified_tokens.get(token)
+    if user_id is not None:
+        return user_id
     try:
-        payload = jwt.decode(token, settings.jwt_secret, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise ValueError("Invalid token")
-        return int(user_id)
-    except JWTError as e:
-        logger.error(e)
-        logger.error(f"Token: {token}")
-        raise ValueError("Could not validate credentials")
+        payload = security.verify_token(RequestToken(token=token, location=location), verify_csrf=False)
+        user_id = int(payload.sub)
+    except (AuthXException, ValueError) as exc:
+        logger.warning("Rejected access token: %s", exc)
+        raise ValueError("Could not validate credentials") from exc
+    expires_at = payload.exp.timestamp() if isinstance(payload.exp, datetime) else None
+    verified_tokens.put(token, user_id, expires_at)
+    return user_id
+
 
-async def get_current_user_id(
-    request: Request,
-    _: None = Depends(security.access_token_required),
-) -> int:
-    token = await security.get_access_token_from_request(request)
+async def get_current_user_id(request: Request) -> int:
     try:
-        if token.token is None:
-            raise HTTPException(status_code=401,
-                                detail="Unauthorized",
-                                headers={"Authorization": "Bearer"},)
-        user_id = get_user_id_from_jwt(token.token)
-        return user_id
-    except Exception as e:
+        token = await security.get_access_token_from_request(request)
+        return get_user_id_from_jwt(token.token, token.location)
+    except (AuthXException, ValueError) as e:
         raise HTTPException(
             status_code=401,
             detail=e.__str__(),
@@ -60,7 +64,7 @@ def _get_user_id_from_ws(websocket: WebSocket) -> int:
     if not token:
         raise ValueError("Missing Authorization header")
     try:
-        user_id = get_user_id_from_jwt(token)
+        user_id = get_user_id_from_jwt(token, "query")
         return user_id
     except Exception as exc:
         raise ValueError(exc.__str__()) from exc
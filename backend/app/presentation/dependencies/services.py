@@ -1,34 +1,100 @@
-from fastapi import Depends
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.application.services.user_service import UserService
+from app.application.membership_cache import membership_cache
+from app.application.response_cache import response_cache
 from app.application.services.chat_service import ChatService
-from app.infrastructure.db.session import get_session
+from app.application.settings import settings
+from app.infrastructure.db.message_writer import message_writer
+from app.infrastructure.db.read_watermarks import read_watermarks
+from app.infrastructure.db.session import async_session_maker, get_read_session, get_session, recent_writers
+from app.infrastructure.metrics import registry
 from app.infrastructure.repositories_impl.attachment_repository_impl import AttachmentRepositoryImpl
 from app.infrastructure.repositories_impl.conversation_repository_impl import ConversationRepositoryImpl
+from app.infrastructure.repositories_impl.inbox_repository_impl import InboxRepositoryImpl
 from app.infrastructure.repositories_impl.message_repository_impl import MessageRepositoryImpl
 from app.infrastructure.repositories_impl.participant_repository_impl import ParticipantRepositoryImpl
 from app.infrastructure.repositories_impl.user_repository_impl import UserRepositoryImpl
 from app.application.security import password_hasher
+from app.presentation.dependencies.auth import get_current_user_id
+
+registry.register("membership_cache", membership_cache.stats)
+registry.register("read_your_writes", recent_writers.stats)
+registry.register("response_cache", response_cache.stats)
+registry.register("password_hashing", password_hasher.hashing_pool.stats)
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
 
 
-async def get_chat_service(session: AsyncSession = Depends(get_session)) -> ChatService:
+def _build_chat_service(session: AsyncSession) -> ChatService:
     conversation_repo = ConversationRepositoryImpl(session)
     participant_repo = ParticipantRepositoryImpl(session)
     message_repo = MessageRepositoryImpl(session)
     attachment_repo = AttachmentRepositoryImpl(session)
+    inbox_repo = InboxRepositoryImpl(session)
     return ChatService(
         session=session,
         conversation_repo=conversation_repo,
         participant_repo=participant_repo,
         message_repo=message_repo,
         attachment_repo=attachment_repo,
+        inbox_repo=inbox_repo,
+        message_writer=message_writer if settings.message_batching else None,
+        membership_cache=membership_cache if settings.membership_cache_size > 0 else None,
+        read_watermarks=read_watermarks,
+        response_cache=response_cache if settings.response_cache_max_bytes > 0 else None,
     )
 
+
+async def get_chat_service(
+    request: Request,
+    current_user_id: int = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_session),
+) -> ChatService:
+    if request.method not in READ_METHODS:
+        # keep this user's reads on the primary until the replica catches up
+        await recent_writers.mark(current_user_id)
+    return _build_chat_service(session)
+
+
+async def read_session(current_user_id: int = Depends(get_current_user_id)) -> AsyncIterator[AsyncSession]:
+    async for session in get_read_session(current_user_id):
+        yield session
+
+
+async def get_read_chat_service(session: AsyncSession = Depends(read_session)) -> ChatService:
+    """ChatService for read-only endpoints, routed to the read replica when one is configured."""
+    return _build_chat_service(session)
+
+
+@asynccontextmanager
+async def chat_service_scope() -> AsyncIterator[ChatService]:
+    """
+    ChatService on a short-lived session for long-lived connections.
+
+    WebSocket handlers open it per event so an idle socket never holds
+    a pooled DB connection.
+    """
+    async with async_session_maker() as session:
+        yield _build_chat_service(session)
+
+
 async def get_user_service(session: AsyncSession = Depends(get_session)) -> UserService:
     user_repo = UserRepositoryImpl(session)
     return UserService(
         session=session,
         user_repo=user_repo,
         password_hasher=password_hasher.BcryptPasswordHasher()
-    )
\ No newline at end of file
+    )
+
+
+async def get_read_user_service(session: AsyncSession = Depends(read_session)) -> UserService:
+    return UserService(
+        session=session,
+        user_repo=UserRepositoryImpl(session),
+        password_hasher=password_hasher.BcryptPasswordHasher()
+    )
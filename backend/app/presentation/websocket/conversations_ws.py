@@ -1,12 +1,18 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from app.application.dto.message_dto import MessageCreateDTO, MessageReadDTO, MessageUpdateDTO
-from app.application.services.chat_service import ChatService
 from app.infrastructure.websocket.connection_manager import manager as connection_manager
-from app.presentation.dependencies.services import get_chat_service
+from app.presentation.dependencies.services import chat_service_scope
 from app.presentation.dependencies.auth import _get_user_id_from_ws
+from app.presentation.websocket.handlers import (
+    conversation_channel,
+    error_event,
+    handle_new_message,
+    handle_read,
+    rate_limited_event,
+    resume_position,
+)
 
 router = APIRouter()
 
@@ -14,9 +20,8 @@ router = APIRouter()
 async def websocket_conversations(
     websocket: WebSocket,
     conversation_id: UUID,
-    service: ChatService = Depends(get_chat_service),
 ) -> None:
-    channel = f"conversation:{conversation_id}"
+    channel = conversation_channel(conversation_id)
 
     try:
         user_id = _get_user_id_from_ws(websocket)
@@ -26,43 +31,49 @@ async def websocket_conversations(
 
     # Проверяем, что пользователь участник чата
     try:
-        await service.ensure_participant(user_id, conversation_id)
+        async with chat_service_scope() as service:
+            await service.ensure_participant(user_id, conversation_id)
     except PermissionError:
         await websocket.close(code=1008)
         return
 
-    await connection_manager.connect(websocket, user_id, channel)
+    # после переподключения клиент передаёт epoch и last_seq, чтобы догнать пропущенное
+    epoch, last_seq = resume_position(websocket.query_params)
+    connection = await connection_manager.connect(websocket, user_id)
+    await connection_manager.subscribe(connection, channel, epoch, last_seq)
 
     try:
         while True:
             data = await websocket.receive_json()
+            connection.touch()
             event_type = data.get("type")
             payload = data.get("payload") or {}
+            # ответ на heartbeat: достаточно touch()
+            if event_type == "pong":
+                continue
+
+            # Лимит частоты: вместо тихого отбрасывания отвечаем rate_limited
+            retry_after = connection_manager.throttle(connection, event_type)
+            if retry_after:
+                await connection_manager.send(connection, rate_limited_event(event_type, retry_after))
+                continue
 
             # Новое сообщение
             if event_type == "message:new":
-                msg_dto = MessageCreateDTO(
-                    conversation_id=conversation_id,
-                    sender_id=user_id,
-                    text=payload.get("text"),
-                    reply_to=payload.get("reply_to"),
-                )
-                msg = await service.send_message(user_id, msg_dto)
-                ws_payload = MessageReadDTO(
-                    id=msg.id,
-                    conversation_id=msg.conversation_id,
-                    sender_id=msg.sender_id,
-                    text=msg.text,
-                    reply_to=msg.reply_to,
-                    is_edited=msg.is_edited,
-                    created_at=msg.created_at,
-                    avatar=msg.avatar,
-                    username=msg.username
-                ).model_dump(mode="json")
-                await connection_manager.broadcast(
-                    channel,
-                    {"type": "message:new", "payload": ws_payload},
-                )
+                async with chat_service_scope() as service:
+                    await handle_new_message(service, user_id, conversation_id, payload)
+            # Прочитано: watermark копится в памяти и сбрасывается пачкой
+            elif event_type == "message:read":
+                try:
+                    async with chat_service_scope() as service:
+                        await handle_read(service, user_id, conversation_id, payload)
+                except (ValueError, PermissionError) as exc:
+                    await connection_manager.send(connection, error_event(str(exc)))
+            # Индикатор набора: только в памяти, без БД
+            elif event_type in ("typing:start", "typing:stop"):
+                await connection_manager.typing(connection, channel, event_type == "typing:start")
 
     except WebSocketDisconnect:
-        connection_manager.disconnect(user_id, channel)
+        pass
+    finally:
+        await connection_manager.disconnect(connection)
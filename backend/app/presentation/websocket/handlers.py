@@ -0,0 +1,99 @@
+from collections.abc import Mapping, Sequence
+from typing import Any
+from uuid import UUID
+
+from app.application.dto.message_dto import MessageCreateDTO, MessageReadDTO
+from app.application.services.chat_service import ChatService
+from app.domain.entities.message import Message
+from app.domain.entities.read_watermark import ReadWatermark
+from app.infrastructure.db.session import recent_writers
+from app.infrastructure.websocket.connection_manager import manager as connection_manager
+from app.infrastructure.websocket.encoding import encode_event
+
+
+def conversation_channel(conversation_id: UUID) -> str:
+    return f"conversation:{conversation_id}"
+
+
+def resume_position(source: Mapping[str, Any]) -> tuple[str | None, int | None]:
+    """epoch и last_seq, с которых клиент хочет продолжить получать события канала."""
+    epoch = source.get("epoch")
+    try:
+        last_seq = int(source["last_seq"]) if source.get("last_seq") is not None else None
+    except (TypeError, ValueError):
+        last_seq = None
+    return (str(epoch) if epoch else None), last_seq
+
+
+def error_event(detail: str) -> str:
+    return encode_event("error", {"detail": detail})
+
+
+def rate_limited_event(event_type: str, retry_after: float) -> str:
+    return encode_event("rate_limited", {"event": event_type, "retry_after": round(retry_after, 3)})
+
+
+async def handle_new_message(service: ChatService, user_id: int, conversation_id: UUID, payload: dict) -> None:
+    msg_dto = MessageCreateDTO(
+        conversation_id=conversation_id,
+        sender_id=user_id,
+        text=payload.get("text"),
+        reply_to=payload.get("reply_to"),
+    )
+    await recent_writers.mark(user_id)
+    msg = await service.send_message(user_id, msg_dto)
+    ws_payload = MessageReadDTO(
+        id=msg.id,
+        conversation_id=msg.conversation_id,
+        sender_id=msg.sender_id,
+        text=msg.text,
+        reply_to=msg.reply_to,
+        is_edited=msg.is_edited,
+        created_at=msg.created_at,
+        avatar=msg.avatar,
+        username=msg.username
+    )
+    await connection_manager.broadcast(conversation_channel(conversation_id), encode_event("message:new", ws_payload))
+
+
+async def broadcast_message_edited(message: Message) -> None:
+    await connection_manager.broadcast(
+        conversation_channel(message.conversation_id),
+        encode_event("message:edited", MessageReadDTO.model_validate(message)),
+    )
+
+
+async def broadcast_message_deleted(message: Message) -> None:
+    await connection_manager.broadcast(
+        conversation_channel(message.conversation_id),
+        encode_event("message:deleted", {"id": message.id, "conversation_id": message.conversation_id}),
+    )
+
+
+async def handle_read(service: ChatService, user_id: int, conversation_id: UUID, payload: dict) -> None:
+    """
+    message:read: клиент сообщает последнее прочитанное сообщение (message_id).
+
+    Время прочтения берётся из строки сообщения, а не от клиента. Любой
+    некорректный payload превращается в ValueError, чтобы сокет не закрывался.
+    """
+    try:
+        raw = payload.get("message_id")
+        message_id = UUID(raw) if raw else None
+    except (AttributeError, TypeError, ValueError) as exc:
+        raise ValueError("Invalid read position") from exc
+    await service.mark_conversation_read(user_id, conversation_id, message_id)
+
+
+async def broadcast_read_receipts(watermarks: Sequence[ReadWatermark]) -> None:
+    """Рассылает message:read после сброса watermark-ов, не чаще раза за интервал сброса."""
+    for watermark in watermarks:
+        await connection_manager.broadcast(
+            conversation_channel(watermark.conversation_id),
+            encode_event("message:read", {
+                "conversation_id": watermark.conversation_id,
+                "user_id": watermark.user_id,
+                "message_id": watermark.message_id,
+                "read_at": watermark.read_at,
+            }),
+        )
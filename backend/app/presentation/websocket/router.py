@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
-from app.presentation.websocket import conversations_ws
+from app.presentation.websocket import conversations_ws, user_ws
 
 ws_router = APIRouter()
 ws_router.include_router(conversations_ws.router)
+ws_router.include_router(user_ws.router)
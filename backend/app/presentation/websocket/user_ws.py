@@ -0,0 +1,89 @@
+from uuid import UUID
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from app.infrastructure.websocket.connection_manager import manager as connection_manager
+from app.presentation.dependencies.services import chat_service_scope
+from app.presentation.dependencies.auth import _get_user_id_from_ws
+from app.presentation.websocket.handlers import (
+    conversation_channel,
+    error_event,
+    handle_new_message,
+    handle_read,
+    rate_limited_event,
+    resume_position,
+)
+
+router = APIRouter()
+
+
+@router.websocket("/")
+async def websocket_user(
+    websocket: WebSocket,
+) -> None:
+    """
+    Один сокет на пользователя: сразу подписан на все его чаты.
+
+    При подключении приходит один sync:batch с epoch/seq всех чатов.
+    Каждое событие несёт conversation_id в payload. Фреймы subscribe/unsubscribe
+    меняют набор чатов, например после добавления в новую группу. subscribe
+    с epoch и last_seq после переподключения досылает пропущенные события.
+    """
+    try:
+        user_id = _get_user_id_from_ws(websocket)
+    except ValueError:
+        await websocket.close(code=1008)
+        return
+
+    async with chat_service_scope() as service:
+        conversation_ids = await service.list_conversation_ids(user_id)
+    connection = await connection_manager.connect(
+        websocket, user_id, [conversation_channel(cid) for cid in conversation_ids]
+    )
+
+    try:
+        while True:
+            data = await websocket.receive_json()
+            connection.touch()
+            event_type = data.get("type")
+            payload = data.get("payload") or {}
+            # ответ на heartbeat: достаточно touch()
+            if event_type == "pong":
+                continue
+
+            retry_after = connection_manager.throttle(connection, event_type)
+            if retry_after:
+                await connection_manager.send(connection, rate_limited_event(event_type, retry_after))
+                continue
+
+            try:
+                conversation_id = UUID(str(payload.get("conversation_id")))
+            except ValueError:
+                await connection_manager.send(connection, error_event("conversation_id is required"))
+                continue
+            channel = conversation_channel(conversation_id)
+
+            try:
+                if event_type == "subscribe":
+                    if channel not in connection.channels:
+                        async with chat_service_scope() as service:
+                            await service.ensure_participant(user_id, conversation_id)
+                    epoch, last_seq = resume_position(payload)
+                    await connection_manager.subscribe(connection, channel, epoch, last_seq)
+                elif event_type == "unsubscribe":
+                    await connection_manager.unsubscribe(connection, channel)
+                elif event_type == "message:new":
+                    async with chat_service_scope() as service:
+                        await handle_new_message(service, user_id, conversation_id, payload)
+                elif event_type == "message:read":
+                    async with chat_service_scope() as service:
+                        await handle_read(service, user_id, conversation_id, payload)
+                elif event_type in ("typing:start", "typing:stop"):
+                    await connection_manager.typing(connection, channel, event_type == "typing:start")
+            except (PermissionError, ValueError) as exc:
+                await connection_manager.send(connection, error_event(str(exc)))
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await connection_manager.disconnect(connection)
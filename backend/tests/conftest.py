@@ -0,0 +1,15 @@
+import os
+
+# settings are read at import time; the pure-Python units under test need no real database
+for name, value in {
+    "SECRET_KEY": "test-secret-key-that-is-long-enough-for-hs256",
+    "ORIGINS": "[]",
+    "POSTGRES_DB": "chat",
+    "POSTGRES_USER": "chat",
+    "POSTGRES_PASSWORD": "chat",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "DEBUG": "false",
+}.items():
+    os.environ.setdefault(name, value)
+
@@ -0,0 +1,54 @@
+"""
+Helpers for tests that need a real Postgres database or are benchmarks.
+
+Database tests run only when TEST_DATABASE_URL points at a scratch database
+(postgresql+asyncpg://...); benchmarks additionally need RUN_BENCHMARKS=1.
+"""
+import os
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+import app.main  # noqa: F401  registers every model
+from app.infrastructure.db.base import Base
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+requires_database = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+benchmark = pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="RUN_BENCHMARKS is not set")
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+@asynccontextmanager
+async def scratch_schema(**engine_options: Any) -> AsyncIterator[AsyncEngine]:
+    """An engine on a throwaway schema holding every model's tables; dropped on exit."""
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    admin = create_async_engine(TEST_DATABASE_URL)
+    async with admin.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gin"))
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_async_engine(
+        TEST_DATABASE_URL,
+        connect_args={"server_settings": {"search_path": f"{schema}, public"}},
+        **engine_options,
+    )
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(text("CREATE TABLE messages_default PARTITION OF messages DEFAULT"))
+        yield engine
+    finally:
+        await engine.dispose()
+        async with admin.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        await admin.dispose()
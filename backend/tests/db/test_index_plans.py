@@ -0,0 +1,175 @@
+"""
+Index coverage of the hot lookup paths.
+
+Each case runs a repository method against a recording session and checks
+the statement it actually emits. The metadata checks always run. The plan
+checks need a scratch Postgres database: set TEST_DATABASE_URL
+(postgresql+asyncpg://...). They build the schema in a throwaway schema and
+assert that EXPLAIN of each captured statement picks the expected index.
+"""
+import asyncio
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import app.main  # noqa: F401  registers every model
+from app.domain.entities.message import Message, new_message_id
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.maintenance import add_months, month_start, partition_name
+from app.infrastructure.repositories_impl.attachment_repository_impl import AttachmentRepositoryImpl
+from app.infrastructure.repositories_impl.inbox_repository_impl import InboxRepositoryImpl
+from app.infrastructure.repositories_impl.message_repository_impl import MessageRepositoryImpl
+from app.infrastructure.repositories_impl.participant_repository_impl import ParticipantRepositoryImpl
+from tests.fakes import RecordingSession
+
+CONVERSATION_ID = uuid.uuid4()
+NOW = datetime.utcnow()
+MESSAGE_ID = new_message_id(NOW)
+
+# (name, repository call, table, declared index, what the plan must show);
+# indexes on partitions are named after the partition, so the plan of a
+# messages path is matched on the generated name's suffix
+HOT_PATHS = [
+    (
+        "conversations of a user",
+        lambda s: ParticipantRepositoryImpl(s).list_conversation_ids_for_user(1),
+        "conversation_participants",
+        "ix_conversation_participants_user_id",
+        "ix_conversation_participants_user_id",
+    ),
+    (
+        "membership check",
+        lambda s: ParticipantRepositoryImpl(s).get(CONVERSATION_ID, 1),
+        "conversation_participants",
+        "uq_conversation_participants_conversation_id_user_id",
+        "uq_conversation_participants_conversation_id_user_id",
+    ),
+    (
+        "attachments of a message",
+        lambda s: AttachmentRepositoryImpl(s).list_for_message(MESSAGE_ID),
+        "attachments",
+        "ix_attachments_message_id",
+        "ix_attachments_message_id",
+    ),
+    (
+        "inbox preview update",
+        lambda s: InboxRepositoryImpl(s).update_preview(
+            Message(MESSAGE_ID, CONVERSATION_ID, 1, "text", None, True, NOW)
+        ),
+        "inbox",
+        "ix_inbox_conversation_id",
+        "ix_inbox_conversation_id",
+    ),
+    (
+        "conversation list",
+        lambda s: InboxRepositoryImpl(s).list_for_user(1, 50),
+        "inbox",
+        "ix_inbox_user_id_last_activity_at_conversation_id",
+        "ix_inbox_user_id_last_activity_at_conversation_id",
+    ),
+    (
+        "message history page",
+        lambda s: MessageRepositoryImpl(s).list_page(CONVERSATION_ID, 50),
+        "messages",
+        "ix_messages_conversation_id_created_at_id",
+        "_conversation_id_created_at_id_idx",
+    ),
+    (
+        "message by id",
+        lambda s: MessageRepositoryImpl(s).get(MESSAGE_ID),
+        "messages",
+        "messages_pkey",
+        "_pkey",
+    ),
+    (
+        "message edit",
+        lambda s: MessageRepositoryImpl(s).update_text(MESSAGE_ID, 1, "edited"),
+        "messages",
+        "messages_pkey",
+        "_pkey",
+    ),
+    (
+        "message delete",
+        lambda s: MessageRepositoryImpl(s).delete(MESSAGE_ID, 1),
+        "messages",
+        "messages_pkey",
+        "_pkey",
+    ),
+]
+# lookups by a time-ordered id must touch only the partition of its month
+BY_ID = ["message by id", "message edit", "message delete"]
+IDS = [name for name, *_ in HOT_PATHS]
+
+
+def capture(call) -> str:
+    """The first statement the repository call emits, with its parameters inlined."""
+    session = RecordingSession()
+    asyncio.run(call(session))
+    statement = session.statements[0]
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def index_names(table: str) -> set[str]:
+    """Declared index and constraint names; the primary key gets Postgres' default name."""
+    table = Base.metadata.tables[table]
+    names = {index.name for index in table.indexes}
+    names.update(constraint.name for constraint in table.constraints if constraint.name)
+    if table.primary_key.columns:
+        names.add(f"{table.name}_pkey")
+    return names
+
+
+@pytest.mark.parametrize("name, call, table, index, plan", HOT_PATHS, ids=IDS)
+def test_models_declare_the_index(name, call, table, index, plan):
+    assert f" {table}" in capture(call)
+    assert index in index_names(table)
+
+
+@pytest.mark.skipif(not os.environ.get("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL is not set")
+def test_planner_uses_the_indexes():
+    statements = {name: capture(call) for name, call, *_ in HOT_PATHS}
+
+    async def scenario() -> dict[str, str]:
+        engine = create_async_engine(os.environ["TEST_DATABASE_URL"])
+        schema = f"plans_{uuid.uuid4().hex[:8]}"
+        month = month_start(NOW)
+        previous = add_months(month, -1)
+        plans = {}
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gin"))
+                await conn.execute(text(f"CREATE SCHEMA {schema}"))
+                await conn.execute(text(f"SET LOCAL search_path TO {schema}, public"))
+                await conn.run_sync(Base.metadata.create_all)
+                await conn.execute(text(
+                    f"CREATE TABLE {partition_name(previous)} PARTITION OF messages "
+                    f"FOR VALUES FROM ('{previous.isoformat()}') TO ('{month.isoformat()}')"
+                ))
+                await conn.execute(text(
+                    f"CREATE TABLE {partition_name(month)} PARTITION OF messages "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO (MAXVALUE)"
+                ))
+                await conn.execute(text("CREATE TABLE messages_default PARTITION OF messages DEFAULT"))
+                # empty tables: make any usable index cheaper than a scan
+                await conn.execute(text("SET LOCAL enable_seqscan = off"))
+                for name, statement in statements.items():
+                    rows = (await conn.execute(text(f"EXPLAIN {statement}"))).scalars().all()
+                    plans[name] = "\n".join(rows)
+                await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        finally:
+            await engine.dispose()
+        return plans
+
+    plans = asyncio.run(scenario())
+    for name, *_, plan in HOT_PATHS:
+        assert plan in plans[name], plans[name]
+    for name in BY_ID:
+        assert partition_name(month_start(NOW)) in plans[name], plans[name]
+        assert partition_name(add_months(month_start(NOW), -1)) not in plans[name], plans[name]
+        assert "messages_default" not in plans[name], plans[name]
@@ -0,0 +1,84 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.infrastructure.db import maintenance
+
+
+class Result:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def all(self):
+        return self.rows
+
+    def scalar(self):
+        raise RuntimeError("relation messages_default does not exist")
+
+
+class AbortingConnection:
+    """Mimics Postgres: after a failed statement the transaction only accepts ROLLBACK."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+        self.aborted = False
+
+    async def execute(self, statement, params=None):
+        if self.aborted:
+            raise RuntimeError("current transaction is aborted")
+        sql = str(statement)
+        self.statements.append(sql)
+        result = Result()
+        if "EXISTS" in sql:
+            self.aborted = True
+        return result
+
+    async def commit(self):
+        if self.aborted:
+            raise RuntimeError("current transaction is aborted")
+
+    async def rollback(self):
+        self.aborted = False
+
+
+def test_partition_lock_is_released_when_creation_fails():
+    conn = AbortingConnection()
+    with pytest.raises(RuntimeError, match="messages_default"):
+        asyncio.run(maintenance.ensure_partitions(conn, datetime(2026, 10, 18), 1, dry_run=False))
+    assert "pg_advisory_unlock" in conn.statements[-1]
+
+
+def test_months_roll_over_the_year():
+    assert maintenance.add_months(datetime(2026, 11, 1), 2) == datetime(2027, 1, 1)
+    assert maintenance.partition_name(datetime(2027, 1, 1)) == "messages_p202701"
+
+
+class DeletingConnection:
+    """Returns the given batches from successive DELETE ... RETURNING statements."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+
+    async def execute(self, statement, params=None):
+        return Result(self.batches.pop(0) if self.batches else [])
+
+    async def commit(self):
+        pass
+
+
+def test_expired_rows_record_the_newest_removed_message_per_conversation(monkeypatch):
+    monkeypatch.setattr(maintenance, "DELETE_BATCH_SIZE", 2)
+    monkeypatch.setattr(
+        maintenance, "retention_cutoffs", lambda now: {maintenance.ConversationType.private: now}
+    )
+    first, second = uuid.uuid4(), uuid.uuid4()
+    conn = DeletingConnection([
+        [(first, datetime(2026, 1, 2)), (second, datetime(2026, 1, 1))],
+        [(first, datetime(2026, 1, 3))],
+    ])
+    removed = {}
+    deleted = asyncio.run(maintenance.delete_expired_rows(conn, datetime(2026, 10, 1), False, removed))
+    assert deleted == {"private": 3}
+    assert removed == {first: datetime(2026, 1, 3), second: datetime(2026, 1, 1)}
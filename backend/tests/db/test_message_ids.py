@@ -0,0 +1,61 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
+
+import app.main  # noqa: F401  registers every model
+from app.domain.entities.message import message_id_time, new_message_id
+from app.infrastructure.repositories_impl.message_repository_impl import MessageRepositoryImpl
+from tests.fakes import RecordingSession
+
+
+def test_id_carries_the_creation_millisecond():
+    created_at = datetime(2026, 10, 18, 12, 30, 15, 123456)
+    message_id = new_message_id(created_at)
+    assert message_id.version == 7
+    assert message_id_time(message_id) == datetime(2026, 10, 18, 12, 30, 15, 123000)
+
+
+def test_ids_sort_by_time():
+    earlier = new_message_id(datetime(2026, 1, 31, 23, 59, 59))
+    later = new_message_id(datetime(2026, 2, 1))
+    assert earlier < later
+
+
+def test_random_ids_have_no_time():
+    assert message_id_time(uuid.uuid4()) is None
+
+
+def where_clause(call) -> str:
+    session = RecordingSession()
+    asyncio.run(call(MessageRepositoryImpl(session)))
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    return sql.split("WHERE", 1)[1]
+
+
+def test_lookups_by_id_bound_created_at_to_its_millisecond():
+    created_at = datetime(2026, 10, 18, 12, 30, 15, 123456)
+    message_id = new_message_id(created_at)
+    for call in (
+        lambda repo: repo.get(message_id),
+        lambda repo: repo.update_text(message_id, 1, "edited"),
+        lambda repo: repo.delete(message_id, 1),
+        lambda repo: repo.get_created_at(uuid.uuid4(), message_id),
+    ):
+        where = where_clause(call)
+        assert "messages.created_at >= '2026-10-18 12:30:15.123000'" in where
+        assert "messages.created_at < '2026-10-18 12:30:15.124000'" in where
+
+
+def test_lookups_by_random_id_are_not_bounded():
+    assert "created_at" not in where_clause(lambda repo: repo.get(uuid.uuid4()))
+
+
+def test_offset_history_starts_at_the_conversation():
+    where = where_clause(lambda repo: repo.list_for_conversation(uuid.uuid4(), 50, 100))
+    assert "messages.created_at >= (SELECT conversations.created_at" in where
+
+
+def test_id_past_the_datetime_range_has_no_time():
+    assert message_id_time(uuid.UUID("ffffffff-ffff-7fff-bfff-ffffffffffff")) is None
@@ -0,0 +1,82 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import app.main  # noqa: F401  registers every model
+from app.application.membership_cache import MembershipCache
+from app.application.pagination import encode_cursor
+from app.application.services.chat_service import ChatService, to_naive_utc
+from app.domain.enums.participant_type import ParticipantRole
+from app.infrastructure.repositories_impl.message_repository_impl import MessageRepositoryImpl
+from tests.fakes import RecordingSession
+
+CONVERSATION_ID = uuid.uuid4()
+
+
+def test_aware_datetimes_become_naive_utc():
+    moscow = timezone(timedelta(hours=3))
+    assert to_naive_utc(datetime(2026, 10, 18, 15, 0, tzinfo=moscow)) == datetime(2026, 10, 18, 12, 0)
+    assert to_naive_utc(datetime(2026, 10, 18, 15, 0)) == datetime(2026, 10, 18, 15, 0)
+    assert to_naive_utc(None) is None
+
+
+def compiled(session: RecordingSession):
+    return session.statements[0].compile(dialect=postgresql.dialect())
+
+
+def service(session: RecordingSession) -> ChatService:
+    membership = MembershipCache()
+    membership.put(CONVERSATION_ID, 1, ParticipantRole.member, since=membership.generation)
+    return ChatService(
+        session=session,
+        conversation_repo=None,
+        participant_repo=None,
+        message_repo=MessageRepositoryImpl(session),
+        attachment_repo=None,
+        inbox_repo=None,
+        membership_cache=membership,
+    )
+
+
+def test_search_bounds_reach_the_statement_as_naive_utc():
+    session = RecordingSession()
+    moscow = timezone(timedelta(hours=3))
+    last_id = uuid.uuid4()
+    asyncio.run(service(session).search_messages(
+        1,
+        CONVERSATION_ID,
+        "release notes",
+        sender_id=7,
+        since=datetime(2026, 10, 1, 3, 0, tzinfo=moscow),
+        until=datetime(2026, 10, 18, 0, 0),
+        before=encode_cursor(datetime(2026, 10, 17, 9, 30), last_id),
+    ))
+    statement = compiled(session)
+    sql = " ".join(str(statement).split())
+    values = list(statement.params.values())
+    assert "websearch_to_tsquery" in sql and "release notes" in values
+    assert "messages.sender_id = " in sql and 7 in values
+    assert "messages.created_at >= " in sql and "messages.created_at < " in sql
+    assert "(messages.created_at, messages.id) < (" in sql
+    # since arrived as 03:00 at UTC+3: the bound is midnight UTC, without tzinfo
+    assert datetime(2026, 10, 1, 0, 0) in values
+    assert datetime(2026, 10, 18, 0, 0) in values
+    assert datetime(2026, 10, 17, 9, 30) in values and last_id in values
+    assert not any(isinstance(value, datetime) and value.tzinfo for value in values)
+
+
+def test_headlines_join_the_page_on_id_and_created_at():
+    session = RecordingSession()
+    asyncio.run(MessageRepositoryImpl(session).search(CONVERSATION_ID, "hello", 20))
+    sql = " ".join(str(compiled(session)).split())
+    # the page is chosen before ts_headline runs, and created_at in the join lets it prune partitions
+    assert "anon_1.id = messages.id AND anon_1.created_at = messages.created_at" in sql
+    assert sql.index("LIMIT ") < sql.index(") AS anon_1")
+
+
+def test_blank_query_is_rejected():
+    with pytest.raises(ValueError, match="Search query is empty"):
+        asyncio.run(service(RecordingSession()).search_messages(1, CONVERSATION_ID, "   "))
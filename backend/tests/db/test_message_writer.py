@@ -0,0 +1,80 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+from app.domain.entities.message import Message
+from app.infrastructure.db.message_writer import MessageBatchWriter
+
+
+class SlowWriter(MessageBatchWriter):
+    """Records each inserted batch instead of touching the database."""
+
+    def __init__(self, delay: float, **kwargs) -> None:
+        super().__init__(session_maker=None, **kwargs)
+        self.delay = delay
+        self.batches: list[list[str]] = []
+
+    async def _insert(self, messages):
+        await asyncio.sleep(self.delay)
+        self.batches.append([message.text for message in messages])
+        return messages
+
+
+def message(text: str) -> Message:
+    return Message(uuid.uuid4(), uuid.uuid4(), 1, text, None, False, datetime.utcnow())
+
+
+def test_stop_waits_for_the_batch_being_inserted():
+    async def scenario():
+        writer = SlowWriter(delay=0.05, max_delay=0.001)
+        await writer.start()
+        writes = [asyncio.create_task(writer.write(message(str(i)))) for i in range(3)]
+        await asyncio.sleep(0.01)  # the flush is now in flight
+        await writer.stop()
+        return writer.batches, [write.result().text for write in writes]
+
+    batches, results = asyncio.run(scenario())
+    assert batches == [["0", "1", "2"]]
+    assert results == ["0", "1", "2"]
+
+
+def test_stop_flushes_messages_still_being_collected():
+    async def scenario():
+        writer = SlowWriter(delay=0, max_delay=10)
+        await writer.start()
+        writes = [asyncio.create_task(writer.write(message(str(i)))) for i in range(2)]
+        await asyncio.sleep(0.01)
+        await writer.stop()
+        return writer.batches, all(write.done() for write in writes)
+
+    batches, done = asyncio.run(scenario())
+    assert batches == [["0", "1"]]
+    assert done
+
+
+def test_cancelled_flush_fails_the_pending_callers():
+    async def scenario():
+        writer = SlowWriter(delay=10, max_delay=0.001)
+        await writer.start()
+        write = asyncio.create_task(writer.write(message("lost")))
+        await asyncio.sleep(0.01)
+        writer._task.cancel()
+        try:
+            await write
+        except RuntimeError as exc:
+            return str(exc)
+
+    assert asyncio.run(scenario()) == "Message writer was cancelled"
+
+
+def test_write_after_stop_is_rejected():
+    async def scenario():
+        writer = SlowWriter(delay=0, max_delay=0.001)
+        await writer.start()
+        await writer.stop()
+        try:
+            await asyncio.wait_for(writer.write(message("late")), 1)
+        except RuntimeError as exc:
+            return str(exc), writer.batches
+
+    assert asyncio.run(scenario()) == ("Message writer is stopped", [])
@@ -0,0 +1,68 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+import app.main  # noqa: F401  registers every model
+from app.domain.entities.participant import Participant
+from app.domain.enums.participant_type import ParticipantRole
+from app.infrastructure.repositories_impl.participant_repository_impl import ParticipantRepositoryImpl
+from tests.fakes import RecordingSession
+
+CONVERSATION_ID = uuid.uuid4()
+JOINED_AT = datetime(2026, 10, 18, 12, 0)
+
+
+class ExistingUsers:
+    def __init__(self, user_ids) -> None:
+        self.user_ids = list(user_ids)
+
+    def all(self) -> list[int]:
+        return self.user_ids
+
+
+class UsersSession(RecordingSession):
+    """The users looked up before the insert exist; the insert itself is recorded."""
+
+    def __init__(self, user_ids) -> None:
+        super().__init__()
+        self.user_ids = user_ids
+
+    async def scalars(self, statement, params=None):
+        if params is None:
+            return ExistingUsers(self.user_ids)
+        return await super().scalars(statement, params)
+
+
+def participant(user_id: int) -> Participant:
+    return Participant(None, CONVERSATION_ID, user_id, ParticipantRole.member, JOINED_AT)
+
+
+def test_added_member_has_read_up_to_joining():
+    session = RecordingSession()
+    asyncio.run(ParticipantRepositoryImpl(session).add(participant(2)))
+    values = session.statements[0].compile().params
+    assert values["last_read_at"] == JOINED_AT
+
+
+def test_members_added_together_have_read_up_to_joining():
+    session = UsersSession([1, 2])
+    asyncio.run(ParticipantRepositoryImpl(session).add_many([participant(1), participant(2)]))
+    rows = session.params[-1]
+    assert [row["last_read_at"] for row in rows] == [JOINED_AT, JOINED_AT]
+
+
+def test_members_are_inserted_with_one_statement():
+    session = UsersSession(range(1, 51))
+    asyncio.run(ParticipantRepositoryImpl(session).add_many([participant(i) for i in range(1, 51)]))
+    [insert] = session.statements
+    assert insert.is_insert
+    assert [row["user_id"] for row in session.params[0]] == list(range(1, 51))
+
+
+def test_missing_users_fail_before_anything_is_inserted():
+    session = UsersSession([1])
+    with pytest.raises(ValueError, match="Users not found: 2, 3"):
+        asyncio.run(ParticipantRepositoryImpl(session).add_many([participant(i) for i in (1, 2, 3)]))
+    assert session.statements == []
@@ -0,0 +1,55 @@
+"""
+Throughput of short DB-bound requests at different pool sizes.
+
+Needs TEST_DATABASE_URL and RUN_BENCHMARKS=1. Each simulated request checks
+out a session and runs a query holding the connection for QUERY_SECONDS,
+like a typical handler; CONCURRENCY of them run at once. The pool is the
+app's InstrumentedAsyncPool, so checkout waits are measured the same way
+/metrics reports them.
+"""
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.infrastructure.db.pool import CheckoutStats, InstrumentedAsyncPool
+from tests.database import benchmark, requires_database, scratch_schema
+
+POOL_SIZES = [2, 5, 10, 20]
+CONCURRENCY = 50
+REQUESTS = 400
+QUERY_SECONDS = 0.005
+
+
+async def measure(pool_size: int) -> tuple[float, dict]:
+    """Requests per second and checkout stats at this pool size."""
+    pool = type("BenchmarkPool", (InstrumentedAsyncPool,), {"checkout_stats": CheckoutStats()})
+    async with scratch_schema(poolclass=pool, pool_size=pool_size, max_overflow=0, pool_timeout=30) as engine:
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        slots = asyncio.Semaphore(CONCURRENCY)
+
+        async def request() -> None:
+            async with slots, session_maker() as session:
+                await session.execute(text("SELECT pg_sleep(:seconds)"), {"seconds": QUERY_SECONDS})
+
+        # open the connections first so the run measures steady state
+        await asyncio.gather(*(request() for _ in range(pool_size)))
+        pool.checkout_stats = CheckoutStats()
+        started = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(REQUESTS)))
+        elapsed = time.perf_counter() - started
+        return REQUESTS / elapsed, pool.checkout_stats.snapshot()
+
+
+@requires_database
+@benchmark
+def test_throughput_grows_with_pool_size_until_concurrency():
+    results = {size: asyncio.run(measure(size)) for size in POOL_SIZES}
+    report = {size: (round(rps), stats["avg_wait_ms"]) for size, (rps, stats) in results.items()}
+    throughput = [results[size][0] for size in POOL_SIZES]
+    waits = [results[size][1]["avg_wait_ms"] for size in POOL_SIZES]
+    # each doubling of connections should buy a clear gain while requests queue for them
+    for smaller, larger in zip(throughput, throughput[1:]):
+        assert larger > smaller * 1.3, report
+    assert waits == sorted(waits, reverse=True), report
@@ -0,0 +1,88 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from app.domain.entities.read_watermark import ReadWatermark
+from app.infrastructure.db.read_watermarks import ReadWatermarkBatcher
+from tests.fakes import RecordingSession
+
+
+class SlowSession(RecordingSession):
+    def __init__(self, committed: list, delay: float) -> None:
+        super().__init__()
+        self.committed = committed
+        self.delay = delay
+
+    async def commit(self) -> None:
+        await asyncio.sleep(self.delay)
+        self.committed.append(len(self.statements))
+
+
+def session_maker(committed: list, delay: float = 0):
+    @asynccontextmanager
+    async def maker():
+        yield SlowSession(committed, delay)
+
+    return maker
+
+
+def watermark(user_id: int) -> ReadWatermark:
+    return ReadWatermark(uuid.uuid4(), user_id, datetime(2026, 10, 18))
+
+
+def test_stop_lets_the_flush_in_progress_commit():
+    async def scenario():
+        committed, flushed = [], []
+        batcher = ReadWatermarkBatcher(session_maker(committed, delay=0.05), interval=0.01)
+
+        async def on_flush(batch):
+            flushed.extend(batch)
+
+        await batcher.start(on_flush)
+        batcher.advance(watermark(1))
+        batcher.advance(watermark(2))
+        await asyncio.sleep(0.03)  # the periodic flush is now committing
+        await batcher.stop()
+        return committed, flushed, batcher.stats()
+
+    committed, flushed, stats = asyncio.run(scenario())
+    assert len(committed) == 1
+    assert [w.user_id for w in flushed] == [1, 2]
+    assert stats == {"pending": 0, "reported": 2, "flushed": 2}
+
+
+def test_stop_writes_what_is_still_pending():
+    async def scenario():
+        committed = []
+        batcher = ReadWatermarkBatcher(session_maker(committed), interval=60)
+        await batcher.start()
+        batcher.advance(watermark(1))
+        await batcher.stop()
+        return committed, batcher.stats()
+
+    committed, stats = asyncio.run(scenario())
+    assert len(committed) == 1
+    assert stats["flushed"] == 1
+
+
+def test_cancelled_flush_puts_the_batch_back():
+    async def scenario():
+        batcher = ReadWatermarkBatcher(session_maker([], delay=10))
+        batcher.advance(watermark(1))
+        flush = asyncio.create_task(batcher._flush())
+        await asyncio.sleep(0.01)
+        flush.cancel()
+        await asyncio.gather(flush, return_exceptions=True)
+        return batcher.stats()
+
+    assert asyncio.run(scenario()) == {"pending": 1, "reported": 1, "flushed": 0}
+
+
+def test_only_the_furthest_watermark_is_kept():
+    batcher = ReadWatermarkBatcher(session_maker([]))
+    conversation_id = uuid.uuid4()
+    batcher.advance(ReadWatermark(conversation_id, 1, datetime(2026, 10, 18, 12)))
+    batcher.advance(ReadWatermark(conversation_id, 1, datetime(2026, 10, 18, 11)))
+    assert batcher.stats()["pending"] == 1
+    assert batcher._pending[(conversation_id, 1)].read_at == datetime(2026, 10, 18, 12)
@@ -0,0 +1,47 @@
+import asyncio
+
+from app.infrastructure.db import session as db_session
+from app.infrastructure.db.session import RecentWriters
+
+
+def freeze(monkeypatch, now: float) -> None:
+    monkeypatch.setattr(db_session.time, "monotonic", lambda: now)
+
+
+def test_mark_reaches_the_other_workers(monkeypatch):
+    freeze(monkeypatch, 100.0)
+    here, there = RecentWriters(window=5), RecentWriters(window=5)
+
+    async def publish(message: str) -> None:
+        there.apply(message)
+
+    here.bind(publish)
+    asyncio.run(here.mark(7))
+    assert here.active(7) and there.active(7)
+    freeze(monkeypatch, 105.5)
+    assert not there.active(7)
+
+
+def test_mark_is_republished_only_when_half_spent(monkeypatch):
+    published = []
+
+    async def publish(message: str) -> None:
+        published.append(message)
+
+    writers = RecentWriters(window=10)
+    writers.bind(publish)
+    for now in (0.0, 1.0, 4.0, 6.0):
+        freeze(monkeypatch, now)
+        asyncio.run(writers.mark(7))
+    # 0: new; 1 and 4: over half of the window left; 6: only 4 seconds left
+    assert len(published) == 2
+
+
+def test_remote_mark_does_not_shorten_a_local_one(monkeypatch):
+    writers = RecentWriters(window=5)
+    freeze(monkeypatch, 10.0)
+    asyncio.run(writers.mark(7))
+    freeze(monkeypatch, 0.0)
+    writers.apply('{"user_id": 7}')
+    freeze(monkeypatch, 14.0)
+    assert writers.active(7)
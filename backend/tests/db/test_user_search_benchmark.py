@@ -0,0 +1,57 @@
+"""
+p99 latency of the user autocomplete search on a seeded table.
+
+Needs TEST_DATABASE_URL and RUN_BENCHMARKS=1. Seeds BENCHMARK_USERS users
+(1M by default) and runs the search the way the "add participant" dialog
+does: one query per keystroke, short prefixes included.
+"""
+import asyncio
+import os
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.infrastructure.repositories_impl.user_repository_impl import UserRepositoryImpl
+from tests.database import benchmark, percentile, requires_database, scratch_schema
+
+USERS = int(os.environ.get("BENCHMARK_USERS", 1_000_000))
+P99_BUDGET_MS = 50
+LIMIT = 20
+# prefixes as typed, substrings, an exact email and a term with no match
+TERMS = ["a", "al", "ali", "alic", "alice", "7f", "7f3a", "ce_1", "user12345@example.com", "zzzzzz"]
+ROUNDS = 20
+
+
+@requires_database
+@benchmark
+def test_user_search_p99_stays_under_budget():
+    async def scenario() -> list[float]:
+        async with scratch_schema() as engine:
+            async with engine.begin() as conn:
+                # mixed names: common first names with suffixes and random hex handles
+                await conn.execute(text(
+                    "INSERT INTO users (username, email, password, created_at) "
+                    "SELECT (ARRAY['alice', 'bob', 'carol', 'dave', 'eve'])[1 + i % 5] || '_' || i "
+                    "       || CASE WHEN i % 3 = 0 THEN '_' || substr(md5(i::text), 1, 6) ELSE '' END, "
+                    "       'user' || i || '@example.com', 'x', now() "
+                    "FROM generate_series(1, :count) AS i"
+                ), {"count": USERS})
+                await conn.execute(text("ANALYZE users"))
+            session_maker = async_sessionmaker(engine, expire_on_commit=False)
+            latencies = []
+            async with session_maker() as session:
+                repository = UserRepositoryImpl(session)
+                for term in TERMS:  # warm up the cache and the plans
+                    await repository.search(term, LIMIT)
+                for _ in range(ROUNDS):
+                    for term in TERMS:
+                        started = time.perf_counter()
+                        users = await repository.search(term, LIMIT)
+                        latencies.append((time.perf_counter() - started) * 1000)
+                        assert len(users) <= LIMIT
+            return latencies
+
+    latencies = asyncio.run(scenario())
+    p99 = percentile(latencies, 0.99)
+    assert p99 < P99_BUDGET_MS, f"p99 {p99:.1f} ms over {len(latencies)} searches on {USERS} users"
@@ -0,0 +1,50 @@
+class FakeWebSocket:
+    """Records frames instead of sending them."""
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+        self.close_code: int | None = None
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, frame: str) -> None:
+        self.sent.append(frame)
+
+    async def close(self, code: int | None = None) -> None:
+        self.close_code = code
+
+
+class EmptyResult:
+    """Result of a statement that matched no rows, whichever accessor the caller uses."""
+
+    def scalars(self) -> "EmptyResult":
+        return self
+
+    def all(self) -> list:
+        return []
+
+    def one_or_none(self) -> None:
+        return None
+
+    def scalar_one_or_none(self) -> None:
+        return None
+
+
+class RecordingSession:
+    """Collects the statements a repository emits instead of running them."""
+
+    def __init__(self) -> None:
+        self.statements: list = []
+        self.params: list = []
+
+    async def execute(self, statement, params=None) -> EmptyResult:
+        self.statements.append(statement)
+        self.params.append(params)
+        return EmptyResult()
+
+    async def scalars(self, statement, params=None) -> EmptyResult:
+        return (await self.execute(statement, params)).scalars()
+
+    async def flush(self) -> None:
+        pass
@@ -0,0 +1,77 @@
+"""
+Per-request auth overhead before and after the verified-token cache.
+
+"before" replays the old dependency chain: authx's access_token_required,
+then reading the token again and decoding it a second time with
+python-jose. "after" is get_current_user_id, measured on the first request
+with a token (one verification) and on repeats (a cache hit). The timing
+test needs RUN_BENCHMARKS=1; the verification count is always checked.
+"""
+import asyncio
+import time
+
+from jose import jwt
+from starlette.requests import Request
+
+from app.application.security.token_cache import VerifiedTokenCache
+from app.presentation.dependencies import auth
+from app.presentation.dependencies.auth import get_current_user_id, security
+from tests.database import benchmark
+
+ROUNDS = 2000
+REPEATS = 5
+
+
+def request_with(token: str) -> Request:
+    headers = [(b"authorization", f"Bearer {token}".encode())]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "query_string": b""})
+
+
+async def before(request: Request) -> int:
+    await security.access_token_required(request)
+    token = await security.get_access_token_from_request(request)
+    payload = jwt.decode(token.token, security.config.JWT_SECRET_KEY, algorithms=["HS256"])
+    return int(payload["sub"])
+
+
+def per_request_us(call, requests: list[Request]) -> float:
+    """Best of REPEATS runs, in microseconds per request."""
+
+    async def run() -> float:
+        started = time.perf_counter()
+        for request in requests:
+            await call(request)
+        return time.perf_counter() - started
+
+    return min(asyncio.run(run()) for _ in range(REPEATS)) / len(requests) * 1e6
+
+
+def test_token_is_verified_once_then_served_from_the_cache(monkeypatch):
+    monkeypatch.setattr(auth, "verified_tokens", VerifiedTokenCache())
+    verifications = []
+    verify = security.verify_token
+    monkeypatch.setattr(security, "verify_token", lambda *a, **kw: verifications.append(1) or verify(*a, **kw))
+    request = request_with(security.create_access_token(uid="7"))
+
+    async def scenario() -> list[int]:
+        return [await get_current_user_id(request) for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [7, 7, 7]
+    assert len(verifications) == 1
+
+
+@benchmark
+def test_auth_overhead_before_and_after(monkeypatch):
+    same_token = [request_with(security.create_access_token(uid="7"))] * ROUNDS
+    # distinct tokens keep every request a cache miss
+    fresh_tokens = [request_with(security.create_access_token(uid=str(i))) for i in range(ROUNDS)]
+
+    monkeypatch.setattr(auth, "verified_tokens", VerifiedTokenCache(max_size=0))
+    old = per_request_us(before, same_token)
+    one_verification = per_request_us(get_current_user_id, fresh_tokens)
+    monkeypatch.setattr(auth, "verified_tokens", VerifiedTokenCache())
+    cached = per_request_us(get_current_user_id, same_token)
+
+    report = f"before {old:.1f} us, one verification {one_verification:.1f} us, cache hit {cached:.1f} us"
+    assert one_verification < old * 0.8, report
+    assert cached < old / 5, report
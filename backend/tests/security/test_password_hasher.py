@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+from passlib.context import CryptContext
+
+from app.application.security.password_hasher import BcryptPasswordHasher, PasswordHashingPool
+from app.application.settings import settings
+
+# lowest bcrypt cost, for hashes that only need to be verifiable
+cheap = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+
+
+async def probe_lag(done: asyncio.Event, interval: float = 0.005) -> float:
+    """Largest delay past ``interval`` observed between event loop wakeups."""
+    worst = 0.0
+    while not done.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+def test_verifications_do_not_block_the_event_loop():
+    hashed = CryptContext(schemes=["bcrypt"], bcrypt__rounds=10).hash("secret")
+
+    async def scenario() -> tuple[list[bool], float]:
+        hasher = BcryptPasswordHasher(PasswordHashingPool(workers=2))
+        done = asyncio.Event()
+        probe = asyncio.create_task(probe_lag(done))
+        results = await asyncio.gather(*(hasher.verify("secret", hashed) for _ in range(8)))
+        done.set()
+        return results, await probe
+
+    results, lag = asyncio.run(scenario())
+    assert all(results)
+    assert lag < 0.05
+
+
+def test_pool_bounds_concurrency_and_reports_the_queue():
+    async def scenario() -> dict:
+        pool = PasswordHashingPool(workers=2)
+        await asyncio.gather(*(pool.run(time.sleep, 0.02) for _ in range(6)))
+        return pool.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["completed"] == 6
+    assert stats["max_waiting"] == 4  # two ran at once, the rest queued
+    assert stats["running"] == stats["waiting"] == 0
+
+
+def test_hash_with_another_cost_is_rehashed_on_login():
+    hashed = cheap.hash("secret")
+
+    async def scenario():
+        hasher = BcryptPasswordHasher(PasswordHashingPool(workers=1))
+        return await hasher.verify_and_update("secret", hashed), await hasher.verify_and_update("wrong", hashed)
+
+    (verified, new_hash), (rejected, no_hash) = asyncio.run(scenario())
+    assert verified and new_hash.startswith(f"$2b${settings.bcrypt_rounds:02d}$")
+    assert not rejected and no_hash is None
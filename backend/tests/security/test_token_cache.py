@@ -0,0 +1,53 @@
+from app.application.security import token_cache
+from app.application.security.token_cache import VerifiedTokenCache
+
+
+def freeze(monkeypatch, now: float) -> None:
+    monkeypatch.setattr(token_cache.time, "time", lambda: now)
+
+
+def test_put_then_get_returns_the_user(monkeypatch):
+    freeze(monkeypatch, 1000.0)
+    cache = VerifiedTokenCache()
+    assert cache.get("token") is None
+    cache.put("token", 7, expires_at=2000.0)
+    assert cache.get("token") == 7
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+def test_entry_expires_with_the_token(monkeypatch):
+    freeze(monkeypatch, 1000.0)
+    cache = VerifiedTokenCache(max_age=300)
+    cache.put("token", 7, expires_at=1010.0)
+    freeze(monkeypatch, 1010.0)
+    assert cache.get("token") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_entry_is_trusted_at_most_max_age(monkeypatch):
+    freeze(monkeypatch, 1000.0)
+    cache = VerifiedTokenCache(max_age=300)
+    cache.put("token", 7, expires_at=None)
+    freeze(monkeypatch, 1299.0)
+    assert cache.get("token") == 7
+    freeze(monkeypatch, 1300.0)
+    assert cache.get("token") is None
+
+
+def test_least_recently_used_entry_is_evicted(monkeypatch):
+    freeze(monkeypatch, 1000.0)
+    cache = VerifiedTokenCache(max_size=2)
+    cache.put("a", 1, None)
+    cache.put("b", 2, None)
+    cache.get("a")
+    cache.put("c", 3, None)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_zero_size_disables_the_cache():
+    cache = VerifiedTokenCache(max_size=0)
+    cache.put("token", 7, None)
+    assert cache.get("token") is None
+    assert cache.stats()["size"] == 0
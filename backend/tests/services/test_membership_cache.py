@@ -0,0 +1,70 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+from app.application.membership_cache import MembershipCache
+from app.application.services.chat_service import ChatService
+from app.domain.enums.participant_type import ParticipantRole
+
+CONVERSATION_ID = uuid.uuid4()
+
+
+def test_put_after_an_invalidation_of_the_membership_is_dropped():
+    cache = MembershipCache()
+    since = cache.generation
+    cache.discard(CONVERSATION_ID, 1)
+    cache.put(CONVERSATION_ID, 1, ParticipantRole.admin, since)
+    assert cache.get(CONVERSATION_ID, 1) is None
+
+
+def test_put_after_an_invalidation_of_the_conversation_is_dropped():
+    cache = MembershipCache()
+    since = cache.generation
+    cache.discard(CONVERSATION_ID)
+    cache.put(CONVERSATION_ID, 1, ParticipantRole.admin, since)
+    assert cache.get(CONVERSATION_ID, 1) is None
+
+
+def test_invalidation_of_another_membership_does_not_block_put():
+    cache = MembershipCache()
+    since = cache.generation
+    cache.discard(CONVERSATION_ID, 2)
+    cache.discard(uuid.uuid4())
+    cache.put(CONVERSATION_ID, 1, ParticipantRole.member, since)
+    assert cache.get(CONVERSATION_ID, 1) == ParticipantRole.member
+
+
+def test_trimmed_invalidations_still_block_older_lookups():
+    cache = MembershipCache(max_size=2)
+    since = cache.generation
+    cache.discard(CONVERSATION_ID, 1)
+    for user_id in range(2, 5):
+        cache.discard(CONVERSATION_ID, user_id)
+    cache.put(CONVERSATION_ID, 1, ParticipantRole.admin, since)
+    assert cache.get(CONVERSATION_ID, 1) is None
+
+
+class RacingParticipants:
+    """Returns the old row while a demotion is committed and invalidated meanwhile."""
+
+    def __init__(self, cache: MembershipCache) -> None:
+        self.cache = cache
+
+    async def get(self, conversation_id, user_id):
+        await self.cache.invalidate(conversation_id, user_id)
+        return SimpleNamespace(role=ParticipantRole.admin)
+
+
+def test_role_lookup_that_raced_an_invalidation_is_not_cached():
+    cache = MembershipCache()
+    service = ChatService(
+        session=None,
+        conversation_repo=None,
+        participant_repo=RacingParticipants(cache),
+        message_repo=None,
+        attachment_repo=None,
+        inbox_repo=None,
+        membership_cache=cache,
+    )
+    assert asyncio.run(service._role(1, CONVERSATION_ID)) == ParticipantRole.admin
+    assert cache.get(CONVERSATION_ID, 1) is None
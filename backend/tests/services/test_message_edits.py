@@ -0,0 +1,146 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import app.main  # noqa: F401  registers every model
+from app.application.dto.message_dto import MessageUpdateDTO
+from app.application.services.chat_service import ChatService
+from app.domain.entities.message import Message, new_message_id
+from app.infrastructure.repositories_impl.message_repository_impl import MessageRepositoryImpl
+from app.presentation.websocket import handlers
+from app.presentation.websocket.handlers import broadcast_message_deleted, broadcast_message_edited
+from tests.fakes import RecordingSession
+
+CONVERSATION_ID = uuid.uuid4()
+CREATED_AT = datetime(2026, 10, 18, 12, 0)
+MESSAGE = Message(new_message_id(CREATED_AT), CONVERSATION_ID, 1, "edited", None, True, CREATED_AT)
+
+
+class Messages:
+    """The row belongs to user 1; every call is recorded."""
+
+    def __init__(self, exists: bool = True) -> None:
+        self.exists = exists
+        self.calls: list[str] = []
+
+    async def update_text(self, message_id, sender_id, text):
+        self.calls.append("update_text")
+        return MESSAGE if self.exists and sender_id == MESSAGE.sender_id else None
+
+    async def delete(self, message_id, sender_id):
+        self.calls.append("delete")
+        return MESSAGE if self.exists and sender_id == MESSAGE.sender_id else None
+
+    async def get(self, message_id):
+        self.calls.append("get")
+        return MESSAGE if self.exists else None
+
+
+@pytest.mark.parametrize("call, verb", [
+    (lambda repo: repo.update_text(MESSAGE.id, 1, "edited"), "UPDATE messages"),
+    (lambda repo: repo.delete(MESSAGE.id, 1), "DELETE FROM messages"),
+])
+def test_repository_writes_and_returns_the_row_in_one_statement(call, verb):
+    session = RecordingSession()
+    asyncio.run(call(MessageRepositoryImpl(session)))
+    [statement] = session.statements
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert sql.startswith(verb)
+    assert "messages.sender_id = " in sql and "RETURNING messages.id" in sql
+
+
+class Inbox:
+    def __init__(self) -> None:
+        self.calls: list[tuple] = []
+
+    async def update_preview(self, message):
+        self.calls.append(("update_preview", message.id))
+
+    async def refresh(self, conversation_id):
+        self.calls.append(("refresh", conversation_id))
+
+    async def recount_removed(self, conversation_id, created_at):
+        self.calls.append(("recount_removed", conversation_id, created_at))
+
+
+class Session:
+    def __init__(self) -> None:
+        self.commits = 0
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+
+def service(messages: Messages) -> ChatService:
+    return ChatService(
+        session=Session(),
+        conversation_repo=None,
+        participant_repo=None,
+        message_repo=messages,
+        attachment_repo=None,
+        inbox_repo=Inbox(),
+    )
+
+
+def test_edit_is_one_statement_on_success():
+    messages = Messages()
+    chat = service(messages)
+    updated = asyncio.run(chat.update_message(1, MESSAGE.id, MessageUpdateDTO(text="edited")))
+    assert updated is MESSAGE
+    # the row comes back from UPDATE ... RETURNING: no read before or after
+    assert messages.calls == ["update_text"]
+    assert chat.inbox_repo.calls == [("update_preview", MESSAGE.id)]
+    assert chat.session.commits == 1
+
+
+def test_delete_is_one_statement_on_success():
+    messages = Messages()
+    chat = service(messages)
+    assert asyncio.run(chat.delete_message(1, MESSAGE.id)) is MESSAGE
+    assert messages.calls == ["delete"]
+    assert chat.inbox_repo.calls == [
+        ("refresh", CONVERSATION_ID),
+        ("recount_removed", CONVERSATION_ID, CREATED_AT),
+    ]
+
+
+def test_failures_are_told_apart_with_one_extra_read():
+    messages = Messages()
+    with pytest.raises(PermissionError, match="edit another user's"):
+        asyncio.run(service(messages).update_message(2, MESSAGE.id, MessageUpdateDTO(text="x")))
+    with pytest.raises(PermissionError, match="delete another user's"):
+        asyncio.run(service(messages).delete_message(2, MESSAGE.id))
+    assert messages.calls == ["update_text", "get", "delete", "get"]
+    missing = Messages(exists=False)
+    with pytest.raises(ValueError, match="Message not found"):
+        asyncio.run(service(missing).update_message(1, MESSAGE.id, MessageUpdateDTO(text="x")))
+    # deleting twice is not an error
+    assert asyncio.run(service(missing).delete_message(1, MESSAGE.id)) is None
+
+
+class Broadcasts:
+    def __init__(self) -> None:
+        self.sent: list[tuple[str, dict]] = []
+
+    async def broadcast(self, channel, message, exclude_user_id=None, transient=False):
+        self.sent.append((channel, json.loads(message)))
+
+
+def test_edit_and_delete_are_broadcast_to_the_conversation(monkeypatch):
+    broadcasts = Broadcasts()
+    monkeypatch.setattr(handlers, "connection_manager", broadcasts)
+    asyncio.run(broadcast_message_edited(MESSAGE))
+    asyncio.run(broadcast_message_deleted(MESSAGE))
+    channel = f"conversation:{CONVERSATION_ID}"
+    [(edited_channel, edited), (deleted_channel, deleted)] = broadcasts.sent
+    assert (edited_channel, deleted_channel) == (channel, channel)
+    assert edited["type"] == "message:edited"
+    assert edited["payload"]["text"] == "edited" and edited["payload"]["is_edited"] is True
+    assert deleted == {
+        "type": "message:deleted",
+        "payload": {"id": str(MESSAGE.id), "conversation_id": str(CONVERSATION_ID)},
+    }
@@ -0,0 +1,110 @@
+import asyncio
+import base64
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.application.membership_cache import MembershipCache
+from app.application.pagination import decode_cursor, encode_cursor
+from app.application.services.chat_service import ChatService
+from app.domain.entities.message import Message
+from app.domain.enums.participant_type import ParticipantRole
+
+CONVERSATION_ID = uuid.uuid4()
+START = datetime(2026, 10, 18, 12, 0)
+
+
+def test_cursor_round_trip():
+    created_at, item_id = datetime(2026, 10, 18, 12, 30, 15, 123456), uuid.uuid4()
+    cursor = encode_cursor(created_at, item_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, item_id)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b"2026-10-18T12:00:00").decode(),
+    base64.urlsafe_b64encode(b"yesterday|" + str(uuid.uuid4()).encode()).decode(),
+    base64.urlsafe_b64encode(b"2026-10-18T12:00:00|42").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+])
+def test_malformed_cursor_is_a_value_error(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+class Messages:
+    """Keyset paging over an in-memory history, as MessageRepositoryImpl.list_page does it."""
+
+    def __init__(self, count: int) -> None:
+        self.rows = [
+            Message(uuid.uuid4(), CONVERSATION_ID, 2, str(i), None, False, START + timedelta(seconds=i))
+            for i in range(count)
+        ]
+
+    async def list_page(self, conversation_id, limit, before=None, after=None):
+        def key(message):
+            return message.created_at, message.id
+
+        if before is not None:
+            older = [message for message in self.rows if key(message) < before]
+            return older[-limit:]
+        return [message for message in self.rows if after is None or key(message) > after][:limit]
+
+    async def list_for_conversation(self, conversation_id, limit, offset):
+        return self.rows[offset:offset + limit]
+
+
+def service(messages: Messages) -> ChatService:
+    membership = MembershipCache()
+    membership.put(CONVERSATION_ID, 1, ParticipantRole.member, since=membership.generation)
+    return ChatService(
+        session=None,
+        conversation_repo=None,
+        participant_repo=None,
+        message_repo=messages,
+        attachment_repo=None,
+        inbox_repo=None,
+        membership_cache=membership,
+    )
+
+
+def texts(page) -> list[str]:
+    return [message.text for message in page.items]
+
+
+def test_paging_forward_visits_every_message_once():
+    chat = service(Messages(7))
+    page = asyncio.run(chat.list_messages(1, CONVERSATION_ID, limit=3))
+    seen = texts(page)
+    while page.next_cursor:
+        page = asyncio.run(chat.list_messages(1, CONVERSATION_ID, limit=3, after=page.next_cursor))
+        seen += texts(page)
+    assert seen == [str(i) for i in range(7)]
+
+
+def test_paging_backward_from_a_cursor():
+    messages = Messages(7)
+    chat = service(messages)
+    newest = messages.rows[-1]
+    page = asyncio.run(chat.list_messages(
+        1, CONVERSATION_ID, limit=3, before=encode_cursor(newest.created_at, newest.id)))
+    assert texts(page) == ["3", "4", "5"]
+    assert page.prev_cursor is not None
+    page = asyncio.run(chat.list_messages(1, CONVERSATION_ID, limit=3, before=page.prev_cursor))
+    assert texts(page) == ["0", "1", "2"]
+    # nothing older than the first message
+    assert page.prev_cursor is None
+
+
+def test_last_page_has_no_next_cursor():
+    page = asyncio.run(service(Messages(3)).list_messages(1, CONVERSATION_ID, limit=3))
+    assert texts(page) == ["0", "1", "2"]
+    assert (page.next_cursor, page.prev_cursor) == (None, None)
+
+
+def test_before_and_after_together_are_rejected():
+    cursor = encode_cursor(START, uuid.uuid4())
+    with pytest.raises(ValueError, match="either before or after"):
+        asyncio.run(service(Messages(1)).list_messages(1, CONVERSATION_ID, before=cursor, after=cursor))
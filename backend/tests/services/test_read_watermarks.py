@@ -0,0 +1,72 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.application.membership_cache import MembershipCache
+from app.application.services.chat_service import ChatService
+from app.domain.enums.participant_type import ParticipantRole
+from app.presentation.websocket.handlers import handle_read
+
+CONVERSATION_ID = uuid.uuid4()
+MESSAGE_ID = uuid.uuid4()
+CREATED_AT = datetime(2026, 10, 18, 12, 0)
+
+
+class Messages:
+    async def get_created_at(self, conversation_id, message_id):
+        if (conversation_id, message_id) == (CONVERSATION_ID, MESSAGE_ID):
+            return CREATED_AT
+        return None
+
+
+class Watermarks:
+    def __init__(self):
+        self.advanced = []
+
+    def advance(self, watermark):
+        self.advanced.append(watermark)
+
+
+def service() -> ChatService:
+    membership = MembershipCache()
+    membership.put(CONVERSATION_ID, 1, ParticipantRole.member, since=membership.generation)
+    return ChatService(
+        session=None,
+        conversation_repo=None,
+        participant_repo=None,
+        message_repo=Messages(),
+        attachment_repo=None,
+        inbox_repo=None,
+        membership_cache=membership,
+        read_watermarks=Watermarks(),
+    )
+
+
+def test_read_position_comes_from_the_message_row():
+    chat = service()
+    # a created_at sent by the client is ignored
+    payload = {"message_id": str(MESSAGE_ID), "created_at": "2999-01-01T00:00:00"}
+    asyncio.run(handle_read(chat, 1, CONVERSATION_ID, payload))
+    [watermark] = chat.read_watermarks.advanced
+    assert (watermark.read_at, watermark.message_id) == (CREATED_AT, MESSAGE_ID)
+
+
+def test_unknown_message_is_rejected():
+    with pytest.raises(ValueError, match="Message not found"):
+        asyncio.run(handle_read(service(), 1, CONVERSATION_ID, {"message_id": str(uuid.uuid4())}))
+
+
+@pytest.mark.parametrize("payload", [{"message_id": 42}, {"message_id": ["x"]}, {"message_id": "nope"}, ["x"]])
+def test_malformed_payload_is_a_value_error(payload):
+    with pytest.raises(ValueError, match="Invalid read position"):
+        asyncio.run(handle_read(service(), 1, CONVERSATION_ID, payload))
+
+
+def test_empty_position_reads_everything():
+    chat = service()
+    asyncio.run(handle_read(chat, 1, CONVERSATION_ID, {}))
+    [watermark] = chat.read_watermarks.advanced
+    assert watermark.message_id is None
+    assert watermark.read_at <= datetime.utcnow()
@@ -0,0 +1,107 @@
+import asyncio
+
+from app.application import response_cache as response_cache_module
+from app.application.response_cache import ResponseCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def frozen(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(response_cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_hit_after_put(monkeypatch):
+    frozen(monkeypatch)
+    cache = ResponseCache()
+    stored = cache.put("key", b"body", ["user:1"], since=cache.generation)
+    assert cache.get("key") is stored
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_miss_for_unknown_key(monkeypatch):
+    frozen(monkeypatch)
+    cache = ResponseCache()
+    assert cache.get("key") is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_invalidate_drops_tagged_entries_only(monkeypatch):
+    frozen(monkeypatch)
+    cache = ResponseCache()
+    cache.put("a", b"a", ["user:1"], since=cache.generation)
+    cache.put("b", b"b", ["user:2"], since=cache.generation)
+    asyncio.run(cache.invalidate("user:1"))
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+
+def test_fill_that_raced_an_invalidation_is_not_stored(monkeypatch):
+    frozen(monkeypatch)
+    cache = ResponseCache()
+    since = cache.generation
+    # the rows were read, then a writer invalidated the tag before the response was stored
+    cache.discard(["user:1"])
+    entry = cache.put("key", b"old rows", ["user:1"], since=since)
+    assert entry.body == b"old rows"
+    assert cache.get("key") is None
+    # a fill that starts after the invalidation is stored
+    cache.put("key", b"new rows", ["user:1"], since=cache.generation)
+    assert cache.get("key").body == b"new rows"
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = frozen(monkeypatch)
+    cache = ResponseCache(ttl=60)
+    cache.put("key", b"body", ["user:1"], since=cache.generation)
+    clock.now += 59
+    assert cache.get("key") is not None
+    clock.now += 2
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_fills_within_settle_of_an_invalidation_are_not_stored(monkeypatch):
+    clock = frozen(monkeypatch)
+    cache = ResponseCache(settle=2)
+    cache.discard(["user:1"])
+    # a lagging replica may still return the old rows
+    cache.put("key", b"body", ["user:1"], since=cache.generation)
+    assert cache.get("key") is None
+    clock.now += 3
+    cache.put("key", b"body", ["user:1"], since=cache.generation)
+    assert cache.get("key") is not None
+
+
+def test_least_recently_used_entries_are_evicted_by_size(monkeypatch):
+    frozen(monkeypatch)
+    cache = ResponseCache(max_bytes=10)
+    cache.put("a", b"aaaa", ["t"], since=cache.generation)
+    cache.put("b", b"bbbb", ["t"], since=cache.generation)
+    cache.get("a")
+    cache.put("c", b"cccc", ["t"], since=cache.generation)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["bytes"] == 8
+
+
+def test_invalidations_from_other_workers_are_applied(monkeypatch):
+    frozen(monkeypatch)
+    published = []
+
+    async def publish(message: str) -> None:
+        published.append(message)
+
+    sender, receiver = ResponseCache(), ResponseCache()
+    sender.bind(publish)
+    receiver.put("key", b"body", ["user:1"], since=receiver.generation)
+    asyncio.run(sender.invalidate("user:1"))
+    receiver.apply(published[0])
+    assert receiver.get("key") is None
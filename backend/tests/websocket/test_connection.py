@@ -0,0 +1,49 @@
+import asyncio
+
+from app.infrastructure.websocket.connection import Connection, OverflowPolicy
+from tests.fakes import FakeWebSocket
+
+
+async def _noop(connection: Connection) -> None:
+    pass
+
+
+def test_writer_sends_frames_in_order():
+    async def scenario():
+        websocket = FakeWebSocket()
+        connection = Connection(websocket, 1, 8, OverflowPolicy.drop_oldest, _noop)
+        connection.start()
+        for i in range(5):
+            assert connection.enqueue(str(i))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        await connection.close()
+        return websocket.sent, connection.messages_sent
+
+    sent, count = asyncio.run(scenario())
+    assert sent == ["0", "1", "2", "3", "4"]
+    assert count == 5
+
+
+def test_drop_oldest_keeps_the_newest_frames():
+    async def scenario():
+        websocket = FakeWebSocket()
+        connection = Connection(websocket, 1, 3, OverflowPolicy.drop_oldest, _noop)
+        # the writer is not started, so the queue fills up
+        for i in range(5):
+            assert connection.enqueue(str(i))
+        connection.start()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        await connection.close()
+        return websocket.sent
+
+    assert asyncio.run(scenario()) == ["2", "3", "4"]
+
+
+def test_disconnect_policy_reports_a_slow_consumer():
+    async def scenario():
+        connection = Connection(FakeWebSocket(), 1, 2, OverflowPolicy.disconnect, _noop)
+        return [connection.enqueue(str(i)) for i in range(3)]
+
+    assert asyncio.run(scenario()) == [True, True, False]
@@ -0,0 +1,96 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+from app.infrastructure.websocket import connection_manager as manager_module
+from app.infrastructure.websocket.connection_manager import ConnectionManager
+from tests.database import benchmark
+from tests.fakes import FakeWebSocket
+
+CHANNEL = "conversation:bench"
+
+
+async def _connect_all(manager: ConnectionManager, count: int) -> list[FakeWebSocket]:
+    websockets = [FakeWebSocket() for _ in range(count)]
+    for user_id, websocket in enumerate(websockets, start=1):
+        await manager.connect(websocket, user_id, [CHANNEL])
+    return websockets
+
+
+def _event_frames(websocket: FakeWebSocket) -> list[str]:
+    return [frame for frame in websocket.sent if '"type":"message:new"' in frame]
+
+
+def test_broadcast_encodes_once_and_shares_the_frame(monkeypatch):
+    calls = []
+    encode = manager_module.encode_frame
+    monkeypatch.setattr(manager_module, "encode_frame", lambda message: calls.append(message) or encode(message))
+
+    async def scenario():
+        manager = ConnectionManager(max_queue=16)
+        await manager.start()
+        websockets = await _connect_all(manager, 50)
+        calls.clear()
+        await manager.broadcast(CHANNEL, {"type": "message:new", "payload": {"text": "привет"}})
+        await asyncio.sleep(0)
+        await manager.stop()
+        return websockets
+
+    websockets = asyncio.run(scenario())
+    assert len(calls) == 1
+    frames = [_event_frames(websocket) for websocket in websockets]
+    assert all(len(received) == 1 for received in frames)
+    # the very same string object went to every socket
+    assert len({id(received[0]) for received in frames}) == 1
+
+
+@benchmark
+def test_fanout_beats_per_recipient_encoding(monkeypatch):
+    """
+    Broadcasting 20 events of 1 KB to 500 sockets encodes each event once and
+    enqueues it faster than encoding it once per recipient would take alone.
+    """
+    recipients, events = 500, 20
+    message = {
+        "type": "message:new",
+        "payload": {
+            "id": uuid.uuid4(),
+            "conversation_id": uuid.uuid4(),
+            "sender_id": 1,
+            "text": "x" * 1000,
+            "created_at": datetime(2026, 10, 18, 12, 0),
+            "username": "user",
+            "avatar": None,
+        },
+    }
+    calls = []
+    encode = manager_module.encode_frame
+    monkeypatch.setattr(manager_module, "encode_frame", lambda value: calls.append(value) or encode(value))
+
+    async def scenario():
+        manager = ConnectionManager(max_queue=events + 8)
+        await manager.start()
+        websockets = await _connect_all(manager, recipients)
+        calls.clear()
+        started = time.perf_counter()
+        for _ in range(events):
+            await manager.broadcast(CHANNEL, message)
+        enqueued = time.perf_counter() - started
+        while not all(len(_event_frames(websocket)) == events for websocket in websockets):
+            await asyncio.sleep(0)
+        await manager.stop()
+        return enqueued
+
+    enqueued = min(asyncio.run(scenario()) for _ in range(3))
+    assert len(calls) == events
+
+    def per_recipient() -> float:
+        started = time.perf_counter()
+        for _ in range(events):
+            for _ in range(recipients):
+                encode(message)
+        return time.perf_counter() - started
+
+    baseline = min(per_recipient() for _ in range(3))
+    assert enqueued < baseline, f"broadcast {enqueued * 1e3:.1f}ms, per-recipient encoding {baseline * 1e3:.1f}ms"
@@ -0,0 +1,87 @@
+import asyncio
+
+from app.infrastructure.websocket import connection as connection_module
+from app.infrastructure.websocket import connection_manager as manager_module
+from app.infrastructure.websocket.connection import IDLE_CLOSE_CODE
+from app.infrastructure.websocket.connection_manager import PING_FRAME, ConnectionManager
+from tests.fakes import FakeWebSocket
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def frozen(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(connection_module.time, "monotonic", clock)
+    monkeypatch.setattr(manager_module.time, "monotonic", clock)
+    return clock
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_quiet_socket_is_pinged_once_per_interval(monkeypatch):
+    clock = frozen(monkeypatch)
+
+    async def scenario():
+        manager = ConnectionManager(ping_interval=25, ping_timeout=60)
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, 1)
+        pings = []
+        for step in (10, 15, 5, 25):
+            clock.now += step
+            await manager._heartbeat()
+            await _settle()
+            pings.append(websocket.sent.count(PING_FRAME))
+        await manager.stop()
+        return pings
+
+    # at 10s nothing, at 25s the first ping, at 30s not again, at 55s the second
+    assert asyncio.run(scenario()) == [0, 1, 1, 2]
+
+
+def test_active_socket_is_not_pinged(monkeypatch):
+    clock = frozen(monkeypatch)
+
+    async def scenario():
+        manager = ConnectionManager(ping_interval=25, ping_timeout=60)
+        websocket = FakeWebSocket()
+        connection = await manager.connect(websocket, 1)
+        for _ in range(4):
+            clock.now += 20
+            connection.touch()
+            await manager._heartbeat()
+        await _settle()
+        await manager.stop()
+        return websocket.sent
+
+    assert PING_FRAME not in asyncio.run(scenario())
+
+
+def test_socket_silent_past_the_timeout_is_closed(monkeypatch):
+    clock = frozen(monkeypatch)
+
+    async def scenario():
+        manager = ConnectionManager(ping_interval=25, ping_timeout=60)
+        silent, answering = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(silent, 1, ["conversation:a"])
+        answering_connection = await manager.connect(answering, 2, ["conversation:a"])
+        clock.now += 59
+        answering_connection.touch()
+        clock.now += 1
+        await manager._heartbeat()
+        stats = manager.stats()
+        await manager.stop()
+        return silent.close_code, answering.close_code, stats
+
+    silent_code, answering_code, stats = asyncio.run(scenario())
+    assert silent_code == IDLE_CLOSE_CODE
+    assert answering_code is None
+    assert (stats["connections"], stats["users"]) == (1, 1)
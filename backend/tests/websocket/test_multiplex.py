@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+from app.infrastructure.websocket.connection_manager import ConnectionManager
+from app.presentation.websocket.handlers import resume_position
+from tests.fakes import FakeWebSocket
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def _events(websocket: FakeWebSocket) -> list[dict]:
+    return [json.loads(frame) for frame in websocket.sent]
+
+
+def test_initial_subscription_sends_one_sync_batch():
+    channels = [f"conversation:{i}" for i in range(300)]
+
+    async def scenario():
+        manager = ConnectionManager(max_queue=8)
+        await manager.start()
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, 1, channels)
+        await _settle()
+        await manager.stop()
+        return websocket
+
+    websocket = asyncio.run(scenario())
+    # hundreds of chats fit a small send queue: one frame, not one per chat
+    [event] = _events(websocket)
+    assert event["type"] == "sync:batch"
+    states = event["payload"]["channels"]
+    assert [state["channel"] for state in states] == channels
+    assert all(state["seq"] == 0 and state["online"] == [1] for state in states)
+
+
+def test_one_socket_receives_every_conversation():
+    async def scenario():
+        manager = ConnectionManager()
+        await manager.start()
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, 1, ["conversation:a", "conversation:b"])
+        await manager.broadcast("conversation:a", {"type": "message:new", "payload": {"text": "a"}})
+        await manager.broadcast("conversation:b", {"type": "message:new", "payload": {"text": "b"}})
+        await manager.broadcast("conversation:c", {"type": "message:new", "payload": {"text": "c"}})
+        await _settle()
+        await manager.stop()
+        return websocket
+
+    events = _events(asyncio.run(scenario()))[1:]
+    assert [(event["payload"]["text"], event["seq"]) for event in events] == [("a", 1), ("b", 1)]
+
+
+def test_other_members_see_the_user_come_online_in_each_chat():
+    channels = [f"conversation:{i}" for i in range(40)]
+
+    async def scenario():
+        manager = ConnectionManager()
+        await manager.start()
+        other = FakeWebSocket()
+        await manager.connect(other, 2, channels)
+        await manager.connect(FakeWebSocket(), 1, channels)
+        await _settle()
+        await manager.stop()
+        return other
+
+    events = _events(asyncio.run(scenario()))
+    online = [event["payload"]["channel"] for event in events if event["type"] == "presence:online"]
+    assert sorted(online) == sorted(channels)
+
+
+def test_subscribe_replays_what_the_socket_missed():
+    async def scenario():
+        manager = ConnectionManager()
+        await manager.start()
+        first = FakeWebSocket()
+        first_connection = await manager.connect(first, 1, ["conversation:a"])
+        await _settle()
+        epoch = _events(first)[0]["payload"]["channels"][0]["epoch"]
+        await manager.disconnect(first_connection)
+        # another member keeps the channel and its buffer alive
+        await manager.connect(FakeWebSocket(), 2, ["conversation:a"])
+        for text in ("x", "y"):
+            await manager.broadcast("conversation:a", {"type": "message:new", "payload": {"text": text}})
+        second = FakeWebSocket()
+        connection = await manager.connect(second, 1)
+        await manager.subscribe(connection, "conversation:a", *resume_position({"epoch": epoch, "last_seq": 0}))
+        await _settle()
+        await manager.stop()
+        return second
+
+    events = _events(asyncio.run(scenario()))
+    assert [event.get("payload", {}).get("text") for event in events[:2]] == ["x", "y"]
+    assert events[2]["type"] == "sync" and events[2]["payload"]["seq"] == 2
+
+
+def test_resume_position_ignores_garbage():
+    assert resume_position({"epoch": "e", "last_seq": "7"}) == ("e", 7)
+    assert resume_position({"epoch": "", "last_seq": "seven"}) == (None, None)
+    assert resume_position({}) == (None, None)
@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+from app.infrastructure.websocket import presence as presence_module
+from app.infrastructure.websocket.connection_manager import ConnectionManager
+from app.infrastructure.websocket.presence import TypingTracker
+from tests.fakes import FakeWebSocket
+
+CHANNEL = "conversation:a"
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def _types(websocket: FakeWebSocket) -> list[str]:
+    return [json.loads(frame)["type"] for frame in websocket.sent]
+
+
+def test_typing_is_announced_once_per_throttle(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(presence_module.time, "monotonic", clock)
+    tracker = TypingTracker(ttl=6, throttle=3)
+    assert tracker.start(CHANNEL, 1)
+    clock.now += 1
+    assert not tracker.start(CHANNEL, 1)
+    clock.now += 2
+    assert tracker.start(CHANNEL, 1)
+    assert tracker.stop(CHANNEL, 1)
+    assert not tracker.stop(CHANNEL, 1)
+
+
+def test_typing_expires_without_keystrokes(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(presence_module.time, "monotonic", clock)
+    tracker = TypingTracker(ttl=6, throttle=3)
+    tracker.start(CHANNEL, 1)
+    tracker.start("conversation:b", 2)
+    clock.now += 4
+    tracker.start(CHANNEL, 1)
+    clock.now += 3
+    assert tracker.expired() == [("conversation:b", 2)]
+    clock.now += 3
+    assert tracker.expired() == [(CHANNEL, 1)]
+
+
+def test_typing_and_presence_skip_the_replay_buffer():
+    async def scenario():
+        manager = ConnectionManager()
+        await manager.start()
+        watcher = FakeWebSocket()
+        await manager.connect(watcher, 2, [CHANNEL])
+        typist = await manager.connect(FakeWebSocket(), 1, [CHANNEL])
+        await manager.typing(typist, CHANNEL, True)
+        await manager.typing(typist, CHANNEL, True)
+        await manager.typing(typist, CHANNEL, False)
+        await _settle()
+        seq = manager._buffers[CHANNEL].seq
+        await manager.stop()
+        return watcher, seq
+
+    watcher, seq = asyncio.run(scenario())
+    assert _types(watcher)[1:] == ["presence:online", "typing:start", "typing:stop"]
+    assert all("seq" not in json.loads(frame) for frame in watcher.sent)
+    assert seq == 0
+
+
+def test_offline_only_after_the_last_socket_of_the_user_leaves():
+    async def scenario():
+        manager = ConnectionManager()
+        await manager.start()
+        watcher = FakeWebSocket()
+        await manager.connect(watcher, 2, [CHANNEL])
+        phone = await manager.connect(FakeWebSocket(), 1, [CHANNEL])
+        laptop = await manager.connect(FakeWebSocket(), 1, [CHANNEL])
+        await manager.typing(laptop, CHANNEL, True)
+        await manager.disconnect(phone)
+        await _settle()
+        before = list(_types(watcher))
+        await manager.disconnect(laptop)
+        await _settle()
+        await manager.stop()
+        return before, _types(watcher)
+
+    before, after = asyncio.run(scenario())
+    assert before[1:] == ["presence:online", "typing:start"]
+    # the user was still typing: the others are told it stopped
+    assert after[len(before):] == ["typing:stop", "presence:offline"]
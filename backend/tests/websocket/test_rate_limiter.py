@@ -0,0 +1,43 @@
+from app.infrastructure.websocket import rate_limiter
+from app.infrastructure.websocket.rate_limiter import Budget, RateLimiter, TokenBucket
+
+
+def test_bucket_allows_a_burst_then_reports_the_wait():
+    budget = Budget(rate=2, burst=3)
+    bucket = TokenBucket(budget.burst, 0.0)
+    assert [bucket.take(budget, 0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(budget, 0.0) == 0.5
+
+
+def test_bucket_refills_at_the_rate_up_to_the_burst():
+    budget = Budget(rate=2, burst=3)
+    bucket = TokenBucket(0.0, 0.0)
+    assert bucket.take(budget, 0.5) == 0.0
+    bucket.take(budget, 100.0)
+    assert bucket.tokens == budget.burst - 1
+
+
+def test_user_budget_is_shared_between_connections(monkeypatch):
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: 0.0)
+    limiter = RateLimiter(
+        user_budgets={"*": Budget(rate=1, burst=2)},
+        connection_budgets={"*": Budget(rate=1, burst=10)},
+    )
+    first, second = {}, {}
+    assert limiter.check(1, first, "message:new") == 0
+    assert limiter.check(1, second, "message:new") == 0
+    assert limiter.check(1, first, "message:new") > 0
+    # another user has its own budget
+    assert limiter.check(2, {}, "message:new") == 0
+
+
+def test_unknown_event_types_use_the_wildcard_budget(monkeypatch):
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: 0.0)
+    limiter = RateLimiter(
+        user_budgets={"*": Budget(rate=1, burst=100)},
+        connection_budgets={"message:new": Budget(rate=1, burst=100), "*": Budget(rate=1, burst=1)},
+    )
+    buckets = {}
+    assert limiter.check(1, buckets, "anything") == 0
+    assert limiter.check(1, buckets, "something-else") > 0
+    assert limiter.check(1, buckets, "message:new") == 0
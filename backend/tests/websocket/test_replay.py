@@ -0,0 +1,31 @@
+import json
+
+from app.infrastructure.websocket.replay import ReplayBuffer
+
+
+def test_append_stamps_increasing_seq_without_reencoding():
+    buffer = ReplayBuffer(8)
+    first = buffer.append('{"type":"message:new","payload":{"text":"a"}}')
+    second = buffer.append('{"type":"message:new","payload":{"text":"b"}}')
+    assert json.loads(first) == {"seq": 1, "type": "message:new", "payload": {"text": "a"}}
+    assert json.loads(second)["seq"] == 2
+    assert buffer.seq == 2
+
+
+def test_since_returns_the_missed_events():
+    buffer = ReplayBuffer(8)
+    frames = [buffer.append('{"n":%d}' % i) for i in range(5)]
+    assert buffer.since(buffer.epoch, 2) == frames[2:]
+    assert buffer.since(buffer.epoch, 5) == []
+
+
+def test_since_asks_for_resync_when_the_gap_is_not_covered():
+    buffer = ReplayBuffer(3)
+    for i in range(6):
+        buffer.append('{"n":%d}' % i)
+    # seq 1..3 were evicted
+    assert buffer.since(buffer.epoch, 1) is None
+    assert buffer.since(buffer.epoch, 3) is not None
+    # another epoch, or a position from the future, cannot be compared
+    assert buffer.since("other-epoch", 5) is None
+    assert buffer.since(buffer.epoch, 7) is None
@@ -139,7 +139,7 @@ export const CreateChat = ({ onChatCreated }) => {
                       className="search-result-item"
                       onClick={() => handleSelectUser(user)}
                     >
-                      {user.username} ({user.email})
+                      {user.username}
                     </div>
                   ))}
               </div>
@@ -73,23 +73,25 @@ export const ChatPage = () => {
   }, [id]);
 
   useEffect(() => {
-    if (conversation && id && !wsRef.current) {
+    let cancelled = false;
+    const connect = () => {
       const websocket = createWebSocket(id, handleWebSocketMessage, () => {
-        // Reconnect logic
-        if (id && !wsRef.current) {
-          const newWs = createWebSocket(id, handleWebSocketMessage);
-          if (newWs) {
-            wsRef.current = newWs;
-            setWsState(newWs);
-          }
-        }
+        // Reconnect logic: replace the closed socket, unless the effect was cleaned up
+        if (cancelled || wsRef.current !== websocket) return;
+        wsRef.current = null;
+        setWsState(null);
+        connect();
       });
       if (websocket) {
         wsRef.current = websocket;
         setWsState(websocket);
       }
+    };
+    if (conversation && id && !wsRef.current) {
+      connect();
     }
     return () => {
+      cancelled = true;
       if (wsRef.current) {
         wsRef.current.close();
         wsRef.current = null;
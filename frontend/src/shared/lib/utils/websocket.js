@@ -23,6 +23,11 @@ export const createWebSocket = (conversationId, onMessage, onReconnect) => {
   ws.onmessage = (event) => {
     try {
       const data = JSON.parse(event.data);
+      // Server heartbeat: answer, otherwise the server closes an idle socket
+      if (data.type === 'ping') {
+        ws.send(JSON.stringify({ type: 'pong' }));
+        return;
+      }
       onMessage(data);
     } catch (error) {
       console.error('Error parsing WebSocket message:', error);